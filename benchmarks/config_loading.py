@@ -0,0 +1,97 @@
+import pychirp
+import argparse
+import glob
+import json
+import os
+import random
+import tempfile
+import time
+
+
+def make_config_files(directory, num_files, keys_per_file):
+    rnd = random.Random(42)
+    for i in range(num_files):
+        content = {
+            'chirp': {'location': '/Bench/{}'.format(i)},
+            'component-{}'.format(i): {
+                'key-{}'.format(k): {
+                    'level': rnd.choice(['TRACE', 'DEBUG', 'INFO']),
+                    'depth': rnd.randint(1, 1000),
+                    'values': [rnd.random() for _ in range(8)]
+                } for k in range(keys_per_file)
+            }
+        }
+        with open(os.path.join(directory, 'config_{:04}.json'.format(i)), 'w') as file:
+            json.dump(content, file, indent=4)
+
+
+def simulate_io_latency(latency):
+    # Emulates slow storage such as network file systems; like blocking I/O, sleeping releases the GIL
+    def slow_open(*args, **kwargs):
+        time.sleep(latency)
+        return open(*args, **kwargs)
+
+    global _open
+    _open = pychirp.open = slow_open
+
+
+_open = open
+
+
+def load_baseline(pattern):
+    # The loader before the disk cache: parse every file and merge it in place into one tree
+    def merge(a, b):
+        for key in b:
+            if key in a and isinstance(a[key], dict) and isinstance(b[key], dict):
+                merge(a[key], b[key])
+            else:
+                a[key] = b[key]
+        return a
+
+    config = {}
+    for filename in glob.glob(pattern):
+        with _open(filename, 'r') as file:
+            config = merge(config, json.loads(file.read()))
+    return config
+
+
+def measure(description, fn, repetitions):
+    durations = []
+    for _ in range(repetitions):
+        t = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - t)
+    print('{:40} best {:8.1f} ms   mean {:8.1f} ms'.format(description, min(durations) * 1000,
+                                                          sum(durations) / len(durations) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark loading of large configuration sets')
+    parser.add_argument('--files', type=int, default=500, help='Number of configuration files')
+    parser.add_argument('--keys', type=int, default=20, help='Number of keys per configuration file')
+    parser.add_argument('--repetitions', type=int, default=5, help='Number of repetitions per measurement')
+    parser.add_argument('--io-latency', type=float, default=0.0, metavar='ms',
+                        help='Simulated latency for opening a file')
+    args = parser.parse_args()
+
+    if args.io_latency:
+        simulate_io_latency(args.io_latency / 1000.0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_directory = os.path.join(directory, 'config')
+        cache_directory = os.path.join(directory, 'cache')
+        os.mkdir(config_directory)
+        make_config_files(config_directory, args.files, args.keys)
+        pattern = os.path.join(config_directory, '*.json')
+
+        print('Loading {} configuration files with {} keys each ({} ms I/O latency)'.format(args.files, args.keys,
+                                                                                          args.io_latency))
+        measure('before', lambda: load_baseline(pattern), args.repetitions)
+        measure('no disk cache', lambda: pychirp.Configuration(['bench', pattern]), args.repetitions)
+        pychirp.Configuration(['bench', pattern], cache_directory=cache_directory)
+        measure('warm disk cache', lambda: pychirp.Configuration(['bench', pattern], cache_directory=cache_directory),
+                args.repetitions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import pychirp_old.process
+import argparse
+import time
+
+
+class FakeTerminal(object):
+    def __init__(self, name):
+        self.name = name
+        self.signature = 0
+        self.is_established = True
+        self.is_subscribed = True
+        self.on_binding_state_changed = None
+        self.on_subscription_state_changed = None
+
+    def setEstablished(self, state):
+        self.is_established = state
+        self.on_binding_state_changed(state)
+
+
+class FullScanDependencyManager(pychirp_old.process.DependencyManager):
+    # Re-evaluates every dependency on each event, like the manager used to
+    def _updateDependency(self, dependency):
+        established = []
+        for d in self._dependencies:
+            binding_established = True
+            terminal_subscribed = True
+            try:
+                binding_established = d.terminal.is_established
+            except:
+                pass
+            try:
+                terminal_subscribed = d.terminal.is_subscribed
+            except:
+                pass
+            established.append(binding_established and terminal_subscribed)
+        self._setReady(all(established))
+
+
+def reconnectStorm(cls, num_dependencies):
+    terminals = [FakeTerminal('/Dependency/{}'.format(i)) for i in range(num_dependencies)]
+    manager = cls('Benchmark', None, [], list(terminals))
+    assert manager.ready
+
+    t = time.perf_counter()
+    for terminal in terminals:
+        terminal.setEstablished(False)
+    for terminal in terminals:
+        terminal.setEstablished(True)
+    duration = time.perf_counter() - t
+
+    assert manager.ready
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DependencyManager readiness tracking')
+    parser.add_argument('--dependencies', type=int, default=1000, help='Number of dependencies')
+    args = parser.parse_args()
+
+    print('Releasing and re-establishing {} dependencies'.format(args.dependencies))
+    for description, cls in [('full scan per event (before)', FullScanDependencyManager),
+                             ('incremental', pychirp_old.process.DependencyManager)]:
+        duration = reconnectStorm(cls, args.dependencies)
+        print('{:35} {:10.2f} ms total {:10.2f} us/event'.format(description, duration * 1000,
+                                                                 duration / (2 * args.dependencies) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
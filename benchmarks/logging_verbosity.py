@@ -0,0 +1,42 @@
+import pychirp
+import argparse
+import contextlib
+import io
+import timeit
+
+
+def measure(description, stmt, number):
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = min(timeit.repeat(stmt, number=number, repeat=5))
+    print('{:45} {:8.0f} ns/call'.format(description, best / number * 1e9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cost of disabled and enabled log calls')
+    parser.add_argument('--calls', type=int, default=100000, help='Number of log calls per measurement')
+    args = parser.parse_args()
+
+    logger = pychirp.Logger('Benchmark')
+    for l in [logger, pychirp.Logger.app_logger]:
+        l.stdout_verbosity = pychirp.Verbosity.INFO
+        l.chirp_verbosity = pychirp.Verbosity.INFO
+
+    measure('disabled: logger.log_debug(...)', lambda: logger.log_debug('Value: ', 42), args.calls)
+    measure('disabled: logger.log(DEBUG, ...)', lambda: logger.log(pychirp.Verbosity.DEBUG, 'Value: ', 42),
+            args.calls)
+    measure('disabled: pychirp.log_trace(...)', lambda: pychirp.log_trace('Value: ', 42), args.calls)
+
+    measure('disabled: lazy %-style format', lambda: logger.log_debug(pychirp.LazyLogFormat('Value: %d', 42)),
+            args.calls)
+
+    measure('enabled:  logger.log_info(...)', lambda: logger.log_info('Value: ', 42), args.calls // 10)
+    measure('enabled:  lazy %-style format', lambda: logger.log_info(pychirp.LazyLogFormat('Value: %d', 42)),
+            args.calls // 10)
+
+    pychirp.Logger.enable_ring_buffer()
+    measure('ring buffer: logger.log_trace(...)', lambda: logger.log_trace('Value: ', 42), args.calls)
+    pychirp.Logger.disable_ring_buffer()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import os
+os.environ.setdefault('PYCHIRP_EMULATOR', '1')  # set PYCHIRP_EMULATOR=0 to measure against libchirp instead
+
+import pychirp_old.connection
+import pychirp_old.leaf
+import pychirp_old.scheduler
+import pychirp_old.terminals
+import argparse
+import threading
+import time
+
+
+def masterSlavePingPong(leaf_a, leaf_b, num_round_trips, payload):
+    master = pychirp_old.terminals.MasterTerminal(leaf_a, 'Benchmark/PingPong', 1)
+    slave = pychirp_old.terminals.SlaveTerminal(leaf_b, 'Benchmark/PingPong', 1)
+    master.waitUntilEstablished()
+    slave.waitUntilEstablished()
+    master.waitUntilSubscribed()
+    slave.waitUntilSubscribed()
+
+    done = threading.Event()
+    remaining = [num_round_trips]
+
+    def onPong(data):
+        remaining[0] -= 1
+        if remaining[0]:
+            master.publishMessage(payload)
+        else:
+            done.set()
+
+    slave.on_message_received = slave.publishMessage
+    master.on_message_received = onPong
+
+    t = time.perf_counter()
+    master.publishMessage(payload)
+    done.wait()
+    duration = time.perf_counter() - t
+
+    master.destroy()
+    slave.destroy()
+    return duration
+
+
+def serviceClientRequests(leaf_a, leaf_b, num_round_trips, payload):
+    service = pychirp_old.terminals.ServiceTerminal(leaf_a, 'Benchmark/Echo', 2)
+    client = pychirp_old.terminals.ClientTerminal(leaf_b, 'Benchmark/Echo', 2)
+    service.request_handler = lambda err, data: data
+    service.waitUntilEstablished()
+    client.waitUntilSubscribed()
+
+    done = threading.Event()
+    remaining = [num_round_trips]
+
+    def onResponse(err, operation_id, flags, data):
+        remaining[0] -= 1
+        if remaining[0]:
+            client.asyncRequest(payload, onResponse)
+        else:
+            done.set()
+        return client.ControlFlow.STOP
+
+    t = time.perf_counter()
+    client.asyncRequest(payload, onResponse)
+    done.wait()
+    duration = time.perf_counter() - t
+
+    service.destroy()
+    client.destroy()
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark terminal round trips between two leafs')
+    parser.add_argument('--round-trips', type=int, default=10000, help='Number of round trips per pattern')
+    parser.add_argument('--payload-size', type=int, default=64, help='Size of the exchanged payloads in bytes')
+    args = parser.parse_args()
+
+    scheduler = pychirp_old.scheduler.Scheduler()
+    leaf_a = pychirp_old.leaf.Leaf(scheduler)
+    leaf_b = pychirp_old.leaf.Leaf(scheduler)
+    connection = pychirp_old.connection.LocalConnection(leaf_a, leaf_b)
+    payload = bytearray(args.payload_size)
+
+    library = 'emulator' if os.environ['PYCHIRP_EMULATOR'] not in ('', '0') else 'libchirp'
+    print('{} round trips with {} byte payloads using {}'.format(args.round_trips, args.payload_size, library))
+    for description, fn in [('master/slave publish', masterSlavePingPong),
+                            ('service/client request', serviceClientRequests)]:
+        duration = fn(leaf_a, leaf_b, args.round_trips, payload)
+        print('{:25} {:10.2f} ms total {:10.2f} us/round trip'.format(description, duration * 1000,
+                                                                      duration / args.round_trips * 1e6))
+
+    connection.destroy()
+
+
+if __name__ == '__main__':
+    main()
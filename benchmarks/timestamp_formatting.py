@@ -0,0 +1,23 @@
+import pychirp
+import argparse
+import timeit
+
+
+def measure(description, stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    print('{:45} {:8.0f} ns/call'.format(description, best / number * 1e9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark creating and formatting timestamps for log records')
+    parser.add_argument('--calls', type=int, default=100000, help='Number of calls per measurement')
+    args = parser.parse_args()
+
+    ts = pychirp.Timestamp()
+    measure('Timestamp()', pychirp.Timestamp, args.calls)
+    measure('str(Timestamp())', lambda: str(pychirp.Timestamp()), args.calls)
+    measure('to_string(NANOSECONDS)', lambda: ts.to_string(pychirp.Timestamp.Precision.NANOSECONDS), args.calls)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,24 +10,41 @@ import json as _json
 import sys as _sys
 import posixpath as _posixpath
 import time as _time
+import types as _types
+import os as _os
+import marshal as _marshal
+import hashlib as _hashlib
+import concurrent.futures as _futures
+import collections as _collections
+import copy as _copy
+import itertools as _itertools
+import random as _random
+import mmap as _mmap
+import struct as _struct
+import heapq as _heapq
+import socket as _socket
 
 
 # ======================================================================================================================
 # Load the shared library
 # ======================================================================================================================
 _library_filename = None
-if _platform.system() == 'Windows':
-    _library_filename = "chirp.dll"
-elif _platform.system() == 'Linux':
-    _library_filename = "libchirp.so"
+if _os.environ.get('PYCHIRP_EMULATOR', '0') not in ('', '0'):
+    import pychirp_emulator as _pychirp_emulator
+    _chirp = _pychirp_emulator.load()
 else:
-    raise Exception(_platform.system() + ' is not supported')
+    if _platform.system() == 'Windows':
+        _library_filename = "chirp.dll"
+    elif _platform.system() == 'Linux':
+        _library_filename = "libchirp.so"
+    else:
+        raise Exception(_platform.system() + ' is not supported')
 
-try:
-    _chirp = _ctypes.cdll.LoadLibrary(_library_filename)
-except Exception as e:
-    raise Exception('ERROR: Could not load {}: {}. Make sure the library is in your library search path.'
-                    .format(_library_filename, e))
+    try:
+        _chirp = _ctypes.cdll.LoadLibrary(_library_filename)
+    except Exception as e:
+        raise Exception('ERROR: Could not load {}: {}. Make sure the library is in your library search path.'
+                        .format(_library_filename, e))
 
 
 # ======================================================================================================================
@@ -78,6 +95,16 @@ class Timeout(Failure):
         Failure.__init__(self, -27)
 
 
+class AsyncOperationRunning(Failure):
+    def __init__(self):
+        Failure.__init__(self, -13)
+
+
+class ResolveFailed(Failure):
+    def __init__(self):
+        Failure.__init__(self, -29)
+
+
 class Success(Result):
     def __init__(self, value: int = 0):
         assert value >= 0
@@ -132,7 +159,7 @@ def _wrap_callback(c_function_type, fn):
             ret = fn(Success(res), *args[:-1])
         if ret is None or ret == ControlFlow.STOP:
             _callback_function_to_keep_alive.remove(stored_object)
-        return ret
+        return ret.value if isinstance(ret, ControlFlow) else ret
     wrapped_fn = c_function_type(clb)
     stored_object = _StoredCallbackFunction(wrapped_fn)
     _callback_function_to_keep_alive.add(stored_object)
@@ -170,6 +197,19 @@ class _ClassProperty:
         return self
 
 
+class _ClassPropertyMeta(type):
+    def __setattr__(cls, key, value):
+        for klass in cls.__mro__:
+            if key in klass.__dict__:
+                attr = klass.__dict__[key]
+                if isinstance(attr, _ClassProperty):
+                    if not attr._setter:
+                        raise AttributeError("can't set attribute")
+                    return attr._setter.__get__(None, cls)(value)
+                break
+        type.__setattr__(cls, key, value)
+
+
 def _classproperty(getter):
     if not isinstance(getter, (classmethod, staticmethod)):
         getter = classmethod(getter)
@@ -269,9 +309,130 @@ class BadConfiguration(Exception):
         return 'Cannot parse configuration: {}'.format(self._description)
 
 
+class ConfigurationValueNotFound(Exception):
+    def __init__(self, key: str):
+        self._key = key
+
+    def __str__(self):
+        return 'Required configuration value \'{}\' not found'.format(self._key)
+
+
+_NO_DEFAULT = object()
+
+
+class ConfigurationValue:
+    def __init__(self, configuration: 'Configuration', key: str, type: _typing.Optional[_typing.Callable] = None,
+                 default: _typing.Any = _NO_DEFAULT):
+        self._configuration = configuration
+        self._key = key
+        self._type = type
+        self._default = default
+        self._generation = -1
+        self._value = None
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def value(self) -> _typing.Any:
+        if self._generation != self._configuration._generation:
+            value = self._configuration.get(self._key, self._default)
+            if self._type is not None and value is not None:
+                try:
+                    value = self._type(value)
+                except (TypeError, ValueError) as e:
+                    raise BadConfiguration('Value of \'{}\' has the wrong type: {}'.format(self._key, e))
+            self._value = value
+            self._generation = self._configuration._generation
+        return self._value
+
+    def __call__(self) -> _typing.Any:
+        return self.value
+
+    def __str__(self):
+        return '{} = {}'.format(self._key, self.value)
+
+
+class _GlobSource(list):
+    def __init__(self, pattern, filenames):
+        list.__init__(self, filenames)
+        self.pattern = pattern
+
+
+_CONFIG_CACHE_HEADER = _struct.Struct('<8sqq')
+_CONFIG_CACHE_MAGIC = b'PYCHIRPC'
+
+
+def _get_config_cache_filename(filename, cache_directory):
+    digest = _hashlib.sha1(_os.path.abspath(filename).encode('utf-8')).hexdigest()
+    return _os.path.join(cache_directory, digest + '.cache')
+
+
+def _read_config_file(filename, stat_key, cache_directory):
+    # Only does I/O, which releases the GIL, so that several files can be read concurrently; returns whether the data
+    # is an up-to-date marshalled tree from the disk cache or the JSON text of the file
+    if cache_directory:
+        try:
+            with open(_get_config_cache_filename(filename, cache_directory), 'rb') as file:
+                data = file.read()
+            if data[:_CONFIG_CACHE_HEADER.size] == _CONFIG_CACHE_HEADER.pack(_CONFIG_CACHE_MAGIC, *stat_key):
+                return True, data
+        except (OSError, _struct.error):
+            pass
+
+    try:
+        with open(filename, 'rb') as file:
+            return False, file.read()
+    except Exception as e:
+        raise BadConfiguration('{}: {}'.format(filename, e))
+
+
+def _parse_config_file(filename, stat_key, cache_directory, cached, data):
+    if cached:
+        try:
+            return _marshal.loads(data[_CONFIG_CACHE_HEADER.size:])
+        except (EOFError, ValueError, TypeError):
+            cached, data = _read_config_file(filename, stat_key, None)
+
+    try:
+        tree = _json.loads(data)
+    except Exception as e:
+        raise BadConfiguration('{}: {}'.format(filename, e))
+
+    if cache_directory:
+        cache_filename = _get_config_cache_filename(filename, cache_directory)
+        try:
+            _os.makedirs(cache_directory, exist_ok=True)
+            tmp_filename = '{}.{}.tmp'.format(cache_filename, _threading.get_ident())
+            with open(tmp_filename, 'wb') as file:
+                file.write(_CONFIG_CACHE_HEADER.pack(_CONFIG_CACHE_MAGIC, *stat_key))
+                file.write(_marshal.dumps(tree))
+            _os.replace(tmp_filename, cache_filename)
+        except (OSError, ValueError):
+            pass
+
+    return tree
+
+
 class Configuration:
-    def __init__(self, argv: _typing.Optional[_typing.List[str]] = _sys.argv):
+    MAX_LOADER_THREADS = 8
+
+    def __init__(self, argv: _typing.Optional[_typing.List[str]] = _sys.argv,
+                 cache_directory: _typing.Optional[str] = None):
+        self._lock = _threading.RLock()
+        self._cache_directory = cache_directory or _os.environ.get('PYCHIRP_CONFIG_CACHE_DIR')
         self._config = {}
+        self._frozen_config = None
+        self._snapshot = None
+        self._generation = 0
+        self._sources = []
+        self._file_cache = {}
+        self._needs_merge = False
+        self._change_listeners = []
+        self._watch_thread = None
+        self._watch_cv = _threading.Condition()
+        self._watching = False
         self.update('''
         {
             "chirp": {
@@ -292,43 +453,297 @@ class Configuration:
         return str(self._config)
 
     @property
-    def config(self) -> _typing.DefaultDict:
-        return self._config
+    def config(self) -> _typing.Dict[str, _typing.Any]:
+        with self._lock:
+            return _copy.deepcopy(self._config)
+
+    @property
+    def frozen_config(self) -> _typing.Mapping[str, _typing.Any]:
+        with self._lock:
+            self.snapshot
+            return self._frozen_config
+
+    @property
+    def snapshot(self) -> _typing.Mapping[str, _typing.Any]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._frozen_config, self._snapshot = self._compile(self._config)
+                snapshot = self._snapshot
+        return snapshot
 
     @property
     def location(self) -> Path:
-        return Path(self._config['chirp']['location'])
+        return Path(self.snapshot['chirp.location'])
 
     @property
     def connection_target(self) -> _typing.Optional[str]:
-        return self._config['chirp']['connection']['target']
+        return self.snapshot['chirp.connection.target']
+
+    @property
+    def connection_targets(self) -> _typing.List['TcpTarget']:
+        targets = self.connection_target
+        if targets is None:
+            return []
+        if isinstance(targets, str):
+            targets = targets.split(',')
+        return [TcpTarget.parse(target) for target in targets if target.strip()]
 
     @property
     def connection_timeout(self) -> _typing.Optional[float]:
-        return self._config['chirp']['connection']['timeout']
+        return self.snapshot['chirp.connection.timeout']
 
     @property
     def connection_identification(self) -> _typing.Optional[str]:
-        return self._config['chirp']['connection']['identification']
+        return self.snapshot['chirp.connection.identification']
 
-    def update(self, json: str) -> None:
+    @property
+    def config_files(self) -> _typing.List[str]:
+        with self._lock:
+            return [filename for kind, filenames in self._sources if kind == 'glob' for filename in filenames]
+
+    @property
+    def cache_directory(self) -> _typing.Optional[str]:
+        return self._cache_directory
+
+    @property
+    def is_watching(self) -> bool:
+        return self._watching
+
+    def get(self, key: str, default: _typing.Any = _NO_DEFAULT) -> _typing.Any:
         try:
-            def merge(a, b, path=None):
-                if path is None:
-                    path = []
-                for key in b:
-                    if key in a:
-                        if isinstance(a[key], dict) and isinstance(b[key], dict):
-                            merge(a[key], b[key], path + [str(key)])
-                        else:
-                            a[key] = b[key]
-                    else:
-                        a[key] = b[key]
-                return a
+            return self.snapshot[key]
+        except KeyError:
+            if default is _NO_DEFAULT:
+                raise ConfigurationValueNotFound(key)
+            return default
+
+    def bind(self, key: str, type: _typing.Optional[_typing.Callable] = None,
+             default: _typing.Any = _NO_DEFAULT) -> ConfigurationValue:
+        return ConfigurationValue(self, key, type, default)
+
+    def add_change_listener(self, fn: _typing.Callable[[_typing.Dict[str, _typing.Tuple[_typing.Any, _typing.Any]]],
+                                                       None],
+                            prefix: _typing.Optional[str] = None) -> None:
+        with self._lock:
+            self._change_listeners.append((fn, prefix))
+            self.snapshot
+
+    def remove_change_listener(self, fn: _typing.Callable) -> None:
+        with self._lock:
+            self._change_listeners = [(f, p) for f, p in self._change_listeners if f != fn]
 
-            self._config = merge(self._config, _json.loads(json))
+    def update(self, json: str) -> None:
+        try:
+            tree = _json.loads(json)
         except Exception as e:
             raise BadConfiguration(str(e))
+        if not isinstance(tree, dict):
+            raise BadConfiguration('Expected a JSON object but got {}'.format(type(tree).__name__))
+
+        with self._lock:
+            # Consecutive updates collapse into a single source so that _sources does not grow with every call
+            if self._sources and self._sources[-1][0] == 'json':
+                self._sources[-1] = ('json', self._merge(self._sources[-1][1], tree)[0])
+            else:
+                self._sources.append(('json', tree))
+            old_snapshot = self.snapshot if self._change_listeners else None
+            self._config, changed = self._merge(self._config, tree)
+            self._commit(changed, old_snapshot)
+
+    def reload(self) -> bool:
+        with self._lock:
+            all_filenames = []
+            for i, (kind, content) in enumerate(self._sources):
+                if kind == 'glob':
+                    filenames = _glob.glob(content.pattern)
+                    if filenames != content:
+                        self._sources[i] = (kind, _GlobSource(content.pattern, filenames))
+                        self._needs_merge = True
+                    all_filenames += filenames
+
+            if self._load_files(all_filenames):
+                self._needs_merge = True
+
+            if not self._needs_merge:
+                return False
+
+            old_snapshot = self.snapshot if self._change_listeners else None
+            config = {}
+            for kind, content in self._sources:
+                if kind == 'json':
+                    config, _ = self._merge(config, content)
+                else:
+                    for filename in content:
+                        config, _ = self._merge(config, self._file_cache[filename][1])
+            self._needs_merge = False
+
+            changed = not self._equal(config, self._config)
+            if changed:
+                self._config = config
+            self._commit(changed, old_snapshot)
+            return changed
+
+    def watch(self, interval: float = 1.0) -> None:
+        with self._watch_cv:
+            if self._watching:
+                raise Exception('Already watching')
+            self._watching = True
+            self._watch_thread = _threading.Thread(target=self._watch_thread_fn, args=(interval,), daemon=True)
+            self._watch_thread.start()
+
+    def unwatch(self) -> None:
+        with self._watch_cv:
+            self._watching = False
+            self._watch_cv.notify()
+        if self._watch_thread is not None and self._watch_thread is not _threading.current_thread():
+            self._watch_thread.join()
+        self._watch_thread = None
+
+    def _watch_thread_fn(self, interval):
+        with self._watch_cv:
+            while self._watching:
+                self._watch_cv.wait(timeout=interval)
+                if not self._watching:
+                    return
+                try:
+                    self.reload()
+                except Exception as e:
+                    Logger.chirp_logger.log_error('Reloading the configuration failed: ', e)
+
+    def _add_config_files(self, patterns):
+        with self._lock:
+            sources = [_GlobSource(pattern, _glob.glob(pattern)) for pattern in patterns]
+            self._load_files([filename for filenames in sources for filename in filenames])
+
+            old_snapshot = self.snapshot if self._change_listeners else None
+            config = self._config
+            for filenames in sources:
+                self._sources.append(('glob', filenames))
+                for filename in filenames:
+                    config, _ = self._merge(config, self._file_cache[filename][1])
+            changed = config is not self._config
+            self._config = config
+            self._commit(changed, old_snapshot)
+
+    def _load_files(self, filenames):
+        to_load = []
+        for filename in filenames:
+            try:
+                stat = _os.stat(filename)
+            except OSError as e:
+                raise BadConfiguration(str(e))
+
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._file_cache.get(filename)
+            if cached is None or cached[0] != key:
+                to_load.append((filename, key))
+
+        if not to_load:
+            return False
+
+        def read(items):
+            return [_read_config_file(filename, key, self._cache_directory) for filename, key in items]
+
+        # The files are read concurrently but parsed on this thread, since parsing holds the GIL anyway. Each thread
+        # reads a contiguous slice of the files, which keeps the overhead of the pool independent of their number.
+        num_threads = min(len(to_load), self.MAX_LOADER_THREADS)
+        if num_threads == 1:
+            results = read(to_load)
+        else:
+            chunk_size = -(-len(to_load) // num_threads)
+            chunks = [to_load[i:i + chunk_size] for i in range(0, len(to_load), chunk_size)]
+            with _futures.ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                results = [result for chunk in executor.map(read, chunks) for result in chunk]
+
+        for (filename, key), (cached, data) in zip(to_load, results):
+            tree = _parse_config_file(filename, key, self._cache_directory, cached, data)
+            self._file_cache[filename] = (key, tree)
+
+        return True
+
+    def _commit(self, changed, old_snapshot):
+        if not changed:
+            return
+
+        self._snapshot = None
+        self._generation += 1
+
+        if old_snapshot is None:
+            return
+
+        new_snapshot = self.snapshot
+        changes = {}
+        for key in old_snapshot.keys() | new_snapshot.keys():
+            old = old_snapshot.get(key)
+            new = new_snapshot.get(key)
+            if isinstance(old, _types.MappingProxyType) or isinstance(new, _types.MappingProxyType):
+                continue
+            if not self._equal(old, new):
+                changes[key] = (old, new)
+
+        if not changes:
+            return
+
+        for fn, prefix in list(self._change_listeners):
+            if prefix is None:
+                fn(changes)
+            else:
+                filtered = {k: v for k, v in changes.items() if k == prefix or k.startswith(prefix + '.')}
+                if filtered:
+                    fn(filtered)
+
+    @staticmethod
+    def _merge(a, b):
+        merged = None
+        for key, value in b.items():
+            old = a.get(key, _NO_DEFAULT)
+            if isinstance(old, dict) and isinstance(value, dict):
+                value, changed = Configuration._merge(old, value)
+                if not changed:
+                    continue
+            elif old is not _NO_DEFAULT and Configuration._equal(old, value):
+                continue
+
+            if merged is None:
+                merged = dict(a)
+            merged[key] = value
+
+        return (a, False) if merged is None else (merged, True)
+
+    @staticmethod
+    def _equal(a, b):
+        # Unlike ==, treats 1, 1.0 and True as different values
+        if type(a) is not type(b):
+            return False
+        if isinstance(a, (dict, _types.MappingProxyType)):
+            return a.keys() == b.keys() and all(Configuration._equal(a[key], b[key]) for key in a)
+        if isinstance(a, (list, tuple)):
+            return len(a) == len(b) and all(Configuration._equal(x, y) for x, y in zip(a, b))
+        return a == b
+
+    @staticmethod
+    def _compile(config):
+        def freeze(value):
+            if isinstance(value, dict):
+                return _types.MappingProxyType({key: freeze(child) for key, child in value.items()})
+            if isinstance(value, list):
+                return tuple(freeze(child) for child in value)
+            return value
+
+        table = {}
+
+        def flatten(prefix, node):
+            for key, value in node.items():
+                path = prefix + str(key)
+                table[path] = value
+                if isinstance(value, _types.MappingProxyType):
+                    flatten(path + '.', value)
+
+        frozen_config = freeze(config)
+        flatten('', frozen_config)
+        return frozen_config, _types.MappingProxyType(table)
 
     def _parse_cmdline(self, argv):
         class ThrowingArgumentParser(_argparse.ArgumentParser):
@@ -340,7 +755,7 @@ class Configuration:
 
         parser = ThrowingArgumentParser()
         parser.add_argument('--connection_target', '-c', dest='target', type=str, metavar='host:port',
-                            help='CHIRP server to connect to (e.g. "hostname:12000")')
+                            help='CHIRP server(s) to connect to (e.g. "hostname:12000" or "host-a:12000,host-b:12000")')
         parser.add_argument('--connection_timeout', '-t', dest='timeout', type=float, metavar='seconds',
                             help='Connection timeout in seconds (-1 for infinity)')
         parser.add_argument('--connection_identification', '-i', dest='identification', type=str, metavar='string',
@@ -353,10 +768,7 @@ class Configuration:
                             help='Configuration files in JSON format')
         pargs = parser.parse_args(argv)
 
-        for pattern in pargs.config_files:
-            for filename in _glob.glob(pattern):
-                with open(filename, 'r') as file:
-                    self.update(file.read())
+        self._add_config_files(pargs.config_files)
 
         if pargs.json_overrides:
             for json_str in pargs.json_overrides:
@@ -376,15 +788,18 @@ class Configuration:
 # Timestamp
 # ======================================================================================================================
 class Timestamp:
+    __slots__ = ('_ns_since_epoch',)
+
     class Precision(_enum.Enum):
         SECONDS = 0
         MILLISECONDS = 1
         MICROSECONDS = 2
         NANOSECONDS = 3
 
-    def __init__(self):
-        self._time = _time.time()
-        self._ns_since_epoch = int(self._time * 1e9)
+    _seconds_cache = (None, '')
+
+    def __init__(self, ns_since_epoch: _typing.Optional[int] = None):
+        self._ns_since_epoch = _time.time_ns() if ns_since_epoch is None else ns_since_epoch
 
     @property
     def ns_since_epoch(self) -> int:
@@ -392,27 +807,32 @@ class Timestamp:
 
     @property
     def milliseconds(self):
-        return int(self._ns_since_epoch / 1000000) % 1000
+        return self._ns_since_epoch // 1000000 % 1000
 
     @property
     def microseconds(self):
-        return int(self._ns_since_epoch / 1000) % 1000
+        return self._ns_since_epoch // 1000 % 1000
 
     @property
     def nanoseconds(self):
         return self._ns_since_epoch % 1000
 
     def to_string(self, precision: Precision = Precision.MILLISECONDS):
-        s = _time.strftime('%d/%m/%Y %T', _time.localtime(int(self._time)))
-
-        if precision.value >= self.Precision.MILLISECONDS.value:
-            s += '.{:03}'.format(self.milliseconds)
-        if precision.value >= self.Precision.MICROSECONDS.value:
-            s += '.{:03}'.format(self.microseconds)
-        if precision.value >= self.Precision.NANOSECONDS.value:
-            s += '.{:03}'.format(self.nanoseconds)
-
-        return s
+        seconds, ns = divmod(self._ns_since_epoch, 1000000000)
+
+        cache = Timestamp._seconds_cache
+        if cache[0] != seconds:
+            cache = (seconds, _time.strftime('%d/%m/%Y %H:%M:%S', _time.localtime(seconds)))
+            Timestamp._seconds_cache = cache
+
+        if precision is self.Precision.MILLISECONDS:
+            return '{}.{:03}'.format(cache[1], ns // 1000000)
+        elif precision is self.Precision.SECONDS:
+            return cache[1]
+        elif precision is self.Precision.MICROSECONDS:
+            return '{}.{:03}.{:03}'.format(cache[1], ns // 1000000, ns // 1000 % 1000)
+        else:
+            return '{}.{:03}.{:03}.{:03}'.format(cache[1], ns // 1000000, ns // 1000 % 1000, ns % 1000)
 
     def __str__(self):
         return self.to_string()
@@ -421,10 +841,195 @@ class Timestamp:
 # ======================================================================================================================
 # Logging
 # ======================================================================================================================
+class BadVerbosity(Exception):
+    def __init__(self, name: _typing.Any):
+        self.name = name
+
+    def __str__(self):
+        return 'Invalid verbosity "{}"; use one of {}'.format(self.name, ', '.join(v.name for v in Verbosity))
+
+
+# Enum.value is a property and costs more than the whole disabled log call, so the hot path compares plain ints
+_TRACE = Verbosity.TRACE.value
+_DEBUG = Verbosity.DEBUG.value
+_INFO = Verbosity.INFO.value
+_WARNING = Verbosity.WARNING.value
+_ERROR = Verbosity.ERROR.value
+
+
 class _Verbosities:
     def __init__(self):
         self.stdout = Verbosity.TRACE
         self.chirp = Verbosity.TRACE
+        self.effective_stdout = Verbosity.TRACE.value
+        self.effective_chirp = Verbosity.TRACE.value
+        self.max_emitted = Verbosity.TRACE.value
+        self.max_effective = Verbosity.TRACE.value
+        self.ring = -1
+
+    def update_effective(self, max_verbosities: '_Verbosities') -> None:
+        self.effective_stdout = min(max_verbosities.stdout.value, self.stdout.value)
+        self.effective_chirp = min(max_verbosities.chirp.value, self.chirp.value)
+        self.max_emitted = max(self.effective_stdout, self.effective_chirp)
+        self.max_effective = max(self.max_emitted, max_verbosities.ring)
+
+
+class _TokenBucket:
+    def __init__(self, rate, burst, now):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._last = now
+
+    def try_consume(self, now):
+        self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def is_full(self, now):
+        return self._tokens + (now - self._last) * self._rate >= self._burst
+
+    def refund(self):
+        self._tokens = min(self._burst, self._tokens + 1.0)
+
+
+class _Throttle:
+    MAX_CALL_SITES = 1024
+
+    # Arguments of these types can not change between two records, so equal raw arguments imply equal messages
+    _IMMUTABLE_ARG_TYPES = frozenset([str, int, float, bool, bytes, type(None)])
+
+    def __init__(self, emit):
+        self.enabled = False
+        self.lock = _threading.Lock()
+        self.rate = None
+        self.burst = None
+        self.per_call_site = False
+        self.dedupe_window = None
+        self.buckets = {}
+        self.rate_limited = 0
+        self.deduplicated = 0
+        self.pending_rate_limited = 0
+        self.last_rate_limited_severity = None
+        self.last_rate_limited_time = 0.0
+        self.last_message = None
+        self.last_args = None
+        self.last_message_time = 0.0
+        self.repetitions = 0
+        self._emit = emit
+        self._timer = None
+
+    def configure(self):
+        self.buckets = {}
+        self.update_enabled()
+
+    def update_enabled(self):
+        self.enabled = self.rate is not None or self.dedupe_window is not None or self.pending_rate_limited > 0
+
+    def admit(self, severity, args, call_site):
+        # Runs before the message gets formatted; returns whether to format the record and the bucket charged for it
+        now = _time.monotonic()
+        with self.lock:
+            if self.last_args is not None and self.dedupe_window is not None \
+                    and now - self.last_message_time < self.dedupe_window:
+                try:
+                    duplicate = (severity, args) == self.last_args
+                except Exception:
+                    duplicate = False
+                if duplicate:
+                    self._count_repetition(now)
+                    return False, None
+
+            bucket = None
+            if self.rate is not None:
+                bucket = self.buckets.get(call_site)
+                if bucket is None:
+                    if len(self.buckets) >= self.MAX_CALL_SITES:
+                        self._prune_buckets(now)
+                    bucket = self.buckets[call_site] = _TokenBucket(self.rate, self.burst, now)
+                if not bucket.try_consume(now):
+                    self.rate_limited += 1
+                    self.pending_rate_limited += 1
+                    self.last_rate_limited_severity = severity
+                    self.last_rate_limited_time = now
+                    self._schedule_flush(1.0 / self.rate)
+                    return False, None
+
+        return True, bucket
+
+    def filter(self, severity, args, message, bucket):
+        # Runs once the message has been formatted; returns whether to emit it and the summaries to emit before it
+        now = _time.monotonic()
+        notes = []
+        with self.lock:
+            if self.dedupe_window is not None:
+                key = (severity, message)
+                if key == self.last_message and now - self.last_message_time < self.dedupe_window:
+                    if bucket is not None:
+                        bucket.refund()
+                    self._count_repetition(now)
+                    return False, notes
+                if self.repetitions:
+                    notes.append((self.last_message[0], 'Last message repeated {} times'.format(self.repetitions)))
+                self.last_message = key
+                immutable_types = self._IMMUTABLE_ARG_TYPES
+                self.last_args = (severity, args) if all(type(arg) in immutable_types for arg in args) else None
+                self.last_message_time = now
+                self.repetitions = 0
+
+            if self.pending_rate_limited:
+                notes.append((severity, '{} messages suppressed by rate limiting'.format(self.pending_rate_limited)))
+                self.pending_rate_limited = 0
+                self.update_enabled()
+
+        return True, notes
+
+    def _count_repetition(self, now):
+        self.repetitions += 1
+        self.deduplicated += 1
+        self._schedule_flush(self.last_message_time + self.dedupe_window - now)
+
+    def _prune_buckets(self, now):
+        # Full buckets behave exactly like new ones, so they can go; otherwise evict the oldest call site
+        self.buckets = {call_site: bucket for call_site, bucket in self.buckets.items() if not bucket.is_full(now)}
+        if len(self.buckets) >= self.MAX_CALL_SITES:
+            del self.buckets[next(iter(self.buckets))]
+
+    def _schedule_flush(self, delay):
+        if self._timer is None:
+            self._timer = _log_throttle_scheduler.schedule(max(delay, 0.0), self._flush_expired)
+
+    def _flush_expired(self):
+        # Without this, the summary of a storm that ends in silence would only appear with the next accepted message
+        now = _time.monotonic()
+        notes = []
+        with self.lock:
+            self._timer = None
+            delays = []
+            if self.repetitions:
+                remaining = self.last_message_time + (self.dedupe_window or 0.0) - now
+                if remaining <= 0:
+                    notes.append((self.last_message[0], 'Last message repeated {} times'.format(self.repetitions)))
+                    self.repetitions = 0
+                else:
+                    delays.append(remaining)
+            if self.pending_rate_limited:
+                remaining = self.last_rate_limited_time + 1.0 / (self.rate or float('inf')) - now
+                if remaining <= 0:
+                    notes.append((self.last_rate_limited_severity,
+                                  '{} messages suppressed by rate limiting'.format(self.pending_rate_limited)))
+                    self.pending_rate_limited = 0
+                    self.update_enabled()
+                else:
+                    delays.append(remaining)
+            if delays:
+                self._schedule_flush(min(delays))
+
+        for severity, note in notes:
+            self._emit(severity, note)
 
 
 if _platform.system() == 'Windows':
@@ -454,13 +1059,473 @@ if _platform.system() == 'Windows':
         ]
 
 
-class Logger:
+class LogOverflowPolicy(_enum.Enum):
+    BLOCK = 0
+    DROP_NEWEST = 1
+    DROP_OLDEST = 2
+
+
+class LazyLogArgument:
+    __slots__ = ('_fn',)
+
+    def __init__(self, fn: _typing.Callable[[], _typing.Any]):
+        self._fn = fn
+
+    def __call__(self) -> _typing.Any:
+        return self._fn()
+
+
+class LazyLogFormat(LazyLogArgument):
+    __slots__ = ('_format', '_args')
+
+    def __init__(self, format: str, *args):
+        self._format = format
+        self._args = args
+
+    def __call__(self) -> str:
+        return self._format % tuple(arg() if isinstance(arg, LazyLogArgument) else arg for arg in self._args)
+
+
+class LogRecord(_collections.namedtuple('LogRecord', ['timestamp', 'severity', 'component', 'thread_id',
+                                                      'message'])):
+    __slots__ = ()
+
+    @property
+    def metadata(self) -> str:
+        return _json.dumps({
+            'severity':  self.severity.name,
+            'component': self.component,
+            'thread':    self.thread_id
+        })
+
+    def to_json(self) -> str:
+        return _json.dumps({
+            'timestamp': self.timestamp,
+            'severity':  self.severity.name,
+            'component': self.component,
+            'thread':    self.thread_id,
+            'message':   self.message
+        })
+
+
+class _AsyncLogWriter:
+    MAX_BATCH_SIZE = 512
+
+    def __init__(self, write_fn, queue_size, overflow_policy, linger=0.0):
+        self._write_fn = write_fn
+        self._queue_size = queue_size
+        self._overflow_policy = overflow_policy
+        self._linger = linger
+        self._queue = _collections.deque()
+        self._cv = _threading.Condition(_threading.Lock())
+        self._running = True
+        self._writer_idle = False
+        self._pending = 0
+        self._dropped = 0
+        self._thread = _threading.Thread(target=self._thread_fn, name='PyCHIRP log writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def put(self, record) -> None:
+        with self._cv:
+            if self._running and len(self._queue) >= self._queue_size:
+                if self._overflow_policy is LogOverflowPolicy.DROP_NEWEST:
+                    self._dropped += 1
+                    return
+                elif self._overflow_policy is LogOverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._pending -= 1
+                    self._dropped += 1
+                else:
+                    self._cv.wait_for(lambda: len(self._queue) < self._queue_size or not self._running)
+
+            if self._running:
+                self._queue.append(record)
+                self._pending += 1
+                if self._writer_idle:
+                    self._cv.notify_all()
+                return
+
+        # Stopped writers no longer drain the queue, so write late records on the caller's thread
+        try:
+            self._write_fn([record])
+        except Exception:
+            pass
+
+    def flush(self, timeout: _typing.Optional[float] = None) -> bool:
+        with self._cv:
+            return self._cv.wait_for(lambda: self._pending == 0 or not self._thread.is_alive(), timeout)
+
+    def stop(self, timeout: _typing.Optional[float] = None) -> None:
+        self.flush(timeout)
+        with self._cv:
+            self._running = False
+            self._cv.notify_all()
+        if self._thread is not _threading.current_thread():
+            self._thread.join(timeout)
+
+    def _thread_fn(self):
+        while True:
+            with self._cv:
+                while not self._queue and self._running:
+                    self._writer_idle = True
+                    self._cv.wait()
+                self._writer_idle = False
+
+                if not self._queue:
+                    return
+
+                if self._linger > 0 and self._running:
+                    self._cv.wait_for(lambda: len(self._queue) >= self.MAX_BATCH_SIZE or not self._running,
+                                      self._linger)
+
+                batch = []
+                while self._queue and len(batch) < self.MAX_BATCH_SIZE:
+                    batch.append(self._queue.popleft())
+                self._cv.notify_all()
+
+            try:
+                self._write_fn(batch)
+            except Exception:
+                pass
+
+            with self._cv:
+                self._pending -= len(batch)
+                self._cv.notify_all()
+
+
+class LogRingBuffer:
+    MAGIC = b'PYCHIRPR'
+    VERSION = 1
+    HEADER_SIZE = 64
+
+    _HEADER = _struct.Struct('<8sIIIIII')
+    _SLOT_HEADER = _struct.Struct('<QQQHHBBH')
+    _STRING_LENGTH = _struct.Struct('<H')
+    _MARSHALLABLE_TYPES = (bool, int, float, complex, str, bytes, type(None))
+    _MAX_STRINGS = 0xFFFE
+    _MAX_FORMAT_LENGTH = 256
+    _FORMAT_SHARE = 0.75
+    _TRUNCATED = 0x01
+
+    def __init__(self, filename: _typing.Optional[str] = None, size: int = 4 * 1024 * 1024, slot_size: int = 128,
+                 string_table_size: int = 64 * 1024, verbosity: Verbosity = Verbosity.TRACE,
+                 fatal_dump_file: _typing.Optional[str] = None):
+        slot_count = (size - self.HEADER_SIZE - string_table_size) // slot_size
+        if slot_size <= self._SLOT_HEADER.size or slot_count < 1:
+            raise ValueError('Log ring buffer of {} bytes cannot hold any slots of {} bytes'.format(size, slot_size))
+
+        self._filename = filename
+        self._slot_size = slot_size
+        self._slot_count = slot_count
+        self._payload_capacity = slot_size - self._SLOT_HEADER.size
+        self._string_table_size = string_table_size
+        self._string_table_used = 0
+        self._slots_offset = self.HEADER_SIZE + string_table_size
+        self._verbosity = verbosity
+        self._fatal_dump_file = fatal_dump_file
+        self._strings = {}
+        self._counter = _itertools.count()
+        self._lock = _threading.Lock()
+        self._closed = False
+
+        total_size = self._slots_offset + slot_count * slot_size
+        if filename is None:
+            self._mmap = _mmap.mmap(-1, total_size)
+        else:
+            with open(filename, 'w+b') as file:
+                file.truncate(total_size)
+                self._mmap = _mmap.mmap(file.fileno(), total_size)
+        self._write_header()
+
+    @property
+    def filename(self) -> _typing.Optional[str]:
+        return self._filename
+
+    @property
+    def verbosity(self) -> Verbosity:
+        return self._verbosity
+
+    @property
+    def slot_size(self) -> int:
+        return self._slot_size
+
+    @property
+    def slot_count(self) -> int:
+        return self._slot_count
+
+    def write(self, severity: Verbosity, component: str, args: _typing.Sequence[_typing.Any]) -> None:
+        strings = self._strings
+        format_id = 0
+        # Only a leading string followed by more arguments is likely a literal; a lone string is usually formatted
+        if len(args) > 1 and type(args[0]) is str and len(args[0]) <= self._MAX_FORMAT_LENGTH:
+            format_id = strings.get(args[0]) or self._intern(args[0], self._FORMAT_SHARE)
+            if format_id:
+                args = args[1:]
+        component_id = strings.get(component) or self._intern(component)
+
+        try:
+            payload = _marshal.dumps(tuple(args))
+            flags = 0
+            if len(payload) > self._payload_capacity:
+                raise ValueError
+        except ValueError:
+            payload, flags = self._encode_args(args, self._payload_capacity)
+
+        seq = next(self._counter)
+        offset = self._slots_offset + seq % self._slot_count * self._slot_size
+        record = self._SLOT_HEADER.pack(seq + 1, _time.time_ns(), _threading.get_ident(), component_id, format_id,
+                                        severity.value, flags, len(payload)) + payload
+        try:
+            self._mmap[offset:offset + len(record)] = record
+        except ValueError:
+            # Closed while this thread was logging; the record has nowhere to go
+            return
+
+        if severity is Verbosity.FATAL:
+            self._on_fatal()
+
+    def records(self) -> _typing.List[LogRecord]:
+        return decode_log_ring_buffer(bytes(self._mmap))
+
+    def dump(self, filename: str) -> None:
+        with open(filename, 'wb') as file:
+            file.write(bytes(self._mmap))
+
+    def dump_text(self, filename: str) -> None:
+        with open(filename, 'w') as file:
+            file.writelines(format_log_record(record) + '\n' for record in self.records())
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._filename is not None and not self._closed:
+                self._mmap.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._mmap.close()
+
+    def _on_fatal(self):
+        self.flush()
+        if self._fatal_dump_file is not None:
+            try:
+                self.dump_text(self._fatal_dump_file)
+            except OSError:
+                pass
+
+    def _write_header(self):
+        self._HEADER.pack_into(self._mmap, 0, self.MAGIC, self.VERSION, _marshal.version, self._slot_size,
+                               self._slot_count, self._string_table_size, self._string_table_used)
+
+    def _intern(self, text, share=1.0):
+        with self._lock:
+            string_id = self._strings.get(text)
+            if string_id is not None:
+                return string_id
+
+            data = text.encode('utf-8')
+            entry_size = self._STRING_LENGTH.size + len(data)
+            if self._closed or len(self._strings) >= int(self._MAX_STRINGS * share) \
+                    or self._string_table_used + entry_size > int(self._string_table_size * share):
+                return 0
+
+            offset = self.HEADER_SIZE + self._string_table_used
+            self._STRING_LENGTH.pack_into(self._mmap, offset, len(data))
+            self._mmap[offset + self._STRING_LENGTH.size:offset + entry_size] = data
+            self._string_table_used += entry_size
+            self._write_header()
+
+            string_id = len(self._strings) + 1
+            self._strings[text] = string_id
+            return string_id
+
+    @classmethod
+    def _encode_args(cls, args, capacity):
+        try:
+            payload = _marshal.dumps(tuple(args))
+        except ValueError:
+            args = [arg() if isinstance(arg, LazyLogArgument) else arg for arg in args]
+            args = [arg if type(arg) in cls._MARSHALLABLE_TYPES else str(arg) for arg in args]
+            payload = _marshal.dumps(tuple(args))
+        if len(payload) <= capacity:
+            return payload, 0
+
+        text = ''.join(str(arg) for arg in args)[:capacity]
+        payload = _marshal.dumps((text,))
+        while len(payload) > capacity:
+            text = text[:len(text) - (len(payload) - capacity)]
+            payload = _marshal.dumps((text,))
+        return payload, cls._TRUNCATED
+
+
+def decode_log_ring_buffer(data: _typing.Union[bytes, str]) -> _typing.List[LogRecord]:
+    if isinstance(data, str):
+        with open(data, 'rb') as file:
+            data = file.read()
+
+    magic, version, marshal_version, slot_size, slot_count, string_table_size, string_table_used \
+        = LogRingBuffer._HEADER.unpack_from(data, 0)
+    if magic != LogRingBuffer.MAGIC or version != LogRingBuffer.VERSION:
+        raise ValueError('Not a PyCHIRP log ring buffer')
+    if marshal_version > _marshal.version:
+        raise ValueError('Log ring buffer was written by a newer Python version')
+
+    strings = [None]
+    pos = LogRingBuffer.HEADER_SIZE
+    end = LogRingBuffer.HEADER_SIZE + string_table_used
+    while pos < end:
+        length = LogRingBuffer._STRING_LENGTH.unpack_from(data, pos)[0]
+        pos += LogRingBuffer._STRING_LENGTH.size
+        strings.append(data[pos:pos + length].decode('utf-8', 'replace'))
+        pos += length
+
+    slots = []
+    slots_offset = LogRingBuffer.HEADER_SIZE + string_table_size
+    header = LogRingBuffer._SLOT_HEADER
+    for i in range(slot_count):
+        offset = slots_offset + i * slot_size
+        slot = header.unpack_from(data, offset)
+        if slot[0]:
+            slots.append((slot, offset + header.size))
+    slots.sort(key=lambda x: x[0][0])
+
+    records = []
+    for (seq, timestamp, thread_id, component_id, format_id, severity, flags, length), offset in slots:
+        try:
+            args = list(_marshal.loads(data[offset:offset + length]))
+        except (EOFError, ValueError, TypeError):
+            args = ['<corrupt record>']
+        if format_id:
+            args.insert(0, strings[format_id] if format_id < len(strings) else '?')
+        message = ''.join(str(arg) for arg in args)
+        if flags & LogRingBuffer._TRUNCATED:
+            message += '...'
+        component = strings[component_id] if 0 < component_id < len(strings) else '?'
+        records.append(LogRecord(timestamp, Verbosity(severity), component, thread_id, message))
+    return records
+
+
+def format_log_record(record: LogRecord) -> str:
+    return '{} [T{:05}] {} {}: {}'.format(Timestamp(record.timestamp), record.thread_id,
+                                          Logger._SEVERITY_TAGS[record.severity], record.component, record.message)
+
+
+# Log batches use the protobuf wire format of the chirp_4c4f4742 message published by the old API on /Log: a repeated
+# entries field whose entries have the chirp_000009cd shape, i.e. a timestamp and a (message, metadata) pair
+LOG_BATCH_SIGNATURE = 0x4c4f4742
+
+# Requests and responses of the verbosity service are JSON documents, see Logger.handle_verbosity_request()
+VERBOSITY_SERVICE_SIGNATURE = 0x4a534f4e
+
+_LOG_SEVERITIES_BY_NAME = dict(Verbosity.__members__, CRITICAL=Verbosity.FATAL)
+
+
+def _encode_varint(value: int) -> bytes:
+    data = bytearray()
+    while value > 0x7f:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def _encode_length_delimited(tag: int, data: bytes) -> bytes:
+    return _encode_varint(tag) + _encode_varint(len(data)) + data
+
+
+def _decode_varint(data: bytes, pos: int) -> _typing.Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def _decode_fields(data: bytes) -> _typing.Iterator[_typing.Tuple[int, _typing.Union[int, bytes]]]:
+    pos = 0
+    while pos < len(data):
+        key, pos = _decode_varint(data, pos)
+        wire_type = key & 0x07
+        if wire_type == 0:
+            value, pos = _decode_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = _decode_varint(data, pos)
+            value = bytes(data[pos:pos + length])
+            if len(value) != length:
+                raise ValueError('Truncated log batch')
+            pos += length
+        elif wire_type in (1, 5):
+            length = 8 if wire_type == 1 else 4
+            value = bytes(data[pos:pos + length])
+            pos += length
+        else:
+            raise ValueError('Unsupported wire type {} in log batch'.format(wire_type))
+        yield key >> 3, value
+
+
+def encode_log_batch(records: _typing.Iterable[LogRecord]) -> bytes:
+    entries = []
+    for record in records:
+        pair = _encode_length_delimited(0x0a, record.message.encode('utf-8', 'replace')) \
+            + _encode_length_delimited(0x12, record.metadata.encode('utf-8'))
+        entry = b'\x08' + _encode_varint(record.timestamp) + _encode_length_delimited(0x12, pair)
+        entries.append(_encode_length_delimited(0x0a, entry))
+    return b''.join(entries)
+
+
+def decode_log_batch(data: bytes) -> _typing.List[LogRecord]:
+    records = []
+    try:
+        for number, entry in _decode_fields(data):
+            if number != 1:
+                continue
+            timestamp, message, metadata = 0, '', ''
+            for entry_number, value in _decode_fields(entry):
+                if entry_number == 1:
+                    timestamp = value
+                elif entry_number == 2:
+                    for pair_number, text in _decode_fields(value):
+                        if pair_number == 1:
+                            message = text.decode('utf-8', 'replace')
+                        elif pair_number == 2:
+                            metadata = text.decode('utf-8', 'replace')
+
+            try:
+                info = _json.loads(metadata) if metadata else {}
+            except ValueError:
+                info = {}
+            severity = _LOG_SEVERITIES_BY_NAME.get(str(info.get('severity')).upper(), Verbosity.INFO)
+            records.append(LogRecord(timestamp, severity, info.get('component', '?'), info.get('thread', 0), message))
+    except (IndexError, TypeError, AttributeError) as e:
+        raise ValueError('Malformed log batch: {}'.format(e))
+    return records
+
+
+class Logger(metaclass=_ClassPropertyMeta):
     _colourised_stdout = False
     _max_verbosities = _Verbosities()
     _logger_verbosities = {}
+    _logger_throttles = {}
     _app_logger = None
     _chirp_logger = None
     _lock = _threading.Lock()
+    _async_writer = None
+    _chirp_log_publisher = None
+    _chirp_log_shipper = None
+    _chirp_log_terminal = None
+    _verbosity_service = None
+    _chirp_log_batch_interval = 0.005
+    _chirp_log_queue_size = 10000
+    _ring_buffer = None
+    _verbosity_observers = []
 
     if _platform.system() == 'Windows':
         _STD_OUTPUT_HANDLE = -11
@@ -476,7 +1541,7 @@ class Logger:
     @colourised_stdout.setter
     def colourised_stdout(cls, enabled: bool):
         cls._colourised_stdout = enabled
-        # TODO: notify ProcessInterface to update terminal
+        cls._notify_verbosity_observers()
 
     @_classproperty
     def max_stdout_verbosity(cls) -> Verbosity:
@@ -485,7 +1550,8 @@ class Logger:
     @max_stdout_verbosity.setter
     def max_stdout_verbosity(cls, verbosity: Verbosity):
         cls._max_verbosities.stdout = verbosity
-        # TODO: notify ProcessInterface to update terminal
+        cls._update_effective_verbosities()
+        cls._notify_verbosity_observers()
 
     @_classproperty
     def max_chirp_verbosity(cls) -> Verbosity:
@@ -494,63 +1560,375 @@ class Logger:
     @max_chirp_verbosity.setter
     def max_chirp_verbosity(cls, verbosity: Verbosity):
         cls._max_verbosities.chirp = verbosity
+        cls._update_effective_verbosities()
+        cls._notify_verbosity_observers()
+
+    @classmethod
+    def _update_effective_verbosities(cls):
+        for verbosities in list(cls._logger_verbosities.values()):
+            verbosities.update_effective(cls._max_verbosities)
+
+    @classmethod
+    def add_verbosity_observer(cls, fn: _typing.Callable[[_typing.Dict[str, _typing.Any]], None]) -> None:
+        with cls._lock:
+            cls._verbosity_observers = cls._verbosity_observers + [fn]
+
+    @classmethod
+    def remove_verbosity_observer(cls, fn: _typing.Callable[[_typing.Dict[str, _typing.Any]], None]) -> None:
+        with cls._lock:
+            cls._verbosity_observers = [x for x in cls._verbosity_observers if x != fn]
+
+    @classmethod
+    def _notify_verbosity_observers(cls):
+        observers = cls._verbosity_observers
+        if observers:
+            state = cls.get_verbosity_state()
+            for fn in observers:
+                fn(state)
+
+    @classmethod
+    def get_verbosity_state(cls) -> _typing.Dict[str, _typing.Any]:
+        return {
+            'colourised_stdout':    cls._colourised_stdout,
+            'max_stdout_verbosity': cls._max_verbosities.stdout.name,
+            'max_chirp_verbosity':  cls._max_verbosities.chirp.name,
+            'components': {
+                component: {
+                    'stdout_verbosity':           verbosities.stdout.name,
+                    'chirp_verbosity':            verbosities.chirp.name,
+                    'effective_stdout_verbosity': Verbosity(verbosities.effective_stdout).name,
+                    'effective_chirp_verbosity':  Verbosity(verbosities.effective_chirp).name
+                } for component, verbosities in list(cls._logger_verbosities.items())
+            }
+        }
+
+    @classmethod
+    def apply_verbosity_settings(cls, settings: _typing.Mapping[str, _typing.Any]) -> _typing.Dict[str, _typing.Any]:
+        def to_verbosity(name):
+            try:
+                return Verbosity[str(name).upper()]
+            except KeyError:
+                raise BadVerbosity(name)
+
+        components = {}
+        for component, values in settings.get('components', {}).items():
+            components[component] = {key: to_verbosity(values[key])
+                                     for key in ['stdout_verbosity', 'chirp_verbosity'] if key in values}
+        max_stdout = to_verbosity(settings['max_stdout_verbosity']) if 'max_stdout_verbosity' in settings else None
+        max_chirp = to_verbosity(settings['max_chirp_verbosity']) if 'max_chirp_verbosity' in settings else None
+
+        if 'colourised_stdout' in settings:
+            cls._colourised_stdout = bool(settings['colourised_stdout'])
+        if max_stdout is not None:
+            cls._max_verbosities.stdout = max_stdout
+        if max_chirp is not None:
+            cls._max_verbosities.chirp = max_chirp
+        for component, values in components.items():
+            verbosities = Logger(component)._verbosities
+            verbosities.stdout = values.get('stdout_verbosity', verbosities.stdout)
+            verbosities.chirp = values.get('chirp_verbosity', verbosities.chirp)
+
+        cls._update_effective_verbosities()
+        cls._notify_verbosity_observers()
+        return cls.get_verbosity_state()
+
+    @classmethod
+    def handle_verbosity_request(cls, request: str) -> str:
+        try:
+            settings = _json.loads(request) if request.strip() else {}
+            if not isinstance(settings, dict):
+                raise BadVerbosity(settings)
+            return _json.dumps(cls.apply_verbosity_settings(settings))
+        except (ValueError, TypeError, AttributeError, BadVerbosity) as e:
+            return _json.dumps({'error': str(e)})
+
+    @_classproperty
+    def verbosity_service(cls) -> _typing.Optional['ServiceTerminal']:
+        return cls._verbosity_service
+
+    @classmethod
+    def enable_verbosity_service(cls, leaf: 'Leaf', name: str = '/LoggingControl') -> 'ServiceTerminal':
+        with cls._lock:
+            if cls._verbosity_service is not None:
+                raise Exception('The verbosity service is already enabled')
+            terminal = cls._verbosity_service = ServiceTerminal(name, VERBOSITY_SERVICE_SIGNATURE, leaf=leaf)
+
+        def on_request(res, operation_id, data):
+            if not res:
+                return
+
+            response = cls.handle_verbosity_request(data.decode('utf-8', 'replace'))
+            try:
+                terminal.respond_to_request(operation_id, response.encode('utf-8'))
+            except Failure as e:
+                cls._chirp_logger.log_warning('Could not respond to a verbosity request on ', terminal.name, ': ', e)
+
+            try:
+                terminal.async_receive_request(on_request)
+            except Failure:
+                pass
+
+        terminal.async_receive_request(on_request)
+        return terminal
+
+    @classmethod
+    def disable_verbosity_service(cls) -> None:
+        with cls._lock:
+            terminal = cls._verbosity_service
+            cls._verbosity_service = None
+        if terminal is not None:
+            terminal.destroy()
 
     @_classproperty
     def app_logger(cls):
         return cls._app_logger
 
     @_classproperty
-    def chirp_logger(cls):
-        return cls._chirp_logger
+    def async_stdout(cls) -> bool:
+        return cls._async_writer is not None
+
+    @_classproperty
+    def dropped_stdout_records(cls) -> int:
+        writer = cls._async_writer
+        return writer.dropped if writer else 0
 
     @classmethod
-    def _reset_colours(cls):
-        if not cls.colourised_stdout or not _sys.stdout.isatty():
-            return
+    def enable_async_stdout(cls, queue_size: int = 10000,
+                            overflow_policy: LogOverflowPolicy = LogOverflowPolicy.DROP_OLDEST) -> None:
+        with cls._lock:
+            if cls._async_writer is not None:
+                raise Exception('Asynchronous stdout logging is already enabled')
+            cls._async_writer = _AsyncLogWriter(cls._write_stdout, queue_size, overflow_policy)
 
-        if _platform.system() == 'Windows':
-            _ctypes.windll.kernel32.SetConsoleTextAttribute(cls._win32_stdout_handle, cls._win32_original_colours)
-        else:
-            print('\033[0m', end='')
+    @classmethod
+    def disable_async_stdout(cls, timeout: _typing.Optional[float] = None) -> None:
+        with cls._lock:
+            writer = cls._async_writer
+            cls._async_writer = None
+        if writer is not None:
+            writer.stop(timeout)
+
+    @_classproperty
+    def chirp_log_publisher(cls) -> _typing.Optional[_typing.Callable[[_typing.List[LogRecord]], None]]:
+        return cls._chirp_log_publisher
+
+    @chirp_log_publisher.setter
+    def chirp_log_publisher(cls, fn: _typing.Optional[_typing.Callable[[_typing.List[LogRecord]], None]]):
+        with cls._lock:
+            shipper = cls._chirp_log_shipper
+            cls._chirp_log_publisher = fn
+            cls._chirp_log_shipper = None
+            if fn is not None:
+                cls._chirp_log_shipper = _AsyncLogWriter(fn, cls._chirp_log_queue_size, LogOverflowPolicy.DROP_OLDEST,
+                                                         cls._chirp_log_batch_interval)
+        if shipper is not None:
+            shipper.stop(1.0)
+
+    @_classproperty
+    def chirp_log_batch_interval(cls) -> float:
+        return cls._chirp_log_batch_interval
+
+    @chirp_log_batch_interval.setter
+    def chirp_log_batch_interval(cls, seconds: float):
+        cls._chirp_log_batch_interval = seconds
+        cls.chirp_log_publisher = cls._chirp_log_publisher
+
+    @_classproperty
+    def chirp_log_queue_size(cls) -> int:
+        return cls._chirp_log_queue_size
+
+    @chirp_log_queue_size.setter
+    def chirp_log_queue_size(cls, size: int):
+        cls._chirp_log_queue_size = size
+        cls.chirp_log_publisher = cls._chirp_log_publisher
+
+    @_classproperty
+    def dropped_chirp_records(cls) -> int:
+        shipper = cls._chirp_log_shipper
+        return shipper.dropped if shipper else 0
+
+    @_classproperty
+    def chirp_log_terminal(cls) -> _typing.Optional['ProducerTerminal']:
+        return cls._chirp_log_terminal
 
     @classmethod
-    def _set_colour(cls, severity):
-        if not cls.colourised_stdout or not _sys.stdout.isatty():
-            return
+    def enable_chirp_log_terminal(cls, leaf: 'Leaf', name: str = '/Log') -> 'ProducerTerminal':
+        with cls._lock:
+            if cls._chirp_log_terminal is not None:
+                raise Exception('The CHIRP log terminal is already enabled')
+            terminal = cls._chirp_log_terminal = ProducerTerminal(name, LOG_BATCH_SIGNATURE, leaf=leaf)
+        cls.chirp_log_publisher = lambda records: terminal.try_publish(encode_log_batch(records))
+        return terminal
 
-        if _platform.system() == 'Windows':
-            colour = {
-                Verbosity.TRACE:   6,
-                Verbosity.DEBUG:   10,
-                Verbosity.INFO:    15,
-                Verbosity.WARNING: 14,
-                Verbosity.ERROR:   12,
-                Verbosity.FATAL:   15 | 64
-            }[severity]
-            _ctypes.windll.kernel32.SetConsoleTextAttribute(cls._win32_stdout_handle, colour)
-        else:
-            seq = {
-                Verbosity.TRACE:   '\033[22;33m',
-                Verbosity.DEBUG:   '\033[01;32m',
-                Verbosity.INFO:    '\033[01;37m',
-                Verbosity.WARNING: '\033[01;33m',
-                Verbosity.ERROR:   '\033[01;31m',
-                Verbosity.FATAL:   '\033[41m\033[01;37m'
-            }[severity]
-            print(seq, end='')
+    @classmethod
+    def disable_chirp_log_terminal(cls) -> None:
+        with cls._lock:
+            terminal = cls._chirp_log_terminal
+            cls._chirp_log_terminal = None
+        if terminal is not None:
+            cls.chirp_log_publisher = None
+            terminal.destroy()
+
+    @_classproperty
+    def ring_buffer(cls) -> _typing.Optional[LogRingBuffer]:
+        return cls._ring_buffer
+
+    @classmethod
+    def enable_ring_buffer(cls, filename: _typing.Optional[str] = None, size: int = 4 * 1024 * 1024,
+                           slot_size: int = 128, verbosity: Verbosity = Verbosity.TRACE,
+                           fatal_dump_file: _typing.Optional[str] = None) -> LogRingBuffer:
+        with cls._lock:
+            if cls._ring_buffer is not None:
+                raise Exception('The log ring buffer is already enabled')
+            cls._ring_buffer = LogRingBuffer(filename, size, slot_size, verbosity=verbosity,
+                                             fatal_dump_file=fatal_dump_file)
+            cls._max_verbosities.ring = verbosity.value
+            for component in list(cls._logger_verbosities):
+                cls._ring_buffer._intern(component)
+        cls._update_effective_verbosities()
+        return cls._ring_buffer
+
+    @classmethod
+    def disable_ring_buffer(cls) -> None:
+        with cls._lock:
+            ring_buffer = cls._ring_buffer
+            cls._ring_buffer = None
+            cls._max_verbosities.ring = -1
+        cls._update_effective_verbosities()
+        if ring_buffer is not None:
+            # Not closed: other threads may still be writing to it; the mapping goes away with the last reference
+            ring_buffer.flush()
+
+    @classmethod
+    def flush(cls, timeout: _typing.Optional[float] = None) -> bool:
+        flushed = True
+        for writer in [cls._async_writer, cls._chirp_log_shipper]:
+            if writer is not None:
+                flushed = writer.flush(timeout) and flushed
+        return flushed
+
+    @classmethod
+    def _shutdown(cls):
+        cls.disable_async_stdout(5.0)
+        cls.chirp_log_publisher = None
+        ring_buffer = cls._ring_buffer
+        if ring_buffer is not None:
+            ring_buffer.flush()
+
+    @_classproperty
+    def chirp_logger(cls):
+        return cls._chirp_logger
+
+    _WIN32_COLOURS = {
+        Verbosity.TRACE:   6,
+        Verbosity.DEBUG:   10,
+        Verbosity.INFO:    15,
+        Verbosity.WARNING: 14,
+        Verbosity.ERROR:   12,
+        Verbosity.FATAL:   15 | 64
+    }
+
+    _ANSI_COLOURS = {
+        Verbosity.TRACE:   '\033[22;33m',
+        Verbosity.DEBUG:   '\033[01;32m',
+        Verbosity.INFO:    '\033[01;37m',
+        Verbosity.WARNING: '\033[01;33m',
+        Verbosity.ERROR:   '\033[01;31m',
+        Verbosity.FATAL:   '\033[41m\033[01;37m'
+    }
+
+    _ANSI_RESET = '\033[0m'
+
+    _SEVERITY_TAGS = {
+        Verbosity.FATAL:   'FAT',
+        Verbosity.ERROR:   'ERR',
+        Verbosity.WARNING: 'WRN',
+        Verbosity.INFO:    'IFO',
+        Verbosity.DEBUG:   'DBG',
+        Verbosity.TRACE:   'TRC'
+    }
+
+    @classmethod
+    def _write_stdout(cls, records):
+        colourised = cls._colourised_stdout and _sys.stdout.isatty()
+
+        with cls._lock:
+            if colourised and _platform.system() == 'Windows':
+                for severity, timestamp, thread_id, text in records:
+                    _ctypes.windll.kernel32.SetConsoleTextAttribute(cls._win32_stdout_handle,
+                                                                    cls._win32_original_colours)
+                    _sys.stdout.write('{} [T{:05}] '.format(timestamp, thread_id))
+                    _sys.stdout.flush()
+                    _ctypes.windll.kernel32.SetConsoleTextAttribute(cls._win32_stdout_handle,
+                                                                    cls._WIN32_COLOURS[severity])
+                    _sys.stdout.write(text)
+                    _sys.stdout.flush()
+                    _ctypes.windll.kernel32.SetConsoleTextAttribute(cls._win32_stdout_handle,
+                                                                    cls._win32_original_colours)
+                    _sys.stdout.write('\n')
+            elif colourised:
+                _sys.stdout.write(''.join(['{}{} [T{:05}] {}{}{}\n'.format(
+                    cls._ANSI_RESET, timestamp, thread_id, cls._ANSI_COLOURS[severity], text, cls._ANSI_RESET)
+                    for severity, timestamp, thread_id, text in records]))
+            else:
+                _sys.stdout.write(''.join(['{} [T{:05}] {}\n'.format(timestamp, thread_id, text)
+                                           for severity, timestamp, thread_id, text in records]))
+
+            _sys.stdout.flush()
 
     def __init__(self, component: _typing.Optional[str] = None):
         self._component = component if component else 'app'
         if self._component not in self._logger_verbosities:
             self._verbosities = _Verbosities()
+            self._verbosities.update_effective(self._max_verbosities)
             self._logger_verbosities[self._component] = self._verbosities
         else:
             self._verbosities = self._logger_verbosities[self._component]
+        self._throttle = self._logger_throttles.get(self._component)
+        if self._throttle is None:
+            self._throttle = self._logger_throttles.setdefault(self._component, _Throttle(self._emit))
+        ring_buffer = self._ring_buffer
+        if ring_buffer is not None:
+            ring_buffer._intern(self._component)
 
     @property
     def component(self) -> str:
         return self._component
 
+    @property
+    def rate_limited_records(self) -> int:
+        return self._throttle.rate_limited
+
+    @property
+    def deduplicated_records(self) -> int:
+        return self._throttle.deduplicated
+
+    @property
+    def suppressed_records(self) -> int:
+        return self._throttle.rate_limited + self._throttle.deduplicated
+
+    @property
+    def dedupe_window(self) -> _typing.Optional[float]:
+        return self._throttle.dedupe_window
+
+    @dedupe_window.setter
+    def dedupe_window(self, seconds: _typing.Optional[float]):
+        with self._throttle.lock:
+            self._throttle.dedupe_window = seconds
+            self._throttle.configure()
+
+    def set_rate_limit(self, rate: float, burst: _typing.Optional[int] = None, per_call_site: bool = False) -> None:
+        with self._throttle.lock:
+            self._throttle.rate = rate
+            self._throttle.burst = burst if burst is not None else max(1, int(rate))
+            self._throttle.per_call_site = per_call_site
+            self._throttle.configure()
+
+    def clear_rate_limit(self) -> None:
+        with self._throttle.lock:
+            self._throttle.rate = None
+            self._throttle.configure()
+
     @property
     def stdout_verbosity(self) -> Verbosity:
         return self._verbosities.stdout
@@ -558,7 +1936,8 @@ class Logger:
     @stdout_verbosity.setter
     def stdout_verbosity(self, verbosity: Verbosity):
         self._verbosities.stdout = verbosity
-        # TODO: notify ProcessInterface to update terminal
+        self._verbosities.update_effective(self._max_verbosities)
+        self._notify_verbosity_observers()
 
     @property
     def chirp_verbosity(self) -> Verbosity:
@@ -567,101 +1946,140 @@ class Logger:
     @chirp_verbosity.setter
     def chirp_verbosity(self, verbosity: Verbosity):
         self._verbosities.chirp = verbosity
-        # TODO: notify ProcessInterface to update terminal
+        self._verbosities.update_effective(self._max_verbosities)
+        self._notify_verbosity_observers()
 
     @property
     def effective_stdout_verbosity(self) -> Verbosity:
-        return Verbosity(min(self.max_stdout_verbosity.value, self.stdout_verbosity.value))
+        return Verbosity(self._verbosities.effective_stdout)
 
     @property
     def effective_chirp_verbosity(self) -> Verbosity:
-        return Verbosity(min(self.max_chirp_verbosity.value, self.chirp_verbosity.value))
+        return Verbosity(self._verbosities.effective_chirp)
 
     @property
     def max_effective_verbosity(self):
-        return Verbosity(max(self.effective_stdout_verbosity.value, self.effective_chirp_verbosity.value))
+        return Verbosity(self._verbosities.max_effective)
 
     def log(self, severity: Verbosity, *args):
-        timestamp = Timestamp()
-        thread_id = _threading.get_ident()
+        if severity.value <= self._verbosities.max_effective:
+            self._log(severity, args)
+
+    def _log(self, severity, args):
+        ring_buffer = self._ring_buffer
+        if ring_buffer is not None and severity.value <= self._max_verbosities.ring \
+                and severity.value > self._verbosities.max_emitted:
+            ring_buffer.write(severity, self._component, args)
+            return
 
-        severity_tag = {
-            Verbosity.FATAL:   'TRC',
-            Verbosity.ERROR:   'DBG',
-            Verbosity.WARNING: 'IFO',
-            Verbosity.INFO:    'WRN',
-            Verbosity.DEBUG:   'ERR',
-            Verbosity.TRACE:   'FAT'
-        }[severity]
+        throttle = self._throttle
+        throttled = throttle.enabled and severity is not Verbosity.FATAL
+        if throttled:
+            call_site = None
+            if throttle.per_call_site:
+                frame = _sys._getframe(1)
+                while frame.f_back is not None and frame.f_code.co_filename == __file__:
+                    frame = frame.f_back
+                call_site = (frame.f_code.co_filename, frame.f_lineno)
+
+            accepted, bucket = throttle.admit(severity, args, call_site)
+            if not accepted:
+                return
 
-        if severity.value <= self.effective_stdout_verbosity.value:
-            s1 = '{} [T{:05}] '.format(timestamp, thread_id)
-            s2 = '{} {}: {}'.format(severity_tag, self._component, ''.join([str(arg) for arg in args]))
+        raw_args = args
+        if ring_buffer is not None and severity.value <= self._max_verbosities.ring:
+            args = [arg() if isinstance(arg, LazyLogArgument) else arg for arg in args]
+            ring_buffer.write(severity, self._component, args)
 
-            with self._lock:
-                self._reset_colours()
-                print(s1, end='')
-                _sys.stdout.flush()
-                self._set_colour(severity)
-                print(s2, end='')
-                _sys.stdout.flush()
-                self._reset_colours()
-                print('')
-                _sys.stdout.flush()
-
-        if severity.value <= self.effective_chirp_verbosity.value:
-            # TODO: log via terminal
-            pass
+        message = ''.join([str(arg() if isinstance(arg, LazyLogArgument) else arg) for arg in args])
 
-    def log_trace(self, *args):
-        self.log(Verbosity.TRACE, *args)
+        if throttled:
+            accepted, notes = throttle.filter(severity, raw_args, message, bucket)
+            for note_severity, note in notes:
+                self._emit(note_severity, note)
+            if not accepted:
+                return
+
+        self._emit(severity, message)
+
+    def _emit(self, severity, message):
+        verbosities = self._verbosities
+        timestamp = Timestamp()
+        thread_id = _threading.get_ident()
+
+        if severity.value <= verbosities.effective_stdout:
+            text = '{} {}: {}'.format(self._SEVERITY_TAGS[severity], self._component, message)
+
+            writer = self._async_writer
+            if writer is None:
+                self._write_stdout([(severity, timestamp, thread_id, text)])
+            else:
+                writer.put((severity, timestamp, thread_id, text))
+                if severity is Verbosity.FATAL:
+                    writer.flush()
+
+        if severity.value <= verbosities.effective_chirp:
+            shipper = self._chirp_log_shipper
+            if shipper is not None:
+                shipper.put(LogRecord(timestamp.ns_since_epoch, severity, self._component, thread_id, message))
+                if severity is Verbosity.FATAL:
+                    shipper.flush(1.0)
+
+    def log_trace(self, *args):
+        if self._verbosities.max_effective >= _TRACE:
+            self._log(Verbosity.TRACE, args)
 
     def log_debug(self, *args):
-        self.log(Verbosity.DEBUG, *args)
+        if self._verbosities.max_effective >= _DEBUG:
+            self._log(Verbosity.DEBUG, args)
 
     def log_info(self, *args):
-        self.log(Verbosity.INFO, *args)
+        if self._verbosities.max_effective >= _INFO:
+            self._log(Verbosity.INFO, args)
 
     def log_warning(self, *args):
-        self.log(Verbosity.WARNING, *args)
+        if self._verbosities.max_effective >= _WARNING:
+            self._log(Verbosity.WARNING, args)
 
     def log_error(self, *args):
-        self.log(Verbosity.ERROR, *args)
+        if self._verbosities.max_effective >= _ERROR:
+            self._log(Verbosity.ERROR, args)
 
     def log_fatal(self, *args):
-        self.log(Verbosity.FATAL, *args)
+        self._log(Verbosity.FATAL, args)
 
 
 Logger._app_logger = Logger()
 Logger._chirp_logger = Logger('PyCHIRP')
+_atexit.register(Logger._shutdown)
 
 
 def log(verbosity: Verbosity, *args):
-    Logger.app_logger.log(verbosity, *args)
+    Logger._app_logger.log(verbosity, *args)
 
 
 def log_trace(*args):
-    log(Verbosity.TRACE, *args)
+    Logger._app_logger.log_trace(*args)
 
 
 def log_debug(*args):
-    log(Verbosity.DEBUG, *args)
+    Logger._app_logger.log_debug(*args)
 
 
 def log_info(*args):
-    log(Verbosity.INFO, *args)
+    Logger._app_logger.log_info(*args)
 
 
 def log_warning(*args):
-    log(Verbosity.WARNING, *args)
+    Logger._app_logger.log_warning(*args)
 
 
 def log_error(*args):
-    log(Verbosity.ERROR, *args)
+    Logger._app_logger.log_error(*args)
 
 
 def log_fatal(*args):
-    log(Verbosity.FATAL, *args)
+    Logger._app_logger.log_fatal(*args)
 
 
 # ======================================================================================================================
@@ -810,33 +2228,65 @@ _chirp.CHIRP_CreateLocalConnection.restype = _api_result_handler
 _chirp.CHIRP_CreateLocalConnection.argtypes = [_ctypes.POINTER(_ctypes.c_void_p), _ctypes.c_void_p, _ctypes.c_void_p]
 
 
+class ConnectionInfo(_collections.namedtuple('ConnectionInfo', ['description', 'remote_version',
+                                                                 'remote_identification'])):
+    __slots__ = ()
+
+
 class Connection(Object):
     STRING_BUFFER_SIZE = 128
 
     def __init__(self, handle: _ctypes.c_void_p):
         Object.__init__(self, handle)
+        self._info = None
 
     @property
     def description(self) -> str:
-        buffer = _ctypes.create_string_buffer(self.STRING_BUFFER_SIZE)
-        _chirp.CHIRP_GetConnectionDescription(self._handle, buffer, _ctypes.sizeof(buffer))
-        return _ctypes.string_at(_ctypes.addressof(buffer)).decode()
+        return self.info.description
 
     @property
     def remote_version(self) -> str:
-        buffer = _ctypes.create_string_buffer(self.STRING_BUFFER_SIZE)
-        _chirp.CHIRP_GetRemoteVersion(self._handle, buffer, _ctypes.sizeof(buffer))
-        return _ctypes.string_at(_ctypes.addressof(buffer)).decode()
+        return self.info.remote_version
 
     @property
     def remote_identification(self) -> _typing.Optional[str]:
-        buffer = _ctypes.create_string_buffer(self.STRING_BUFFER_SIZE)
+        return self.info.remote_identification
+
+    @property
+    def info(self) -> ConnectionInfo:
+        info = self._info
+        if info is None:
+            info = self._info = self._fetch_info(_ctypes.create_string_buffer(self.STRING_BUFFER_SIZE))
+        return info
+
+    @classmethod
+    def snapshot(cls, connections: _typing.Iterable['Connection']) -> _typing.List[ConnectionInfo]:
+        buffer = None
+        infos = []
+        for connection in connections:
+            info = connection._info
+            if info is None:
+                if buffer is None:
+                    buffer = _ctypes.create_string_buffer(cls.STRING_BUFFER_SIZE)
+                info = connection._info = connection._fetch_info(buffer)
+            infos.append(info)
+        return infos
+
+    def _fetch_info(self, buffer):
+        address = _ctypes.addressof(buffer)
+        size = _ctypes.sizeof(buffer)
+
+        _chirp.CHIRP_GetConnectionDescription(self._handle, buffer, size)
+        description = _ctypes.string_at(address).decode()
+
+        _chirp.CHIRP_GetRemoteVersion(self._handle, buffer, size)
+        remote_version = _ctypes.string_at(address).decode()
+
         bytes_written = _ctypes.c_uint()
-        _chirp.CHIRP_GetRemoteIdentification(self._handle, buffer, _ctypes.sizeof(buffer), _ctypes.byref(bytes_written))
-        if bytes_written.value == 0:
-            return None
-        else:
-            return _ctypes.string_at(_ctypes.addressof(buffer)).decode()
+        _chirp.CHIRP_GetRemoteIdentification(self._handle, buffer, size, _ctypes.byref(bytes_written))
+        remote_identification = _ctypes.string_at(address).decode() if bytes_written.value else None
+
+        return ConnectionInfo(description, remote_version, remote_identification)
 
 
 class LocalConnection(Connection):
@@ -869,6 +2319,176 @@ class TcpConnection(NonLocalConnection):
         NonLocalConnection.__init__(self, handle)
 
 
+class _ResolverEntry:
+    __slots__ = ('address', 'expires', 'handlers')
+
+    def __init__(self):
+        self.address = None
+        self.expires = None
+        self.handlers = None
+
+
+class ResolverCache:
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 5.0, family: int = _socket.AF_UNSPEC):
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._family = family
+        self._entries = {}
+        self._queue = _collections.deque()
+        self._completions = _collections.deque()
+        self._cv = _threading.Condition(_threading.Lock())
+        self._thread = None
+        self._stats = dict.fromkeys(['hits', 'stale_hits', 'negative_hits', 'misses', 'lookups', 'lookup_failures'],
+                                    0)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def negative_ttl(self) -> float:
+        return self._negative_ttl
+
+    @property
+    def stats(self) -> _typing.Dict[str, int]:
+        with self._cv:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            return stats
+
+    def get_cached_address(self, host: str) -> _typing.Optional[str]:
+        with self._cv:
+            entry = self._entries.get(host)
+            return None if entry is None else entry.address
+
+    def prefetch(self, hosts: _typing.Iterable[str]) -> None:
+        with self._cv:
+            for host in hosts:
+                if not self._is_literal(host):
+                    entry = self._entries.get(host)
+                    if entry is None or (entry.handlers is None and entry.expires <= _time.monotonic()):
+                        self._enqueue(host, entry)
+
+    def invalidate(self, host: _typing.Optional[str] = None) -> None:
+        with self._cv:
+            for key in [host] if host is not None else list(self._entries):
+                entry = self._entries.get(key)
+                if entry is not None and entry.handlers is None:
+                    del self._entries[key]
+
+    def async_resolve(self, host: str,
+                      completion_handler: _typing.Callable[[Result, _typing.Optional[str]], None]) -> None:
+        if self._is_literal(host):
+            completion_handler(Success(), host)
+            return
+
+        with self._cv:
+            entry = self._entries.get(host)
+            if entry is None or (entry.address is None and entry.handlers is not None):
+                self._stats['misses'] += 1
+                entry = self._enqueue(host, entry)
+                entry.handlers.append(completion_handler)
+                return
+
+            address = entry.address
+            if entry.expires > _time.monotonic():
+                self._stats['hits' if address is not None else 'negative_hits'] += 1
+            elif address is not None:
+                self._stats['stale_hits'] += 1
+                if entry.handlers is None:
+                    self._enqueue(host, entry)
+            else:
+                self._stats['misses'] += 1
+                entry = self._enqueue(host, entry)
+                entry.handlers.append(completion_handler)
+                return
+
+        if address is None:
+            completion_handler(ResolveFailed(), None)
+        else:
+            completion_handler(Success(), address)
+
+    @staticmethod
+    def _is_literal(host):
+        for family in (_socket.AF_INET, _socket.AF_INET6):
+            try:
+                _socket.inet_pton(family, host)
+                return True
+            except (OSError, ValueError):
+                pass
+        return False
+
+    def _enqueue(self, host, entry):
+        if entry is None:
+            entry = self._entries[host] = _ResolverEntry()
+        if entry.handlers is None:
+            entry.handlers = []
+            self._queue.append(host)
+            self._wake()
+        return entry
+
+    def _post(self, fn, *args):
+        with self._cv:
+            self._completions.append((fn, args))
+            self._wake()
+
+    def _wake(self):
+        if self._thread is None:
+            self._thread = _threading.Thread(target=self._thread_fn, name='pychirp resolver')
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self._cv.notify()
+
+    def _thread_fn(self):
+        while True:
+            with self._cv:
+                if self._completions:
+                    fn, args = self._completions.popleft()
+                    host = None
+                elif self._queue:
+                    host = self._queue.popleft()
+                    self._stats['lookups'] += 1
+                else:
+                    self._thread = None
+                    return
+
+            if host is None:
+                try:
+                    fn(*args)
+                except Exception as err:
+                    Logger.chirp_logger.log_error('Resolver completion handler failed: ', err)
+                continue
+
+            try:
+                address = _socket.getaddrinfo(host, None, self._family, _socket.SOCK_STREAM)[0][4][0]
+            except (OSError, UnicodeError, IndexError):
+                address = None
+
+            with self._cv:
+                entry = self._entries.setdefault(host, _ResolverEntry())
+                handlers, entry.handlers = entry.handlers or [], None
+                if address is None:
+                    self._stats['lookup_failures'] += 1
+                    entry.expires = _time.monotonic() + self._negative_ttl
+                    address = entry.address
+                else:
+                    entry.address = address
+                    entry.expires = _time.monotonic() + self._ttl
+
+            for handler in handlers:
+                try:
+                    if address is None:
+                        handler(ResolveFailed(), None)
+                    else:
+                        handler(Success(), address)
+                except Exception as err:
+                    Logger.chirp_logger.log_error('Resolver completion handler failed: ', err)
+
+    def __str__(self):
+        return 'ResolverCache(ttl={}, negative_ttl={})'.format(self._ttl, self._negative_ttl)
+
+
 _chirp.CHIRP_CreateTcpClient.restype = _api_result_handler
 _chirp.CHIRP_CreateTcpClient.argtypes = [_ctypes.POINTER(_ctypes.c_void_p), _ctypes.c_void_p, _ctypes.c_void_p,
                                          _ctypes.c_uint]
@@ -883,7 +2503,8 @@ _chirp.CHIRP_CancelTcpConnect.argtypes = [_ctypes.c_void_p]
 
 
 class TcpClient(Object):
-    def __init__(self, scheduler: Scheduler, identification: _typing.Optional[str] = None):
+    def __init__(self, scheduler: Scheduler, identification: _typing.Optional[str] = None,
+                 resolver: _typing.Optional[ResolverCache] = None):
         handle = _ctypes.c_void_p()
         if identification is None:
             _chirp.CHIRP_CreateTcpClient(_ctypes.byref(handle), scheduler._handle, _ctypes.c_void_p(), 0)
@@ -893,6 +2514,9 @@ class TcpClient(Object):
         Object.__init__(self, handle)
         self._scheduler = scheduler
         self._identification = identification
+        self._resolver = resolver
+        self._resolve_lock = _threading.Lock()
+        self._pending_resolve = None
 
     @property
     def scheduler(self) -> Scheduler:
@@ -902,6 +2526,10 @@ class TcpClient(Object):
     def identification(self) -> _typing.Optional[str]:
         return self._identification
 
+    @property
+    def resolver(self) -> _typing.Optional[ResolverCache]:
+        return self._resolver
+
     def async_connect(self, host: str, port: int, handshake_timeout: _typing.Optional[float],
                       completion_handler: _typing.Callable[[Result, _typing.Optional[TcpConnection]], None]) -> None:
         def fn(res, connection_handle):
@@ -910,11 +2538,49 @@ class TcpClient(Object):
                 connection = TcpConnection(_ctypes.cast(connection_handle, _ctypes.c_void_p))
             completion_handler(res, connection)
 
-        _chirp.CHIRP_AsyncTcpConnect(self._handle, host.encode('utf-8'), port, _make_api_timeout(handshake_timeout),
-                                     _wrap_callback(_chirp.CHIRP_AsyncTcpConnect.argtypes[4], fn), _ctypes.c_void_p())
+        def connect(address):
+            _chirp.CHIRP_AsyncTcpConnect(self._handle, address.encode('utf-8'), port,
+                                         _make_api_timeout(handshake_timeout),
+                                         _wrap_callback(_chirp.CHIRP_AsyncTcpConnect.argtypes[4], fn),
+                                         _ctypes.c_void_p())
+
+        if self._resolver is None:
+            connect(host)
+            return
+
+        pending = [completion_handler]
+        with self._resolve_lock:
+            if self._pending_resolve is not None:
+                raise AsyncOperationRunning()
+            self._pending_resolve = pending
+
+        def on_resolved(res, address):
+            with self._resolve_lock:
+                if self._pending_resolve is not pending:
+                    return
+                self._pending_resolve = None
+
+                # Issue the connect while holding the lock so that a concurrent cancel_connect() either sees the
+                # pending resolve or finds the connect already running in libchirp
+                if res:
+                    try:
+                        connect(address)
+                        return
+                    except Failure as err:
+                        res = err
+
+            self._resolver._post(completion_handler, res, None)
+
+        self._resolver.async_resolve(host, on_resolved)
 
     def cancel_connect(self) -> None:
-        _chirp.CHIRP_CancelTcpConnect(self._handle)
+        with self._resolve_lock:
+            pending, self._pending_resolve = self._pending_resolve, None
+
+        if pending is None:
+            _chirp.CHIRP_CancelTcpConnect(self._handle)
+        else:
+            self._resolver._post(pending[0], Canceled(), None)
 
 
 _chirp.CHIRP_CreateTcpServer.restype = _api_result_handler
@@ -978,28 +2644,221 @@ class TcpServer(Object):
         _chirp.CHIRP_CancelTcpAccept(self._handle)
 
 
+class BadTcpTarget(Exception):
+    def __init__(self, target: str):
+        self._target = target
+
+    def __str__(self):
+        return 'Invalid TCP target: \'{}\''.format(self._target)
+
+
+class TcpTarget(_collections.namedtuple('TcpTarget', ['host', 'port'])):
+    __slots__ = ()
+
+    @staticmethod
+    def parse(target: str) -> 'TcpTarget':
+        host, _, port = target.strip().rpartition(':')
+        if host.startswith('[') and host.endswith(']'):
+            host = host[1:-1]
+        if not host or not port.isdigit() or not 0 < int(port) <= 65535:
+            raise BadTcpTarget(target)
+        return TcpTarget(host, int(port))
+
+    def __str__(self):
+        return ('[{}]:{}' if ':' in self.host else '{}:{}').format(self.host, self.port)
+
+
+class ReconnectPolicy:
+    def __init__(self, initial_delay: float = 1.0, multiplier: float = 2.0, max_delay: float = 30.0,
+                 jitter: bool = True, reset_after: float = 10.0):
+        self._initial_delay = initial_delay
+        self._multiplier = multiplier
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._reset_after = reset_after
+
+    @property
+    def initial_delay(self) -> float:
+        return self._initial_delay
+
+    @property
+    def multiplier(self) -> float:
+        return self._multiplier
+
+    @property
+    def max_delay(self) -> float:
+        return self._max_delay
+
+    @property
+    def jitter(self) -> bool:
+        return self._jitter
+
+    @property
+    def reset_after(self) -> float:
+        return self._reset_after
+
+    def get_delay(self, attempt: int) -> float:
+        delay = min(self._max_delay, self._initial_delay * self._multiplier ** min(attempt, 64))
+        return _random.uniform(0, delay) if self._jitter else delay
+
+    def __str__(self):
+        return 'ReconnectPolicy(initial_delay={}, multiplier={}, max_delay={}, jitter={}, reset_after={})'.format(
+            self._initial_delay, self._multiplier, self._max_delay, self._jitter, self._reset_after)
+
+
+class ReconnectAttempt(_collections.namedtuple('ReconnectAttempt', ['attempt', 'delay'])):
+    __slots__ = ()
+
+
+class _Timer:
+    __slots__ = ('deadline', 'fn', 'cancelled')
+
+    def __init__(self, deadline, fn):
+        self.deadline = deadline
+        self.fn = fn
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return self.deadline < other.deadline
+
+
+class _TimerScheduler:
+    def __init__(self, name: str):
+        self._name = name
+        self._heap = []
+        self._cancelled = 0
+        self._cv = _threading.Condition(_threading.Lock())
+        self._thread = None
+
+    @property
+    def pending(self) -> int:
+        with self._cv:
+            return len(self._heap) - self._cancelled
+
+    @property
+    def running(self) -> bool:
+        with self._cv:
+            return self._thread is not None
+
+    def schedule(self, delay: float, fn: _typing.Callable[[], None]) -> _Timer:
+        timer = _Timer(_time.monotonic() + delay, fn)
+        with self._cv:
+            _heapq.heappush(self._heap, timer)
+            if self._thread is None:
+                self._thread = _threading.Thread(target=self._thread_fn, name=self._name)
+                self._thread.daemon = True
+                self._thread.start()
+            elif self._heap[0] is timer:
+                self._cv.notify()
+        return timer
+
+    def cancel(self, timer: _Timer) -> None:
+        with self._cv:
+            if timer.cancelled or timer.fn is None:
+                return
+            timer.cancelled = True
+            timer.fn = None
+            self._cancelled += 1
+            if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+                self._heap = [x for x in self._heap if not x.cancelled]
+                _heapq.heapify(self._heap)
+                self._cancelled = 0
+                self._cv.notify()
+
+    def _thread_fn(self):
+        while True:
+            with self._cv:
+                while True:
+                    while self._heap and self._heap[0].cancelled:
+                        _heapq.heappop(self._heap)
+                        self._cancelled -= 1
+                    if not self._heap:
+                        self._thread = None
+                        return
+                    timeout = self._heap[0].deadline - _time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cv.wait(timeout)
+
+                timer = _heapq.heappop(self._heap)
+                fn, timer.fn = timer.fn, None
+
+            try:
+                fn()
+            except Exception as err:
+                Logger.chirp_logger.log_error('Callback of the ', self._name, ' failed: ', err)
+
+
+_reconnect_scheduler = _TimerScheduler('pychirp reconnect scheduler')
+_log_throttle_scheduler = _TimerScheduler('pychirp log throttle scheduler')
+
+
+class _ConnectionReaper:
+    # Destroying a connection blocks until libchirp has torn it down, which must not stall the reconnect timers
+    def __init__(self):
+        self._queue = _collections.deque()
+        self._busy = False
+        self._cv = _threading.Condition(_threading.Lock())
+        self._thread = None
+
+    def destroy_later(self, connection: Connection) -> None:
+        with self._cv:
+            self._queue.append(connection)
+            if self._thread is None:
+                self._thread = _threading.Thread(target=self._thread_fn, name='pychirp connection reaper')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def drain(self, timeout: _typing.Optional[float] = None) -> bool:
+        with self._cv:
+            return self._cv.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def _thread_fn(self):
+        while True:
+            with self._cv:
+                if not self._queue:
+                    self._thread = None
+                    self._busy = False
+                    self._cv.notify_all()
+                    return
+                connection = self._queue.popleft()
+                self._busy = True
+
+            try:
+                connection.destroy()
+            except Exception as err:
+                Logger.chirp_logger.log_error('Destroying connection failed: ', err)
+
+
+_connection_reaper = _ConnectionReaper()
+_atexit.register(_connection_reaper.drain, 5.0)
+
+
 class AutoConnectingTcpClient:
     def __init__(self, endpoint: Endpoint, host: str, port: int, timeout: _typing.Optional[float] = None,
-                 identification: _typing.Optional[str] = None):
+                 identification: _typing.Optional[str] = None,
+                 reconnect_policy: _typing.Optional[ReconnectPolicy] = None,
+                 resolver: _typing.Optional[ResolverCache] = None):
         # TODO: Allow ProcessInterface and Configuration as ctor parameters
         self._endpoint = endpoint
         self._host = host
         self._port = port
         self._timeout = timeout
         self._identification = identification
+        self._reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self._failed_attempts = 0
+        self._next_reconnect_delay = None
+        self._connected_since = None
         self._connect_observer = None
+        self._connect_attempt_observer = None
         self._disconnect_observer = None
-        self._client = TcpClient(endpoint.scheduler, identification)
-        self._reconnectThread = _threading.Thread(target=self._reconnect_thread_fn)
-        self._reconnectThreadInitialised = False
+        self._resolver = resolver
+        self._client = TcpClient(endpoint.scheduler, identification, resolver)
+        self._reconnect_timer = None
         self._running = False
-        self._cv = _threading.Condition()
+        self._lock = _threading.RLock()
         self._connection = None
 
-        self._reconnectThread.start()
-        with self._cv:
-            self._cv.wait_for(lambda: self._reconnectThreadInitialised)
-
     @property
     def endpoint(self) -> Endpoint:
         return self._endpoint
@@ -1020,45 +2879,75 @@ class AutoConnectingTcpClient:
     def identification(self) -> _typing.Optional[str]:
         return self._identification
 
+    @property
+    def reconnect_policy(self) -> ReconnectPolicy:
+        return self._reconnect_policy
+
+    @property
+    def resolver(self) -> _typing.Optional[ResolverCache]:
+        return self._resolver
+
+    @property
+    def failed_attempts(self) -> int:
+        with self._lock:
+            return self._failed_attempts
+
+    @property
+    def next_reconnect_delay(self) -> _typing.Optional[float]:
+        with self._lock:
+            return self._next_reconnect_delay
+
     @property
     def connect_observer(self) -> _typing.Callable[[Result, _typing.Optional[TcpConnection]], None]:
-        with self._cv:
+        with self._lock:
             return self._connect_observer
 
     @connect_observer.setter
     def connect_observer(self, fn: _typing.Callable[[Result, _typing.Optional[TcpConnection]], None]):
-        with self._cv:
+        with self._lock:
             self._connect_observer = fn
 
+    @property
+    def connect_attempt_observer(self) -> _typing.Callable[[Result, _typing.Optional[TcpConnection],
+                                                            ReconnectAttempt], None]:
+        with self._lock:
+            return self._connect_attempt_observer
+
+    @connect_attempt_observer.setter
+    def connect_attempt_observer(self, fn: _typing.Callable[[Result, _typing.Optional[TcpConnection],
+                                                             ReconnectAttempt], None]):
+        with self._lock:
+            self._connect_attempt_observer = fn
+
+    def _notify_connect_observer(self, res, connection):
+        if self._connect_observer:
+            self._connect_observer(res, connection)
+        if self._connect_attempt_observer:
+            self._connect_attempt_observer(res, connection, ReconnectAttempt(self._failed_attempts,
+                                                                             self._next_reconnect_delay))
+
     @property
     def disconnect_observer(self) -> _typing.Callable[[Failure], None]:
-        with self._cv:
+        with self._lock:
             return self._disconnect_observer
 
     @disconnect_observer.setter
     def disconnect_observer(self, fn: _typing.Callable[[Failure], None]):
-        with self._cv:
+        with self._lock:
             self._disconnect_observer = fn
 
-    def _reconnect_thread_fn(self):
-        with self._cv:
-            self._reconnectThreadInitialised = True
-            self._cv.notify()
-
-            while True:
-                self._cv.wait()
-                if not self._running:
-                    return
-
-                if self._connection is not None:
-                    self._connection.destroy()
-                    self._connection = None
+    def _on_reconnect_timer(self):
+        with self._lock:
+            if not self._running:
+                return
 
-                self._cv.wait(timeout=1.0)
-                if not self._running:
-                    return
+            self._reconnect_timer = None
+            if self._connection is not None:
+                _connection_reaper.destroy_later(self._connection)
+                self._connection = None
 
-                self._start_connect()
+            self._next_reconnect_delay = None
+            self._start_connect()
 
     def _start_connect(self):
         # TODO: logging
@@ -1068,7 +2957,7 @@ class AutoConnectingTcpClient:
         if res == Canceled():
             return
 
-        with self._cv:
+        with self._lock:
             if not self._running:
                 return
 
@@ -1077,12 +2966,12 @@ class AutoConnectingTcpClient:
                     connection.assign(self._endpoint, self._timeout)
                     connection.async_await_death(self._on_connection_died)
                     self._connection = connection
+                    self._connected_since = _time.monotonic()
+                    self._next_reconnect_delay = None
 
                     # TODO: Logging
 
-                    if self._connect_observer:
-                        self._connect_observer(res, connection)
-
+                    self._notify_connect_observer(res, connection)
                     return
                 except Failure as err:
                     res = err
@@ -1090,36 +2979,50 @@ class AutoConnectingTcpClient:
 
             # TODO: Logging
 
-            if self._connect_observer:
-                self._connect_observer(res, None)
+            self._failed_attempts += 1
+            self._schedule_reconnect()
+            self._notify_connect_observer(res, None)
 
-            self._cv.notify()
+    def _schedule_reconnect(self):
+        self._next_reconnect_delay = self._reconnect_policy.get_delay(self._failed_attempts)
+        self._reconnect_timer = _reconnect_scheduler.schedule(self._next_reconnect_delay, self._on_reconnect_timer)
 
     def _on_connection_died(self, err):
         if err == Canceled():
             return
 
-        with self._cv:
+        with self._lock:
             if not self._running:
                 return
 
             # TODO: Logging
 
+            connected_since, self._connected_since = self._connected_since, None
+            if connected_since is not None \
+                    and _time.monotonic() - connected_since >= self._reconnect_policy.reset_after:
+                self._failed_attempts = 0
+            else:
+                self._failed_attempts += 1
+            self._schedule_reconnect()
+
             if self._disconnect_observer:
                 self._disconnect_observer(err)
 
-            self._cv.notify()
-
     def start(self):
-        with self._cv:
+        with self._lock:
             if self._running:
                 raise Exception('Already started')
             if not self._host or not self._port or self._port > 65535:
                 raise Exception('Invalid target')
 
+            if self._resolver is not None:
+                self._resolver.prefetch(self._prefetch_hosts())
             self._start_connect()
             self._running = True
 
+    def _prefetch_hosts(self):
+        return [self._host]
+
     def try_start(self) -> bool:
         try:
             self.start()
@@ -1128,12 +3031,11 @@ class AutoConnectingTcpClient:
             return False
 
     def destroy(self) -> None:
-        with self._cv:
+        with self._lock:
             self._running = False
-            self._cv.notify()
-
-        if self._reconnectThread.isAlive():
-            self._reconnectThread.join()
+            if self._reconnect_timer is not None:
+                _reconnect_scheduler.cancel(self._reconnect_timer)
+                self._reconnect_timer = None
 
         self._client.destroy()
         self._client = None
@@ -1156,6 +3058,384 @@ class AutoConnectingTcpClient:
             return '{} (disabled)'.format(self.__class__.__name__)
 
 
+class MultiTargetTcpClient(AutoConnectingTcpClient):
+    _LATENCY_SMOOTHING = 0.3
+
+    def __init__(self, endpoint: Endpoint, targets: _typing.Sequence[_typing.Union[str, _typing.Tuple[str, int]]],
+                 timeout: _typing.Optional[float] = None, identification: _typing.Optional[str] = None,
+                 reconnect_policy: _typing.Optional[ReconnectPolicy] = None, attempt_delay: float = 0.25,
+                 standby: bool = False, resolver: _typing.Optional[ResolverCache] = None):
+        self._client = None
+        self._targets = [TcpTarget.parse(target) if isinstance(target, str) else TcpTarget(*target)
+                         for target in targets]
+        if not self._targets:
+            raise BadTcpTarget('')
+
+        AutoConnectingTcpClient.__init__(self, endpoint, self._targets[0].host, self._targets[0].port, timeout,
+                                         identification, reconnect_policy, resolver)
+        self._attempt_delay = attempt_delay
+        self._clients = [self._client] + [TcpClient(endpoint.scheduler, identification, resolver)
+                                          for _ in self._targets[1:]]
+        self._latencies = [None] * len(self._targets)
+        self._target_failures = [0] * len(self._targets)
+        self._connecting = [False] * len(self._targets)
+        self._connected_target = None
+        self._race = 0
+        self._race_queue = _collections.deque()
+        self._race_pending = {}
+        self._race_failure = None
+        self._race_deferred = False
+        self._stagger_timer = None
+        self._standby_enabled = standby
+        self._standby = None
+        self._standby_index = None
+        self._standby_connecting = None
+        self._standby_generation = 0
+        self._standby_failures = 0
+        self._standby_timer = None
+        self._died_at = None
+        self._warm_failovers = 0
+        self._cold_failovers = 0
+        self._failover_gaps = _collections.deque(maxlen=100)
+
+    @property
+    def targets(self) -> _typing.List[TcpTarget]:
+        return list(self._targets)
+
+    @property
+    def attempt_delay(self) -> float:
+        return self._attempt_delay
+
+    @property
+    def connected_target(self) -> _typing.Optional[TcpTarget]:
+        with self._lock:
+            return self._connected_target
+
+    @property
+    def target_latencies(self) -> _typing.Dict[TcpTarget, _typing.Optional[float]]:
+        with self._lock:
+            return dict(zip(self._targets, self._latencies))
+
+    @property
+    def preferred_targets(self) -> _typing.List[TcpTarget]:
+        with self._lock:
+            return [self._targets[i] for i in self._ordered_targets()]
+
+    @property
+    def standby(self) -> bool:
+        return self._standby_enabled
+
+    @property
+    def standby_target(self) -> _typing.Optional[TcpTarget]:
+        with self._lock:
+            return None if self._standby is None else self._targets[self._standby_index]
+
+    @property
+    def failover_metrics(self) -> _typing.Dict[str, _typing.Any]:
+        with self._lock:
+            gaps = list(self._failover_gaps)
+            return {
+                'standby_available': self._standby is not None,
+                'warm_failovers': self._warm_failovers,
+                'cold_failovers': self._cold_failovers,
+                'last_gap': gaps[-1] if gaps else None,
+                'max_gap': max(gaps) if gaps else None,
+                'mean_gap': sum(gaps) / len(gaps) if gaps else None
+            }
+
+    def _prefetch_hosts(self):
+        return [target.host for target in self._targets]
+
+    def _ordered_targets(self):
+        def key(i):
+            latency = self._latencies[i]
+            return self._target_failures[i], latency is None, latency or 0.0, i
+
+        return sorted(range(len(self._targets)), key=key)
+
+    def _start_connect(self):
+        self._race += 1
+        self._race_queue = _collections.deque(i for i in self._ordered_targets() if not self._connecting[i])
+        self._race_pending = {}
+        self._race_failure = None
+        self._race_deferred = not self._race_queue
+        if self._race_deferred:
+            # Every target still has a canceled or standby attempt in flight; race once one of them completes
+            return
+        self._start_next_attempt()
+
+    def _resume_deferred_race(self):
+        if self._running and self._race_deferred:
+            self._start_connect()
+
+    def _start_next_attempt(self):
+        self._cancel_stagger_timer()
+
+        race = self._race
+        while self._race_queue:
+            index = self._race_queue.popleft()
+            target = self._targets[index]
+            self._connecting[index] = True
+            self._race_pending[index] = _time.monotonic()
+            try:
+                self._clients[index].async_connect(target.host, target.port, self._timeout,
+                                                   lambda res, conn, race=race, index=index:
+                                                   self._on_attempt_completed(race, index, res, conn))
+            except Failure as err:
+                self._connecting[index] = False
+                del self._race_pending[index]
+                self._target_failures[index] += 1
+                self._race_failure = err
+                continue
+
+            if self._race_queue:
+                self._stagger_timer = _reconnect_scheduler.schedule(self._attempt_delay,
+                                                                    lambda: self._on_stagger_timer(race))
+            return
+
+        if not self._race_pending:
+            self._on_race_lost()
+
+    def _on_stagger_timer(self, race):
+        with self._lock:
+            if self._running and race == self._race:
+                self._stagger_timer = None
+                self._start_next_attempt()
+
+    def _cancel_stagger_timer(self):
+        if self._stagger_timer is not None:
+            _reconnect_scheduler.cancel(self._stagger_timer)
+            self._stagger_timer = None
+
+    def _cancel_pending_attempts(self):
+        self._cancel_stagger_timer()
+        pending, self._race_pending = self._race_pending, {}
+        self._race += 1
+        self._race_queue.clear()
+
+        for index in pending:
+            try:
+                self._clients[index].cancel_connect()
+            except Failure:
+                pass
+
+    def _on_attempt_completed(self, race, index, res, connection):
+        with self._lock:
+            self._connecting[index] = False
+            started = self._race_pending.pop(index, None) if race == self._race else None
+            if not self._running or started is None:
+                if res == Success():
+                    connection.destroy()
+                self._resume_deferred_race()
+                return
+
+            if res == Success():
+                try:
+                    connection.assign(self._endpoint, self._timeout)
+                    connection.async_await_death(self._on_connection_died)
+                except Failure as err:
+                    res = err
+                    connection.destroy()
+                else:
+                    latency = _time.monotonic() - started
+                    previous = self._latencies[index]
+                    if previous is not None:
+                        latency = previous + self._LATENCY_SMOOTHING * (latency - previous)
+                    self._latencies[index] = latency
+                    self._target_failures[index] = 0
+
+                    self._cancel_pending_attempts()
+                    self._connection = connection
+                    self._connected_target = self._targets[index]
+                    self._host, self._port = self._connected_target
+                    self._connected_since = _time.monotonic()
+                    self._next_reconnect_delay = None
+                    if self._died_at is not None:
+                        self._cold_failovers += 1
+                        self._failover_gaps.append(self._connected_since - self._died_at)
+                        self._died_at = None
+
+                    self._replenish_standby()
+                    self._notify_connect_observer(res, connection)
+                    return
+
+            self._target_failures[index] += 1
+            self._race_failure = res
+            if self._race_queue:
+                self._start_next_attempt()
+            elif not self._race_pending:
+                self._on_race_lost()
+
+    def _on_race_lost(self):
+        self._cancel_stagger_timer()
+        self._race += 1
+        self._failed_attempts += 1
+        self._schedule_reconnect()
+        if self._race_failure is not None:
+            self._notify_connect_observer(self._race_failure, None)
+
+    def _replenish_standby(self):
+        if not self._standby_enabled or self._connection is None or self._standby is not None \
+                or self._standby_connecting is not None:
+            return
+
+        candidates = [i for i in self._ordered_targets() if not self._connecting[i]]
+        secondaries = [i for i in candidates if self._targets[i] != self._connected_target]
+        if secondaries or len(self._targets) > 1:
+            candidates = secondaries
+        if not candidates:
+            return
+
+        index = candidates[0]
+        target = self._targets[index]
+        self._standby_generation += 1
+        self._standby_connecting = index
+        self._connecting[index] = True
+        try:
+            self._clients[index].async_connect(target.host, target.port, self._timeout,
+                                               lambda res, conn, generation=self._standby_generation, index=index:
+                                               self._on_standby_connect_completed(generation, index, res, conn))
+        except Failure:
+            self._connecting[index] = False
+            self._standby_connecting = None
+            self._standby_failures += 1
+            self._schedule_standby_retry()
+
+    def _on_standby_connect_completed(self, generation, index, res, connection):
+        with self._lock:
+            self._connecting[index] = False
+            if not self._running or generation != self._standby_generation:
+                if res == Success():
+                    connection.destroy()
+                self._resume_deferred_race()
+                return
+
+            self._standby_connecting = None
+            if res != Success():
+                self._target_failures[index] += 1
+                self._standby_failures += 1
+                self._schedule_standby_retry()
+                self._resume_deferred_race()
+                return
+
+            self._standby = connection
+            self._standby_index = index
+            self._standby_failures = 0
+            try:
+                connection.async_await_death(lambda err: self._on_standby_died(connection, err))
+            except Failure:
+                pass
+            self._resume_deferred_race()
+
+    def _on_standby_died(self, connection, err):
+        if err == Canceled():
+            return
+
+        with self._lock:
+            if connection is not self._standby:
+                return
+
+            self._standby = None
+            self._standby_index = None
+            self._destroy_later(connection)
+            if self._running:
+                self._standby_failures += 1
+                self._schedule_standby_retry()
+
+    def _schedule_standby_retry(self):
+        generation = self._standby_generation
+        self._standby_timer = _reconnect_scheduler.schedule(self._reconnect_policy.get_delay(self._standby_failures),
+                                                            lambda: self._on_standby_timer(generation))
+
+    def _on_standby_timer(self, generation):
+        with self._lock:
+            if self._running and generation == self._standby_generation:
+                self._standby_timer = None
+                self._replenish_standby()
+
+    def _promote_standby(self, err, died_at):
+        standby, index = self._standby, self._standby_index
+        self._standby = None
+        self._standby_index = None
+        try:
+            try:
+                standby.cancel_await_death()
+            except Failure:
+                pass
+            standby.assign(self._endpoint, self._timeout)
+            standby.async_await_death(self._on_connection_died)
+        except Failure:
+            self._destroy_later(standby)
+            return False
+
+        if self._connection is not None:
+            self._destroy_later(self._connection)
+        self._connection = standby
+        self._connected_target = self._targets[index]
+        self._host, self._port = self._connected_target
+        self._connected_since = _time.monotonic()
+        self._warm_failovers += 1
+        self._failover_gaps.append(self._connected_since - died_at)
+
+        if self._disconnect_observer:
+            self._disconnect_observer(err)
+        self._notify_connect_observer(Success(), standby)
+        self._replenish_standby()
+        return True
+
+    @staticmethod
+    def _destroy_later(connection):
+        _connection_reaper.destroy_later(connection)
+
+    def _cancel_standby(self):
+        self._standby_generation += 1
+        if self._standby_timer is not None:
+            _reconnect_scheduler.cancel(self._standby_timer)
+            self._standby_timer = None
+        if self._standby_connecting is not None:
+            try:
+                self._clients[self._standby_connecting].cancel_connect()
+            except Failure:
+                pass
+            self._standby_connecting = None
+        standby, self._standby = self._standby, None
+        self._standby_index = None
+        return standby
+
+    def _on_connection_died(self, err):
+        if err == Canceled():
+            return
+
+        with self._lock:
+            if not self._running:
+                return
+
+            died_at = _time.monotonic()
+            if self._standby is not None and self._promote_standby(err, died_at):
+                return
+
+            self._connected_target = None
+            self._died_at = died_at
+            AutoConnectingTcpClient._on_connection_died(self, err)
+
+    def destroy(self) -> None:
+        with self._lock:
+            self._running = False
+            self._cancel_pending_attempts()
+            standby = self._cancel_standby()
+
+        if standby is not None:
+            standby.destroy()
+
+        AutoConnectingTcpClient.destroy(self)
+        for client in self._clients[1:]:
+            client.destroy()
+        self._clients = []
+
+    def __str__(self):
+        return '{} connecting to {}'.format(self.__class__.__name__, ', '.join(str(t) for t in self._targets))
+
+
 # ======================================================================================================================
 # Terminals
 # ======================================================================================================================
@@ -1199,8 +3479,8 @@ class Terminal(Object):
         self._signature = signature if isinstance(signature, Signature) else Signature(signature)
 
         handle = _ctypes.c_void_p()
-        _chirp.CHIRP_CreateTerminal(_ctypes.byref(handle), self._leaf._handle, type, self._name.encode('utf-8'),
-                                    self._signature.raw)
+        _chirp.CHIRP_CreateTerminal(_ctypes.byref(handle), self._leaf._handle, type.value,
+                                    self._name.encode('utf-8'), self._signature.raw)
         Object.__init__(self, handle)
 
     @property
@@ -1277,3 +3557,134 @@ class CachedPublishSubscribeTerminal(PrimitiveTerminal):
 class ScatterGatherTerminal(PrimitiveTerminal):
     def __init__(self, name: str, signature: _typing.Union[Signature, int], *, leaf: _typing.Optional[Leaf] = None):
         PrimitiveTerminal.__init__(self, _TerminalType.SCATTER_GATHER, name, signature, leaf=leaf)
+
+
+_chirp.CHIRP_PC_Publish.restype = _api_result_handler
+_chirp.CHIRP_PC_Publish.argtypes = [_ctypes.c_void_p, _ctypes.c_void_p, _ctypes.c_uint]
+
+_chirp.CHIRP_PC_AsyncReceiveMessage.restype = _api_result_handler
+_chirp.CHIRP_PC_AsyncReceiveMessage.argtypes = [_ctypes.c_void_p, _ctypes.c_void_p, _ctypes.c_uint,
+                                                _ctypes.CFUNCTYPE(None, _ctypes.c_int, _ctypes.c_uint,
+                                                                  _ctypes.c_void_p),
+                                                _ctypes.c_void_p]
+
+_chirp.CHIRP_PC_CancelReceiveMessage.restype = _api_result_handler
+_chirp.CHIRP_PC_CancelReceiveMessage.argtypes = [_ctypes.c_void_p]
+
+
+class ProducerTerminal(ConvenienceTerminal):
+    def __init__(self, name: str, signature: _typing.Union[Signature, int], *, leaf: _typing.Optional[Leaf] = None):
+        ConvenienceTerminal.__init__(self, _TerminalType.PRODUCER, name, signature, leaf=leaf)
+
+    def publish(self, data: bytes) -> None:
+        buffer = _ctypes.create_string_buffer(bytes(data))
+        _chirp.CHIRP_PC_Publish(self._handle, buffer, _ctypes.sizeof(buffer) - 1)
+
+    def try_publish(self, data: bytes) -> bool:
+        try:
+            self.publish(data)
+            return True
+        except Failure:
+            return False
+
+
+class ConsumerTerminal(ConvenienceTerminal):
+    RECEIVE_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, name: str, signature: _typing.Union[Signature, int], *, leaf: _typing.Optional[Leaf] = None):
+        ConvenienceTerminal.__init__(self, _TerminalType.CONSUMER, name, signature, leaf=leaf)
+
+    def async_receive_message(self, completion_handler: _typing.Callable[[Result, bytes], None]) -> None:
+        buffer = _ctypes.create_string_buffer(self.RECEIVE_BUFFER_SIZE)
+
+        def fn(res, size):
+            completion_handler(res, buffer.raw[:size])
+
+        _chirp.CHIRP_PC_AsyncReceiveMessage(self._handle, buffer, _ctypes.sizeof(buffer),
+                                            _wrap_callback(_chirp.CHIRP_PC_AsyncReceiveMessage.argtypes[3], fn),
+                                            _ctypes.c_void_p())
+
+    def cancel_receive_message(self) -> None:
+        _chirp.CHIRP_PC_CancelReceiveMessage(self._handle)
+
+
+_chirp.CHIRP_SC_AsyncRequest.restype = _api_result_handler
+_chirp.CHIRP_SC_AsyncRequest.argtypes = [_ctypes.c_void_p, _ctypes.c_void_p, _ctypes.c_uint, _ctypes.c_void_p,
+                                         _ctypes.c_uint,
+                                         _ctypes.CFUNCTYPE(_ctypes.c_int, _ctypes.c_int, _ctypes.c_int, _ctypes.c_int,
+                                                           _ctypes.c_uint, _ctypes.c_void_p),
+                                         _ctypes.c_void_p]
+
+_chirp.CHIRP_SC_CancelRequest.restype = _api_result_handler
+_chirp.CHIRP_SC_CancelRequest.argtypes = [_ctypes.c_void_p, _ctypes.c_int]
+
+_chirp.CHIRP_SC_AsyncReceiveRequest.restype = _api_result_handler
+_chirp.CHIRP_SC_AsyncReceiveRequest.argtypes = [_ctypes.c_void_p, _ctypes.c_void_p, _ctypes.c_uint,
+                                                _ctypes.CFUNCTYPE(None, _ctypes.c_int, _ctypes.c_int, _ctypes.c_uint,
+                                                                  _ctypes.c_void_p),
+                                                _ctypes.c_void_p]
+
+_chirp.CHIRP_SC_CancelReceiveRequest.restype = _api_result_handler
+_chirp.CHIRP_SC_CancelReceiveRequest.argtypes = [_ctypes.c_void_p]
+
+_chirp.CHIRP_SC_RespondToRequest.restype = _api_result_handler
+_chirp.CHIRP_SC_RespondToRequest.argtypes = [_ctypes.c_void_p, _ctypes.c_int, _ctypes.c_void_p, _ctypes.c_uint]
+
+_chirp.CHIRP_SC_IgnoreRequest.restype = _api_result_handler
+_chirp.CHIRP_SC_IgnoreRequest.argtypes = [_ctypes.c_void_p, _ctypes.c_int]
+
+
+class ServiceTerminal(ConvenienceTerminal):
+    RECEIVE_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, name: str, signature: _typing.Union[Signature, int], *, leaf: _typing.Optional[Leaf] = None):
+        ConvenienceTerminal.__init__(self, _TerminalType.SERVICE, name, signature, leaf=leaf)
+
+    def async_receive_request(self, completion_handler: _typing.Callable[[Result, int, bytes], None]) -> None:
+        buffer = _ctypes.create_string_buffer(self.RECEIVE_BUFFER_SIZE)
+
+        def fn(res, operation_id, size):
+            completion_handler(res, operation_id, buffer.raw[:size])
+
+        _chirp.CHIRP_SC_AsyncReceiveRequest(self._handle, buffer, _ctypes.sizeof(buffer),
+                                            _wrap_callback(_chirp.CHIRP_SC_AsyncReceiveRequest.argtypes[3], fn),
+                                            _ctypes.c_void_p())
+
+    def cancel_receive_request(self) -> None:
+        _chirp.CHIRP_SC_CancelReceiveRequest(self._handle)
+
+    def respond_to_request(self, operation_id: int, data: bytes) -> None:
+        buffer = _ctypes.create_string_buffer(bytes(data))
+        _chirp.CHIRP_SC_RespondToRequest(self._handle, operation_id, buffer, _ctypes.sizeof(buffer) - 1)
+
+    def ignore_request(self, operation_id: int) -> None:
+        _chirp.CHIRP_SC_IgnoreRequest(self._handle, operation_id)
+
+
+class ClientTerminal(ConvenienceTerminal):
+    RECEIVE_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, name: str, signature: _typing.Union[Signature, int], *, leaf: _typing.Optional[Leaf] = None):
+        ConvenienceTerminal.__init__(self, _TerminalType.CLIENT, name, signature, leaf=leaf)
+
+    # The completion handler gets called once per responding service with the response and the raw GatherFlags bits;
+    # it may return ControlFlow.STOP to ignore any further responses
+    def async_request(self, data: bytes,
+                      completion_handler: _typing.Callable[[Result, int, int, bytes], _typing.Optional[ControlFlow]])\
+            -> int:
+        request_buffer = _ctypes.create_string_buffer(bytes(data))
+        response_buffer = _ctypes.create_string_buffer(self.RECEIVE_BUFFER_SIZE)
+
+        def fn(res, operation_id, flags, size):
+            ret = completion_handler(res, operation_id, flags, response_buffer.raw[:size])
+            if not res or ret is ControlFlow.STOP or flags & GatherFlags.FINISHED.value:
+                return ControlFlow.STOP
+            return ControlFlow.CONTINUE
+
+        return _chirp.CHIRP_SC_AsyncRequest(self._handle, request_buffer, _ctypes.sizeof(request_buffer) - 1,
+                                            response_buffer, _ctypes.sizeof(response_buffer),
+                                            _wrap_callback(_chirp.CHIRP_SC_AsyncRequest.argtypes[5], fn),
+                                            _ctypes.c_void_p()).value
+
+    def cancel_request(self, operation_id: int) -> None:
+        _chirp.CHIRP_SC_CancelRequest(self._handle, operation_id)
@@ -0,0 +1,1268 @@
+import collections as _collections
+import ctypes as _ctypes
+import enum as _enum
+import heapq as _heapq
+import itertools as _itertools
+import struct as _struct
+import threading as _threading
+import time as _time
+import traceback as _traceback
+
+
+# ======================================================================================================================
+# In-process stand-in for libchirp
+#
+# Implements the CHIRP_* functions used by pychirp and pychirp_old in pure Python so that the Python layers can be
+# tested and benchmarked without the shared library. Objects live in this process only: TCP servers and clients are
+# matched by port number, no sockets are opened and assigned connections never time out.
+# ======================================================================================================================
+VERSION = b'0.0.0-emulator'
+MAX_THREAD_POOL_SIZE = 1024
+CONNECT_LATENCY = 0.001
+SCHEDULER_IDLE_TIMEOUT = 1.0
+
+
+class _Errors:
+    OK = 0
+    UNKNOWN = -1
+    INVALID_HANDLE = -2
+    WRONG_OBJECT_TYPE = -3
+    INVALID_PARAM = -6
+    ALREADY_CONNECTED = -7
+    ALREADY_INITIALISED = -9
+    NOT_INITIALISED = -10
+    CANNOT_CREATE_LOG_FILE = -11
+    CANCELED = -12
+    ASYNC_OPERATION_RUNNING = -13
+    BUFFER_TOO_SMALL = -14
+    NOT_BOUND = -15
+    INVALID_ID = -16
+    TIMEOUT = -27
+    ADDRESS_IN_USE = -28
+    CONNECTION_REFUSED = -30
+    NOT_READY = -34
+    ALREADY_ASSIGNED = -35
+    CONNECTION_DEAD = -36
+    CONNECTION_CLOSED = -37
+
+
+_ERROR_STRINGS = {
+    0: 'Success',
+    -1: 'Unknown internal error occurred',
+    -2: 'Invalid object handle',
+    -3: 'Object is of the wrong type',
+    -4: 'The object is still being used by another object',
+    -5: 'Memory allocation failed',
+    -6: 'Invalid parameter',
+    -7: 'The objects are already connected',
+    -8: 'The identifier is ambiguous',
+    -9: 'The library has already been initialised',
+    -10: 'The library has not been initialised',
+    -11: 'Could not create the log file',
+    -12: 'The operation has been canceled',
+    -13: 'An asynchronous operation of this type is already running',
+    -14: 'The supplied buffer is too small',
+    -15: 'The object is not bound to anything',
+    -16: 'Invalid ID',
+    -17: 'The identification is too large',
+    -18: 'Invalid IP address',
+    -19: 'Invalid port number',
+    -20: 'Could not open socket',
+    -21: 'Could not bind socket',
+    -22: 'Could not listen on socket',
+    -23: 'The socket is broken',
+    -24: 'Invalid magic prefix received',
+    -25: 'Incompatible version',
+    -26: 'Accepting a connection failed',
+    -27: 'The operation timed out',
+    -28: 'The address is already in use',
+    -29: 'Could not resolve the address',
+    -30: 'The connection was refused',
+    -31: 'The host is unreachable',
+    -32: 'The network is down',
+    -33: 'Connecting failed',
+    -34: 'The object is not ready',
+    -35: 'The connection has already been assigned',
+    -36: 'The connection is dead',
+    -37: 'The connection has been closed by the remote side',
+    -38: 'The object has not been initialised'
+}
+
+
+class _Error(Exception):
+    def __init__(self, code: int):
+        self.code = code
+
+
+class _TerminalTypes:
+    DEAF_MUTE = 0
+    PUBLISH_SUBSCRIBE = 1
+    SCATTER_GATHER = 2
+    CACHED_PUBLISH_SUBSCRIBE = 3
+    PRODUCER = 4
+    CONSUMER = 5
+    CACHED_PRODUCER = 6
+    CACHED_CONSUMER = 7
+    MASTER = 8
+    SLAVE = 9
+    CACHED_MASTER = 10
+    CACHED_SLAVE = 11
+    SERVICE = 12
+    CLIENT = 13
+
+
+_T = _TerminalTypes
+
+# Maps the type of a terminal that owns a binding to the type of the terminals the binding can be established with.
+# The owner of the binding receives whatever the bound terminals publish or scatter.
+_BOUND_TYPES = {
+    _T.DEAF_MUTE: _T.DEAF_MUTE,
+    _T.PUBLISH_SUBSCRIBE: _T.PUBLISH_SUBSCRIBE,
+    _T.SCATTER_GATHER: _T.SCATTER_GATHER,
+    _T.CACHED_PUBLISH_SUBSCRIBE: _T.CACHED_PUBLISH_SUBSCRIBE,
+    _T.CONSUMER: _T.PRODUCER,
+    _T.CACHED_CONSUMER: _T.CACHED_PRODUCER,
+    _T.MASTER: _T.SLAVE,
+    _T.SLAVE: _T.MASTER,
+    _T.CACHED_MASTER: _T.CACHED_SLAVE,
+    _T.CACHED_SLAVE: _T.CACHED_MASTER,
+    _T.SERVICE: _T.CLIENT
+}
+
+_MANUALLY_BOUND_TYPES = {_T.DEAF_MUTE, _T.PUBLISH_SUBSCRIBE, _T.SCATTER_GATHER, _T.CACHED_PUBLISH_SUBSCRIBE}
+_CACHED_TYPES = {_T.CACHED_PUBLISH_SUBSCRIBE, _T.CACHED_PRODUCER, _T.CACHED_CONSUMER, _T.CACHED_MASTER,
+                 _T.CACHED_SLAVE}
+
+_FINISHED = 1 << 0
+_IGNORED = 1 << 1
+_DEAF = 1 << 2
+_BINDING_DESTROYED = 1 << 3
+_CONNECTION_LOST = 1 << 4
+
+_STOP = 1
+
+
+# ======================================================================================================================
+# Global state
+#
+# All API calls run under one lock; completion handlers are always invoked asynchronously from the dispatch thread of
+# the responsible scheduler and never while the lock is held.
+# ======================================================================================================================
+_lock = _threading.RLock()
+_objects = {}
+_handles = _itertools.count(0x10000000, 0x10)
+_terminal_sequence = _itertools.count()
+_operation_ids = _itertools.count(1)
+_ephemeral_ports = _itertools.count(49152)
+_terminals = {}
+_bindings = {}
+_connections = {}
+_nodes = {}
+_servers = {}
+_initialised = False
+_log_file = None
+
+
+# ======================================================================================================================
+# Argument helpers
+# ======================================================================================================================
+def _value(arg):
+    while hasattr(arg, '_as_parameter_') and not isinstance(arg, _ctypes._SimpleCData):
+        arg = arg._as_parameter_
+    if isinstance(arg, _ctypes._SimpleCData):
+        return arg.value
+    if isinstance(arg, _enum.Enum):
+        return arg.value
+    return arg
+
+
+def _address(buffer):
+    if isinstance(buffer, int):
+        return buffer
+    if isinstance(buffer, (_ctypes.c_void_p, _ctypes.c_char_p)):
+        return _ctypes.cast(buffer, _ctypes.c_void_p).value
+    return _ctypes.addressof(buffer)
+
+
+def _read(buffer, size):
+    size = _value(size)
+    if buffer is None or not size:
+        return None
+    if isinstance(buffer, (bytes, bytearray)):
+        return bytes(buffer[:size])
+    address = _address(buffer)
+    return _ctypes.string_at(address, size) if address else None
+
+
+def _write(buffer, size, data, terminate=False):
+    required = len(data) + (1 if terminate else 0)
+    if required > size:
+        raise _Error(_Errors.BUFFER_TOO_SMALL)
+    address = _address(buffer)
+    _ctypes.memmove(address, data, len(data))
+    if terminate:
+        _ctypes.memset(address + len(data), 0, 1)
+
+
+def _write_truncated(buffer, size, data):
+    n = min(len(data), size)
+    if n:
+        _ctypes.memmove(_address(buffer), data, n)
+    return n, _Errors.OK if n == len(data) else _Errors.BUFFER_TOO_SMALL
+
+
+def _set_output(reference, value):
+    target = getattr(reference, '_obj', None)
+    if target is None:
+        target = reference.contents
+    target.value = value
+
+
+def _get(handle, *types):
+    obj = _objects.get(_value(handle))
+    if obj is None:
+        raise _Error(_Errors.INVALID_HANDLE)
+    if types and not isinstance(obj, types):
+        raise _Error(_Errors.WRONG_OBJECT_TYPE)
+    return obj
+
+
+def _get_terminal(handle, types):
+    terminal = _get(handle, _Terminal)
+    if terminal.type not in types:
+        raise _Error(_Errors.WRONG_OBJECT_TYPE)
+    return terminal
+
+
+def _register(obj, handle_reference):
+    obj.handle = next(_handles)
+    _objects[obj.handle] = obj
+    _set_output(handle_reference, obj.handle)
+
+
+# ======================================================================================================================
+# Objects
+# ======================================================================================================================
+class _Object:
+    def destroy(self):
+        pass
+
+
+class _Scheduler(_Object):
+    def __init__(self):
+        self.thread_pool_size = 1
+        self._cv = _threading.Condition(_threading.Lock())
+        self._queue = _collections.deque()
+        self._timers = []
+        self._timer_sequence = _itertools.count()
+        self._thread = None
+        self._stopped = False
+
+    def post(self, fn, *args):
+        with self._cv:
+            if not self._stopped:
+                self._queue.append((fn, args))
+                self._wake()
+
+    def post_delayed(self, delay, fn, *args):
+        with self._cv:
+            if not self._stopped:
+                _heapq.heappush(self._timers, (_time.monotonic() + delay, next(self._timer_sequence), fn, args))
+                self._wake()
+
+    def destroy(self):
+        with self._cv:
+            self._stopped = True
+            self._queue.clear()
+            self._timers = []
+            self._cv.notify()
+
+    def _wake(self):
+        if self._thread is None:
+            self._thread = _threading.Thread(target=self._thread_fn, name='pychirp emulator scheduler')
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self._cv.notify()
+
+    def _thread_fn(self):
+        while True:
+            with self._cv:
+                while True:
+                    if self._stopped:
+                        self._thread = None
+                        return
+                    now = _time.monotonic()
+                    while self._timers and self._timers[0][0] <= now:
+                        _, _, fn, args = _heapq.heappop(self._timers)
+                        self._queue.append((fn, args))
+                    if self._queue:
+                        break
+                    timeout = self._timers[0][0] - now if self._timers else SCHEDULER_IDLE_TIMEOUT
+                    if not self._cv.wait(timeout) and not self._queue and not self._timers:
+                        self._thread = None
+                        return
+                batch, self._queue = self._queue, _collections.deque()
+
+            for fn, args in batch:
+                try:
+                    fn(*args)
+                except Exception:
+                    _traceback.print_exc()
+
+
+class _Endpoint(_Object):
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.alive = True
+
+    def destroy(self):
+        self.alive = False
+        for connection in list(_connections):
+            if isinstance(connection, _TcpConnection) and connection.endpoint is self:
+                connection.die(_Errors.CONNECTION_CLOSED, _Errors.CONNECTION_CLOSED)
+
+
+class _Leaf(_Endpoint):
+    pass
+
+
+class _Node(_Endpoint):
+    def __init__(self, scheduler):
+        _Endpoint.__init__(self, scheduler)
+        self.known = []
+        self.changes = _collections.deque()
+        self.tracking = False
+        self.awaiter = None
+
+    def update(self, known):
+        if self.tracking:
+            before = _collections.Counter(self.known)
+            after = _collections.Counter(known)
+            self.changes.extend((False, info) for info in (before - after).elements())
+            self.changes.extend((True, info) for info in (after - before).elements())
+        self.known = known
+        self.dispatch_changes()
+
+    def dispatch_changes(self):
+        if self.awaiter is not None and self.changes:
+            (buffer, size, completion_handler), self.awaiter = self.awaiter, None
+            added, (terminal_type, name, signature) = self.changes.popleft()
+            data = _struct.pack('=ccI', bytes([added]), bytes([terminal_type]), signature) + name + b'\0'
+            self.scheduler.post(self._complete, buffer, size, completion_handler, data)
+
+    def cancel_await(self):
+        if self.awaiter is not None:
+            (_, _, completion_handler), self.awaiter = self.awaiter, None
+            self.scheduler.post(completion_handler, _Errors.CANCELED, None)
+
+    def destroy(self):
+        _Endpoint.destroy(self)
+        self.cancel_await()
+        _nodes.pop(self, None)
+
+    @staticmethod
+    def _complete(buffer, size, completion_handler, data):
+        try:
+            _write(buffer, size, data)
+            res = _Errors.OK
+        except _Error as e:
+            res = e.code
+        completion_handler(res, None)
+
+
+class _ObservedState:
+    # Binding and subscription states. An await completes as soon as the state differs from the one last handed out,
+    # so changes between getting the state and awaiting the next change are not lost.
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.value = False
+        self.reported = False
+        self.awaiter = None
+
+    def get(self):
+        self.reported = self.value
+        return int(self.value)
+
+    def async_get(self, completion_handler):
+        self.scheduler.post(completion_handler, _Errors.OK, self.get(), None)
+
+    def async_await_change(self, completion_handler):
+        if self.awaiter is not None:
+            raise _Error(_Errors.ASYNC_OPERATION_RUNNING)
+        self.awaiter = completion_handler
+        self.notify()
+
+    def set(self, value):
+        self.value = value
+        self.notify()
+
+    def notify(self):
+        if self.awaiter is not None and self.value != self.reported:
+            completion_handler, self.awaiter = self.awaiter, None
+            self.async_get(completion_handler)
+
+    def cancel_await(self):
+        if self.awaiter is not None:
+            completion_handler, self.awaiter = self.awaiter, None
+            self.scheduler.post(completion_handler, _Errors.CANCELED, 0, None)
+
+
+class _Binding(_Object):
+    def __init__(self, terminal, targets):
+        self.terminal = terminal
+        self.targets = targets
+        self.alive = True
+        self.matches = set()
+        self.state = _ObservedState(terminal.leaf.scheduler)
+
+    def destroy(self):
+        self.alive = False
+        self.state.cancel_await()
+        _bindings.pop(self, None)
+        if self in self.terminal.bindings:
+            self.terminal.bindings.remove(self)
+
+
+class _Operation:
+    def __init__(self, terminal, buffer, size, completion_handler, num_receivers):
+        self.id = next(_operation_ids)
+        self.terminal = terminal
+        self.buffer = buffer
+        self.size = size
+        self.completion_handler = completion_handler
+        self.remaining = num_receivers
+        self.waiting = {}
+        self.stopped = False
+
+    def respond(self, flags, data=b''):
+        self.remaining -= 1
+        if self.remaining <= 0:
+            flags |= _FINISHED
+            self.terminal.operations.pop(self.id, None)
+        self.terminal.leaf.scheduler.post(self._complete, flags, data)
+
+    def check_receivers(self):
+        for receiver, binding in list(self.waiting.items()):
+            if not receiver.alive or not binding.alive:
+                flags = _BINDING_DESTROYED
+            elif self.terminal not in binding.matches:
+                flags = _CONNECTION_LOST
+            else:
+                continue
+            del self.waiting[receiver]
+            receiver.received_operations.pop(self.id, None)
+            self.respond(flags)
+
+    def cancel(self):
+        self.terminal.operations.pop(self.id, None)
+        self._release_receivers()
+        self.terminal.leaf.scheduler.post(self._complete_canceled)
+
+    def _release_receivers(self):
+        for receiver in self.waiting:
+            receiver.received_operations.pop(self.id, None)
+        self.waiting.clear()
+
+    def _complete(self, flags, data):
+        if self.stopped:
+            return
+        n, res = _write_truncated(self.buffer, self.size, data)
+        if self.completion_handler(res, self.id, flags, n, None) == _STOP or flags & _FINISHED:
+            with _lock:
+                self.stopped = True
+                self.terminal.operations.pop(self.id, None)
+                self._release_receivers()
+
+    def _complete_canceled(self):
+        if not self.stopped:
+            self.stopped = True
+            self.completion_handler(_Errors.CANCELED, self.id, 0, 0, None)
+
+
+class _Terminal(_Object):
+    MESSAGE = 0
+    CACHED_MESSAGE = 1
+    SCATTERED_MESSAGE = 2
+
+    def __init__(self, leaf, terminal_type, name, signature):
+        self.leaf = leaf
+        self.type = terminal_type
+        self.name = name
+        self.signature = signature
+        self.sequence = next(_terminal_sequence)
+        self.alive = True
+        self.bindings = []
+        self.binding = None
+        self.subscribers = []
+        self.subscription_state = _ObservedState(leaf.scheduler)
+        self.receive_operation = None
+        self.operations = {}
+        self.received_operations = {}
+        self.published_message = None
+        self.received_message = None
+
+    @property
+    def info(self):
+        return self.type, self.name, self.signature
+
+    def async_receive(self, kind, buffer, size, completion_handler):
+        if self.receive_operation is not None:
+            raise _Error(_Errors.ASYNC_OPERATION_RUNNING)
+        self.receive_operation = (kind, buffer, size, completion_handler)
+
+    def cancel_receive(self):
+        if self.receive_operation is not None:
+            (kind, _, _, completion_handler), self.receive_operation = self.receive_operation, None
+            if kind == self.MESSAGE:
+                self.leaf.scheduler.post(completion_handler, _Errors.CANCELED, 0, None)
+            else:
+                self.leaf.scheduler.post(completion_handler, _Errors.CANCELED, 0, 0, None)
+
+    def publish(self, data):
+        if self.type in _CACHED_TYPES:
+            self.published_message = data
+        for binding in self.subscribers:
+            binding.terminal.deliver(data, False)
+
+    def deliver(self, data, cached):
+        if self.type in _CACHED_TYPES:
+            self.received_message = data
+        receive_operation = self.receive_operation
+        if receive_operation is None or receive_operation[0] == self.SCATTERED_MESSAGE:
+            return
+        self.receive_operation = None
+        self.leaf.scheduler.post(self._complete_receive, receive_operation, data, cached)
+
+    def scatter(self, data, buffer, size, completion_handler):
+        receivers = list(self.subscribers)
+        if not receivers:
+            raise _Error(_Errors.NOT_BOUND)
+
+        operation = _Operation(self, buffer, size, completion_handler, len(receivers))
+        self.operations[operation.id] = operation
+        deaf = 0
+        for binding in receivers:
+            receiver = binding.terminal
+            receive_operation = receiver.receive_operation
+            if receive_operation is None or receive_operation[0] != self.SCATTERED_MESSAGE \
+                    or receiver in operation.waiting:
+                deaf += 1
+                continue
+            receiver.receive_operation = None
+            receiver.received_operations[operation.id] = operation
+            operation.waiting[receiver] = binding
+            receiver.leaf.scheduler.post(receiver._complete_receive_scattered, receive_operation, operation.id, data)
+
+        for _ in range(deaf):
+            operation.respond(_DEAF)
+        return operation.id
+
+    def respond(self, operation_id, flags, data=b''):
+        operation = self.received_operations.pop(operation_id, None)
+        if operation is None:
+            raise _Error(_Errors.INVALID_ID)
+        if operation.waiting.pop(self, None) is not None and not operation.stopped:
+            operation.respond(flags, data)
+
+    def cancel_operation(self, operation_id):
+        operation = self.operations.get(operation_id)
+        if operation is None:
+            raise _Error(_Errors.INVALID_ID)
+        operation.cancel()
+
+    def destroy(self):
+        self.alive = False
+        _terminals.pop(self, None)
+        self.cancel_receive()
+        self.subscription_state.cancel_await()
+        for binding in list(self.bindings):
+            binding.destroy()
+        for operation in list(self.operations.values()):
+            operation.cancel()
+
+    @staticmethod
+    def _complete_receive(receive_operation, data, cached):
+        kind, buffer, size, completion_handler = receive_operation
+        n, res = _write_truncated(buffer, size, data)
+        if kind == _Terminal.CACHED_MESSAGE:
+            completion_handler(res, n, int(cached), None)
+        else:
+            completion_handler(res, n, None)
+
+    @staticmethod
+    def _complete_receive_scattered(receive_operation, operation_id, data):
+        _, buffer, size, completion_handler = receive_operation
+        n, res = _write_truncated(buffer, size, data)
+        completion_handler(res, operation_id, n, None)
+
+
+class _LocalConnection(_Object):
+    description = b'Local Connection'
+    remote_identification = None
+
+    def __init__(self, endpoint_a, endpoint_b):
+        self.endpoints = (endpoint_a, endpoint_b)
+
+    @property
+    def edge(self):
+        if all(endpoint.alive for endpoint in self.endpoints):
+            return self.endpoints
+        return None
+
+    def destroy(self):
+        _connections.pop(self, None)
+
+
+class _TcpConnection(_Object):
+    def __init__(self, scheduler, description, remote_identification):
+        self.scheduler = scheduler
+        self.description = description
+        self.remote_identification = remote_identification
+        self.peer = None
+        self.endpoint = None
+        self.alive = True
+        self.death_reason = None
+        self.death_awaiter = None
+
+    @property
+    def edge(self):
+        if self.alive and self.endpoint is not None and self.peer.endpoint is not None:
+            return self.endpoint, self.peer.endpoint
+        return None
+
+    def die(self, reason, peer_reason):
+        for connection, res in ((self, reason), (self.peer, peer_reason)):
+            if connection.alive:
+                connection.alive = False
+                connection.death_reason = res
+                connection.notify_death()
+
+    def notify_death(self):
+        if self.death_awaiter is not None and not self.alive:
+            completion_handler, self.death_awaiter = self.death_awaiter, None
+            self.scheduler.post(completion_handler, self.death_reason, None)
+
+    def cancel_await_death(self):
+        if self.death_awaiter is not None:
+            completion_handler, self.death_awaiter = self.death_awaiter, None
+            self.scheduler.post(completion_handler, _Errors.CANCELED, None)
+
+    def destroy(self):
+        self.cancel_await_death()
+        self.die(_Errors.CANCELED, _Errors.CONNECTION_CLOSED)
+        _connections.pop(self, None)
+
+
+class _TcpServer(_Object):
+    def __init__(self, scheduler, address, port, identification):
+        self.scheduler = scheduler
+        self.address = address
+        self.port = port
+        self.identification = identification
+        self.accept_operation = None
+        self.backlog = _collections.deque()
+
+    def cancel_accept(self):
+        if self.accept_operation is not None:
+            completion_handler, self.accept_operation = self.accept_operation, None
+            self.scheduler.post(completion_handler, _Errors.CANCELED, None, None)
+
+    def destroy(self):
+        if _servers.get(self.port) is self:
+            del _servers[self.port]
+        self.cancel_accept()
+        while self.backlog:
+            self.backlog.popleft().fail(_Errors.CONNECTION_REFUSED)
+
+    def match(self):
+        while self.accept_operation is not None and self.backlog:
+            client = self.backlog.popleft()
+            if client.connect_operation is None:
+                continue
+
+            host, port = client.connect_operation[:2]
+            client_connection = _TcpConnection(client.scheduler, '{}:{}'.format(host, port).encode(),
+                                               self.identification)
+            server_connection = _TcpConnection(self.scheduler, '{}:{}'.format(
+                self.address, next(_ephemeral_ports)).encode(), client.identification)
+            client_connection.peer = server_connection
+            server_connection.peer = client_connection
+            for connection in (client_connection, server_connection):
+                connection.handle = next(_handles)
+                _objects[connection.handle] = connection
+                _connections[connection] = None
+
+            (_, _, client_handler), client.connect_operation = client.connect_operation, None
+            server_handler, self.accept_operation = self.accept_operation, None
+            client.scheduler.post(client_handler, _Errors.OK, client_connection.handle, None)
+            self.scheduler.post(server_handler, _Errors.OK, server_connection.handle, None)
+
+
+class _TcpClient(_Object):
+    def __init__(self, scheduler, identification):
+        self.scheduler = scheduler
+        self.identification = identification
+        self.connect_operation = None
+
+    def fail(self, res):
+        if self.connect_operation is not None:
+            (_, _, completion_handler), self.connect_operation = self.connect_operation, None
+            self.scheduler.post(completion_handler, res, None, None)
+
+    def on_connect_latency_elapsed(self, operation, timeout):
+        with _lock:
+            if self.connect_operation is not operation:
+                return
+            server = _servers.get(operation[1])
+            if server is None:
+                self.fail(_Errors.CONNECTION_REFUSED)
+                return
+            server.backlog.append(self)
+            server.match()
+            if self.connect_operation is operation and timeout >= 0:
+                self.scheduler.post_delayed(timeout / 1000.0, self.on_handshake_timeout, operation)
+
+    def on_handshake_timeout(self, operation):
+        with _lock:
+            if self.connect_operation is operation:
+                self.fail(_Errors.TIMEOUT)
+
+    def destroy(self):
+        self.fail(_Errors.CANCELED)
+
+
+# ======================================================================================================================
+# Topology
+# ======================================================================================================================
+def _find_components():
+    neighbours = _collections.defaultdict(list)
+    for connection in list(_connections):
+        edge = connection.edge
+        if edge is not None:
+            a, b = edge
+            neighbours[a].append(b)
+            neighbours[b].append(a)
+
+    components = {}
+    for start in neighbours:
+        if start in components:
+            continue
+        components[start] = start
+        stack = [start]
+        while stack:
+            for neighbour in neighbours[stack.pop()]:
+                if neighbour not in components:
+                    components[neighbour] = start
+                    stack.append(neighbour)
+    return components
+
+
+def _update():
+    components = _find_components()
+    terminals = [terminal for terminal in list(_terminals) if terminal.leaf.alive]
+    index = _collections.defaultdict(list)
+    for terminal in terminals:
+        index[terminal.info].append(terminal)
+
+    subscribers = {terminal: [] for terminal in _terminals}
+    for binding in list(_bindings):
+        owner = binding.terminal
+        matches = set()
+        if owner.leaf.alive:
+            component = components.get(owner.leaf, owner.leaf)
+            for terminal in index.get((_BOUND_TYPES[owner.type], binding.targets, owner.signature), ()):
+                if terminal.leaf is not owner.leaf and components.get(terminal.leaf, terminal.leaf) is component:
+                    matches.add(terminal)
+                    subscribers[terminal].append(binding)
+
+        added = matches - binding.matches
+        binding.matches = matches
+        binding.state.set(bool(matches))
+        for terminal in added:
+            if terminal.published_message is not None:
+                owner.deliver(terminal.published_message, True)
+
+    for terminal, terminal_subscribers in subscribers.items():
+        terminal.subscribers = terminal_subscribers
+        terminal.subscription_state.set(bool(terminal_subscribers))
+        for operation in list(terminal.operations.values()):
+            operation.check_receivers()
+
+    for node in list(_nodes):
+        component = components.get(node, node)
+        node.update([terminal.info for terminal in sorted(terminals, key=lambda t: t.sequence)
+                     if components.get(terminal.leaf, terminal.leaf) is component])
+
+
+# ======================================================================================================================
+# Library
+# ======================================================================================================================
+_exports = {}
+
+
+def _export(fn):
+    _exports[fn.__name__] = fn
+    return fn
+
+
+class _Function:
+    def __init__(self, name, implementation):
+        self.__name__ = name
+        self._implementation = implementation
+        self.restype = _ctypes.c_int
+        self.argtypes = None
+        self.errcheck = None
+
+    def __call__(self, *args):
+        with _lock:
+            try:
+                res = self._implementation(*args)
+            except _Error as e:
+                res = e.code
+
+        restype = self.restype
+        if restype is None:
+            res = None
+        elif not (isinstance(restype, type) and issubclass(restype, _ctypes._SimpleCData)):
+            res = restype(res)
+
+        if self.errcheck is not None:
+            return self.errcheck(res, self, args)
+        return res
+
+
+class _Library:
+    def __init__(self):
+        for name, implementation in _exports.items():
+            setattr(self, name, _Function(name, implementation))
+
+
+def load() -> _Library:
+    # Like ctypes.cdll.LoadLibrary(), every call returns its own function objects on top of the shared state
+    return _Library()
+
+
+# ======================================================================================================================
+# Free functions
+# ======================================================================================================================
+@_export
+def CHIRP_GetVersion():
+    return VERSION
+
+
+@_export
+def CHIRP_GetErrorString(err):
+    return _ERROR_STRINGS.get(_value(err), 'Unknown error').encode()
+
+
+@_export
+def CHIRP_SetLogFile(filename, verbosity):
+    global _log_file
+    filename = _value(filename)
+    if _log_file is not None:
+        _log_file.close()
+        _log_file = None
+    if filename:
+        try:
+            _log_file = open(filename, 'a')
+        except OSError:
+            raise _Error(_Errors.CANNOT_CREATE_LOG_FILE)
+        _log_file.write('{} libchirp emulator {}: logging with verbosity {}\n'.format(
+            _time.strftime('%d/%m/%Y %H:%M:%S'), VERSION.decode(), _value(verbosity)))
+        _log_file.flush()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_Initialise():
+    global _initialised
+    if _initialised:
+        raise _Error(_Errors.ALREADY_INITIALISED)
+    _initialised = True
+    return _Errors.OK
+
+
+@_export
+def CHIRP_Shutdown():
+    global _initialised, _log_file
+    if not _initialised:
+        raise _Error(_Errors.NOT_INITIALISED)
+    if _log_file is not None:
+        _log_file.close()
+        _log_file = None
+    for obj in list(_objects.values()):
+        if isinstance(obj, _Scheduler):
+            obj.destroy()
+    for registry in (_objects, _terminals, _bindings, _connections, _nodes, _servers):
+        registry.clear()
+    _initialised = False
+    return _Errors.OK
+
+
+@_export
+def CHIRP_Destroy(handle):
+    obj = _get(handle)
+    del _objects[obj.handle]
+    obj.destroy()
+    if not isinstance(obj, (_Scheduler, _TcpServer, _TcpClient)):
+        _update()
+    return _Errors.OK
+
+
+# ======================================================================================================================
+# Schedulers, leafs and nodes
+# ======================================================================================================================
+@_export
+def CHIRP_CreateScheduler(handle):
+    _register(_Scheduler(), handle)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_SetSchedulerThreadPoolSize(scheduler, num_threads):
+    scheduler = _get(scheduler, _Scheduler)
+    num_threads = _value(num_threads)
+    if not 1 <= num_threads <= MAX_THREAD_POOL_SIZE:
+        raise _Error(_Errors.INVALID_PARAM)
+    scheduler.thread_pool_size = num_threads
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CreateLeaf(handle, scheduler):
+    _register(_Leaf(_get(scheduler, _Scheduler)), handle)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CreateNode(handle, scheduler):
+    node = _Node(_get(scheduler, _Scheduler))
+    _register(node, handle)
+    _nodes[node] = None
+    return _Errors.OK
+
+
+@_export
+def CHIRP_GetKnownTerminals(node, buffer, size, num_terminals):
+    node = _get(node, _Node)
+    data = b''.join(_struct.pack('=cI', bytes([terminal_type]), signature) + name + b'\0'
+                    for terminal_type, name, signature in node.known)
+    _write(buffer, _value(size), data)
+    _set_output(num_terminals, len(node.known))
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncAwaitKnownTerminalsChange(node, buffer, size, completion_handler, user_arg):
+    node = _get(node, _Node)
+    if node.awaiter is not None:
+        raise _Error(_Errors.ASYNC_OPERATION_RUNNING)
+    node.tracking = True
+    node.awaiter = (buffer, _value(size), completion_handler)
+    node.dispatch_changes()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CancelAwaitKnownTerminalsChange(node):
+    _get(node, _Node).cancel_await()
+    return _Errors.OK
+
+
+# ======================================================================================================================
+# Terminals and bindings
+# ======================================================================================================================
+@_export
+def CHIRP_CreateTerminal(handle, leaf, terminal_type, name, signature):
+    leaf = _get(leaf, _Leaf)
+    terminal_type = _value(terminal_type)
+    if terminal_type not in range(_T.CLIENT + 1):
+        raise _Error(_Errors.INVALID_PARAM)
+
+    terminal = _Terminal(leaf, terminal_type, _value(name), _value(signature))
+    if terminal_type in _BOUND_TYPES and terminal_type not in _MANUALLY_BOUND_TYPES:
+        terminal.binding = _Binding(terminal, terminal.name)
+        terminal.bindings.append(terminal.binding)
+        _bindings[terminal.binding] = None
+    _register(terminal, handle)
+    _terminals[terminal] = None
+    _update()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CreateBinding(handle, terminal, targets):
+    terminal = _get_terminal(terminal, _MANUALLY_BOUND_TYPES)
+    binding = _Binding(terminal, _value(targets))
+    terminal.bindings.append(binding)
+    _register(binding, handle)
+    _bindings[binding] = None
+    _update()
+    return _Errors.OK
+
+
+def _get_binding_state(handle):
+    obj = _get(handle, _Binding, _Terminal)
+    if isinstance(obj, _Terminal):
+        if obj.binding is None:
+            raise _Error(_Errors.WRONG_OBJECT_TYPE)
+        obj = obj.binding
+    return obj.state
+
+
+@_export
+def CHIRP_GetBindingState(binding, state):
+    _set_output(state, _get_binding_state(binding).get())
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncGetBindingState(binding, completion_handler, user_arg):
+    _get_binding_state(binding).async_get(completion_handler)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncAwaitBindingStateChange(binding, completion_handler, user_arg):
+    _get_binding_state(binding).async_await_change(completion_handler)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CancelAwaitBindingStateChange(binding):
+    _get_binding_state(binding).cancel_await()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_GetSubscriptionState(terminal, state):
+    _set_output(state, _get(terminal, _Terminal).subscription_state.get())
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncGetSubscriptionState(terminal, completion_handler, user_arg):
+    _get(terminal, _Terminal).subscription_state.async_get(completion_handler)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncAwaitSubscriptionStateChange(terminal, completion_handler, user_arg):
+    _get(terminal, _Terminal).subscription_state.async_await_change(completion_handler)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CancelAwaitSubscriptionStateChange(terminal):
+    _get(terminal, _Terminal).subscription_state.cancel_await()
+    return _Errors.OK
+
+
+# ======================================================================================================================
+# Connections
+# ======================================================================================================================
+@_export
+def CHIRP_CreateLocalConnection(handle, endpoint_a, endpoint_b):
+    endpoint_a = _get(endpoint_a, _Endpoint)
+    endpoint_b = _get(endpoint_b, _Endpoint)
+    if endpoint_a is endpoint_b:
+        raise _Error(_Errors.INVALID_PARAM)
+    for connection in _connections:
+        if isinstance(connection, _LocalConnection) and set(connection.endpoints) == {endpoint_a, endpoint_b}:
+            raise _Error(_Errors.ALREADY_CONNECTED)
+
+    connection = _LocalConnection(endpoint_a, endpoint_b)
+    _register(connection, handle)
+    _connections[connection] = None
+    _update()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_GetConnectionDescription(connection, buffer, size):
+    _write(buffer, _value(size), _get(connection, _LocalConnection, _TcpConnection).description, True)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_GetRemoteVersion(connection, buffer, size):
+    _get(connection, _LocalConnection, _TcpConnection)
+    _write(buffer, _value(size), VERSION, True)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_GetRemoteIdentification(connection, buffer, size, bytes_written):
+    identification = _get(connection, _LocalConnection, _TcpConnection).remote_identification or b''
+    size = _value(size)
+    _write(buffer, size, identification, len(identification) < size)
+    _set_output(bytes_written, len(identification))
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AssignConnection(connection, endpoint, timeout):
+    connection = _get(connection, _TcpConnection)
+    endpoint = _get(endpoint, _Endpoint)
+    if connection.endpoint is not None:
+        raise _Error(_Errors.ALREADY_ASSIGNED)
+    if not connection.alive:
+        raise _Error(_Errors.CONNECTION_DEAD)
+    connection.endpoint = endpoint
+    _update()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncAwaitConnectionDeath(connection, completion_handler, user_arg):
+    connection = _get(connection, _TcpConnection)
+    if connection.death_awaiter is not None:
+        raise _Error(_Errors.ASYNC_OPERATION_RUNNING)
+    connection.death_awaiter = completion_handler
+    connection.notify_death()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CancelAwaitConnectionDeath(connection):
+    _get(connection, _TcpConnection).cancel_await_death()
+    return _Errors.OK
+
+
+# ======================================================================================================================
+# TCP servers and clients
+# ======================================================================================================================
+@_export
+def CHIRP_CreateTcpServer(handle, scheduler, address, port, identification, identification_size):
+    scheduler = _get(scheduler, _Scheduler)
+    port = _value(port)
+    if port in _servers:
+        raise _Error(_Errors.ADDRESS_IN_USE)
+    server = _TcpServer(scheduler, _value(address).decode(), port, _read(identification, identification_size))
+    _register(server, handle)
+    _servers[port] = server
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncTcpAccept(server, timeout, completion_handler, user_arg):
+    server = _get(server, _TcpServer)
+    if server.accept_operation is not None:
+        raise _Error(_Errors.ASYNC_OPERATION_RUNNING)
+    server.accept_operation = completion_handler
+    server.match()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CancelTcpAccept(server):
+    _get(server, _TcpServer).cancel_accept()
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CreateTcpClient(handle, scheduler, identification, identification_size):
+    client = _TcpClient(_get(scheduler, _Scheduler), _read(identification, identification_size))
+    _register(client, handle)
+    return _Errors.OK
+
+
+@_export
+def CHIRP_AsyncTcpConnect(client, host, port, timeout, completion_handler, user_arg):
+    client = _get(client, _TcpClient)
+    if client.connect_operation is not None:
+        raise _Error(_Errors.ASYNC_OPERATION_RUNNING)
+    operation = (_value(host).decode(), _value(port), completion_handler)
+    client.connect_operation = operation
+    client.scheduler.post_delayed(CONNECT_LATENCY, client.on_connect_latency_elapsed, operation, _value(timeout))
+    return _Errors.OK
+
+
+@_export
+def CHIRP_CancelTcpConnect(client):
+    _get(client, _TcpClient).fail(_Errors.CANCELED)
+    return _Errors.OK
+
+
+# ======================================================================================================================
+# Messaging terminals
+# ======================================================================================================================
+def _export_messaging(prefix, publishing_types, receiving_types):
+    cached = bool(receiving_types & _CACHED_TYPES)
+    kind = _Terminal.CACHED_MESSAGE if cached else _Terminal.MESSAGE
+
+    def publish(terminal, buffer, size):
+        _get_terminal(terminal, publishing_types).publish(_read(buffer, size) or b'')
+        return _Errors.OK
+
+    def get_cached_message(terminal, buffer, size, bytes_written):
+        message = _get_terminal(terminal, receiving_types).received_message
+        if message is None:
+            raise _Error(_Errors.NOT_READY)
+        _write(buffer, _value(size), message)
+        _set_output(bytes_written, len(message))
+        return _Errors.OK
+
+    def async_receive_message(terminal, buffer, size, completion_handler, user_arg):
+        _get_terminal(terminal, receiving_types).async_receive(kind, buffer, _value(size), completion_handler)
+        return _Errors.OK
+
+    def cancel_receive_message(terminal):
+        _get_terminal(terminal, receiving_types).cancel_receive()
+        return _Errors.OK
+
+    fns = {'Publish': publish, 'AsyncReceiveMessage': async_receive_message,
+           'CancelReceiveMessage': cancel_receive_message}
+    if cached:
+        fns['GetCachedMessage'] = get_cached_message
+    for name, fn in fns.items():
+        fn.__name__ = 'CHIRP_{}_{}'.format(prefix, name)
+        _export(fn)
+
+
+def _export_scatter_gather(prefix, names, scattering_types, receiving_types):
+    def async_scatter(terminal, scatter_buffer, scatter_size, gather_buffer, gather_size, completion_handler,
+                      user_arg):
+        return _get_terminal(terminal, scattering_types).scatter(_read(scatter_buffer, scatter_size) or b'',
+                                                                 gather_buffer, _value(gather_size),
+                                                                 completion_handler)
+
+    def cancel_scatter(terminal, operation_id):
+        _get_terminal(terminal, scattering_types).cancel_operation(_value(operation_id))
+        return _Errors.OK
+
+    def async_receive(terminal, buffer, size, completion_handler, user_arg):
+        _get_terminal(terminal, receiving_types).async_receive(_Terminal.SCATTERED_MESSAGE, buffer, _value(size),
+                                                               completion_handler)
+        return _Errors.OK
+
+    def cancel_receive(terminal):
+        _get_terminal(terminal, receiving_types).cancel_receive()
+        return _Errors.OK
+
+    def respond(terminal, operation_id, buffer, size):
+        _get_terminal(terminal, receiving_types).respond(_value(operation_id), 0, _read(buffer, size) or b'')
+        return _Errors.OK
+
+    def ignore(terminal, operation_id):
+        _get_terminal(terminal, receiving_types).respond(_value(operation_id), _IGNORED)
+        return _Errors.OK
+
+    for name, fn in zip(names, (async_scatter, cancel_scatter, async_receive, cancel_receive, respond, ignore)):
+        fn.__name__ = 'CHIRP_{}_{}'.format(prefix, name)
+        _export(fn)
+
+
+_export_messaging('PS', {_T.PUBLISH_SUBSCRIBE}, {_T.PUBLISH_SUBSCRIBE})
+_export_messaging('CPS', {_T.CACHED_PUBLISH_SUBSCRIBE}, {_T.CACHED_PUBLISH_SUBSCRIBE})
+_export_messaging('PC', {_T.PRODUCER}, {_T.CONSUMER})
+_export_messaging('CPC', {_T.CACHED_PRODUCER}, {_T.CACHED_CONSUMER})
+_export_messaging('MS', {_T.MASTER, _T.SLAVE}, {_T.MASTER, _T.SLAVE})
+_export_messaging('CMS', {_T.CACHED_MASTER, _T.CACHED_SLAVE}, {_T.CACHED_MASTER, _T.CACHED_SLAVE})
+_export_scatter_gather('SG', ('AsyncScatterGather', 'CancelScatterGather', 'AsyncReceiveScatteredMessage',
+                              'CancelReceiveScatteredMessage', 'RespondToScatteredMessage', 'IgnoreScatteredMessage'),
+                       {_T.SCATTER_GATHER}, {_T.SCATTER_GATHER})
+_export_scatter_gather('SC', ('AsyncRequest', 'CancelRequest', 'AsyncReceiveRequest', 'CancelReceiveRequest',
+                              'RespondToRequest', 'IgnoreRequest'),
+                       {_T.CLIENT}, {_T.SERVICE})
@@ -1,7 +1,9 @@
 from . import api
 from . import binding
 from . import connection
+from . import latency
 from . import leaf
+from . import log_collector
 from . import node
 from . import process
 from . import scheduler
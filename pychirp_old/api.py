@@ -1,6 +1,9 @@
 from ctypes import *
 from struct import *
+import os as _os
 import platform
+import threading as _threading
+import time as _time
 
 GET_KNOWN_TERMINALS_BUFFER_SIZE          = 1024**2
 AWAIT_KNOWN_TERMINALS_CHANGE_BUFFER_SIZE = 256
@@ -249,28 +252,49 @@ def _custom_call(shared_lib_fn, argtypes):
 
 
 _library_filename = None
-if platform.system() == 'Windows':
-    _library_filename = "chirp.dll"
-elif platform.system() == 'Linux':
-    _library_filename = "libchirp.so"
+if _os.environ.get('PYCHIRP_EMULATOR', '0') not in ('', '0'):
+    import pychirp_emulator as _pychirp_emulator
+    _chirp = _pychirp_emulator.load()
 else:
-    raise Exception(platform.system() + ' is not supported yet')
+    if platform.system() == 'Windows':
+        _library_filename = "chirp.dll"
+    elif platform.system() == 'Linux':
+        _library_filename = "libchirp.so"
+    else:
+        raise Exception(platform.system() + ' is not supported yet')
 
-try:
-    _chirp = cdll.LoadLibrary(_library_filename)
-except Exception as e:
-    raise Exception('ERROR: Could not load {}: {}. Make sure the library is in your library search path.'.format(_library_filename, e))
+    try:
+        _chirp = cdll.LoadLibrary(_library_filename)
+    except Exception as e:
+        raise Exception('ERROR: Could not load {}: {}. Make sure the library is in your library search path.'.format(_library_filename, e))
 
 
 class _CallbackFunction(object):
     def __init__(self, wrapped_fn):
         self.__wrapped_fn = wrapped_fn
 
+CALLBACK_TIMING_SAMPLE_INTERVAL = 16
+
 _callback_functions = set() # for tricking the garbage collector
+_callback_statistics = [0, 0.0] # number of invoked callbacks and estimated total time spent in them
+_callback_statistics_lock = _threading.Lock()
 def _wrap_callback(wrapper_type, fn):
     stored_object = None
     def clb(*args):
-        ret = fn(*args)
+        with _callback_statistics_lock:
+            _callback_statistics[0] += 1
+            timed = _callback_statistics[0] % CALLBACK_TIMING_SAMPLE_INTERVAL == 0
+        if timed:
+            # Only every Nth callback is timed; its duration stands in for the ones in between
+            t = _time.perf_counter()
+            try:
+                ret = fn(*args)
+            finally:
+                busy_time = (_time.perf_counter() - t) * CALLBACK_TIMING_SAMPLE_INTERVAL
+                with _callback_statistics_lock:
+                    _callback_statistics[1] += busy_time
+        else:
+            ret = fn(*args)
         if ret is None or ret == ControlFlow.STOP:
             _callback_functions.remove(stored_object)
         return ret
@@ -281,6 +305,11 @@ def _wrap_callback(wrapper_type, fn):
     return wrapped_fn
 
 
+def getCallbackStatistics():
+    with _callback_statistics_lock:
+        return len(_callback_functions), _callback_statistics[0], _callback_statistics[1]
+
+
 @_return_string(_chirp.CHIRP_GetVersion, [])
 def getVersion():
     pass
@@ -2,12 +2,23 @@ from . import api as _api
 from . import object as _object
 from . import node as _node
 from . import leaf as _leaf
+import threading as _threading
+import weakref as _weakref
+
+_all_connections = _weakref.WeakSet()
+
+
+def getConnections(endpoint=None):
+    return [connection for connection in list(_all_connections)
+            if connection.is_alive and (endpoint is None or connection.endpoint is endpoint)]
 
 
 class Connection(_object.ChirpObject):
     def __init__(self, handle):
         super(Connection, self).__init__(handle)
         self._endpoint = None
+        self._death_observers = []
+        self._death_observers_lock = _threading.Lock()
         try:
             self._description = _api.getConnectionDescription(self.handle)
             self._remote_version = _api.getRemoteVersion(self.handle)
@@ -15,6 +26,7 @@ class Connection(_object.ChirpObject):
         except:
             self.destroy()
             raise
+        _all_connections.add(self)
 
     @property
     def description(self):
@@ -40,11 +52,37 @@ class Connection(_object.ChirpObject):
 
     def asyncAwaitDeath(self, completion_handler):
         assert hasattr(completion_handler, '__call__')
-        _api.asyncAwaitConnectionDeath(self.handle, completion_handler)
+
+        def wrappedCompletionHandler(err):
+            if err.error_code != _api.ErrorCodes.CANCELED:
+                self._notifyDeathObservers()
+            completion_handler(err)
+
+        _api.asyncAwaitConnectionDeath(self.handle, wrappedCompletionHandler)
 
     def cancelAwaitDeath(self):
         _api.cancelAwaitConnectionDeath(self.handle)
 
+    def addDeathObserver(self, fn):
+        assert hasattr(fn, '__call__')
+        with self._death_observers_lock:
+            self._death_observers.append(fn)
+
+    def removeDeathObserver(self, fn):
+        with self._death_observers_lock:
+            if fn in self._death_observers:
+                self._death_observers.remove(fn)
+
+    def destroy(self):
+        super(Connection, self).destroy()
+        self._notifyDeathObservers()
+
+    def _notifyDeathObservers(self):
+        with self._death_observers_lock:
+            observers, self._death_observers = self._death_observers, []
+        for fn in observers:
+            fn(self)
+
 
 class LocalConnection(_object.ChirpObject):
     def __init__(self, endpoint_a, endpoint_b):
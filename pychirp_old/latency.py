@@ -0,0 +1,291 @@
+import bisect as _bisect
+import collections as _collections
+import logging as _logging
+import struct as _struct
+import threading as _threading
+import time as _time
+from . import terminals as _terminals
+from . import tcp as _tcp
+
+LATENCY_PROBE_SIGNATURE      = 0x50524f42
+LATENCY_PROBE_TERMINAL_NAME  = '/.pychirp/LatencyProbe'
+DEFAULT_PROBE_INTERVAL       = 1.0
+DEFAULT_PROBE_TIMEOUT        = 2.0
+DEFAULT_HISTOGRAM_WINDOW     = 256
+DEFAULT_BUCKET_BOUNDS        = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+THRESHOLD_HYSTERESIS         = 0.9
+LATENCY_SMOOTHING            = 0.3
+
+_PROBE_FORMAT = '<Qd'
+
+_logger = _logging.getLogger('pychirp.latency')
+_probes = {}
+_probes_lock = _threading.Lock()
+
+
+def getProbeTerminalName(identification=None):
+    if not identification:
+        return LATENCY_PROBE_TERMINAL_NAME
+    if isinstance(identification, (bytes, bytearray)):
+        identification = bytes(identification).decode('utf-8', 'replace')
+    return LATENCY_PROBE_TERMINAL_NAME + '/' + identification
+
+
+def getLatencyProbe(connection):
+    with _probes_lock:
+        return _probes.get(connection)
+
+
+def getLatencyProbes():
+    with _probes_lock:
+        return list(_probes.values())
+
+
+class LatencyHistogram(object):
+    def __init__(self, window=DEFAULT_HISTOGRAM_WINDOW, bucket_bounds=DEFAULT_BUCKET_BOUNDS):
+        self._bounds = list(bucket_bounds)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._samples = _collections.deque(maxlen=window)
+
+    @property
+    def count(self):
+        return len(self._samples)
+
+    @property
+    def last(self):
+        return self._samples[-1] if self._samples else None
+
+    def add(self, rtt):
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[_bisect.bisect_left(self._bounds, self._samples[0])] -= 1
+        self._samples.append(rtt)
+        self._counts[_bisect.bisect_left(self._bounds, rtt)] += 1
+
+    def getBuckets(self):
+        return list(zip(self._bounds + [float('inf')], self._counts))
+
+    def getPercentiles(self, percentiles=(50, 90, 99)):
+        return _terminals.getPercentiles(self._samples, percentiles)
+
+    def getSummary(self):
+        samples = list(self._samples)
+        if not samples:
+            return {'count': 0}
+        return {
+            'count'       : len(samples),
+            'min'         : min(samples),
+            'max'         : max(samples),
+            'mean'        : sum(samples) / len(samples),
+            'last'        : samples[-1],
+            'percentiles' : self.getPercentiles()
+        }
+
+
+class LatencyProbeService(object):
+    def __init__(self, leaf, identification=None, name=None):
+        self._terminal = _terminals.ServiceTerminal(leaf, name or getProbeTerminalName(identification),
+                                                    LATENCY_PROBE_SIGNATURE)
+        self._terminal.request_handler = self._onRequest
+
+    @property
+    def terminal(self):
+        return self._terminal
+
+    def destroy(self):
+        self._terminal.tryDestroy()
+
+    @staticmethod
+    def _onRequest(err, data):
+        if err:
+            return None
+        return data
+
+
+class LatencyProbe(object):
+    def __init__(self, leaf, connection, name=None, interval=DEFAULT_PROBE_INTERVAL, timeout=DEFAULT_PROBE_TIMEOUT,
+                 thresholds=(), window=DEFAULT_HISTOGRAM_WINDOW):
+        if not name and not connection.remote_identification:
+            raise ValueError('Connection {} has no remote identification; the probe would measure whichever '
+                             'service the network routes to'.format(connection.description))
+
+        self._leaf = leaf
+        self._connection = connection
+        self._name = name or getProbeTerminalName(connection.remote_identification)
+        self._interval = interval
+        self._timeout = timeout
+        self._thresholds = sorted(thresholds)
+        self._histogram = LatencyHistogram(window)
+        self._lock = _threading.Lock()
+        self._seq = 0
+        self._pending = {}
+        self._sent = 0
+        self._received = 0
+        self._lost = 0
+        self._smoothed = None
+        self._level = 0
+        self._on_threshold_crossed = None
+        self._timer = None
+        self._running = True
+
+        with _probes_lock:
+            for probe in _probes.values():
+                if probe._connection is connection or (probe._leaf is leaf and probe._name == self._name):
+                    raise ValueError('A latency probe for {} on {} already exists'.format(
+                        self._name, probe._connection.description))
+            self._terminal = _terminals.ClientTerminal(leaf, self._name, LATENCY_PROBE_SIGNATURE)
+            _probes[connection] = self
+
+        # Stop as soon as the connection dies so that a reconnect under the same identification is never measured
+        # in the name of the old connection
+        connection.addDeathObserver(self._onConnectionDied)
+        if not connection.is_alive:
+            self.destroy()
+            return
+
+        with self._lock:
+            if self._running:
+                self._timer = _tcp.scheduleTimer(0.0, self._sendProbe)
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def terminal(self):
+        return self._terminal
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def thresholds(self):
+        return list(self._thresholds)
+
+    @property
+    def histogram(self):
+        return self._histogram
+
+    @property
+    def smoothed_rtt(self):
+        return self._smoothed
+
+    @property
+    def level(self):
+        return self._level
+
+    @property
+    def on_threshold_crossed(self):
+        return self._on_threshold_crossed
+
+    @on_threshold_crossed.setter
+    def on_threshold_crossed(self, fn):
+        self._on_threshold_crossed = fn
+
+    @property
+    def statistics(self):
+        with self._lock:
+            statistics = self._histogram.getSummary()
+            statistics.update({
+                'connection'   : self._connection.description,
+                'sent'         : self._sent,
+                'received'     : self._received,
+                'lost'         : self._lost,
+                'smoothed_rtt' : self._smoothed,
+                'level'        : self._level
+            })
+            return statistics
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def destroy(self):
+        with self._lock:
+            self._running = False
+            if self._timer is not None:
+                _tcp.cancelTimer(self._timer)
+                self._timer = None
+            for timer in self._pending.values():
+                _tcp.cancelTimer(timer)
+            self._pending.clear()
+        with _probes_lock:
+            if _probes.get(self._connection) is self:
+                del _probes[self._connection]
+        self._connection.removeDeathObserver(self._onConnectionDied)
+        self._terminal.tryDestroy()
+
+    def _onConnectionDied(self, connection):
+        with self._lock:
+            self._running = False
+        _logger.debug('Stopping latency probe on {}: connection died'.format(connection.description))
+        _tcp.scheduleTimer(0.0, self.destroy)
+
+    def _sendProbe(self):
+        with self._lock:
+            if not self._running:
+                return
+            self._seq += 1
+            seq = self._seq
+            sent_at = _time.perf_counter()
+            self._pending[seq] = _tcp.scheduleTimer(self._timeout, lambda: self._onProbeTimeout(seq))
+            self._sent += 1
+            self._timer = _tcp.scheduleTimer(self._interval, self._sendProbe)
+
+        try:
+            self._terminal.asyncRequest(bytearray(_struct.pack(_PROBE_FORMAT, seq, sent_at)), self._onResponse)
+        except Exception as e:
+            _logger.debug('Sending latency probe on {} failed: {}'.format(self._connection.description, e))
+
+    def _onResponse(self, err, operation_id, flags, data):
+        if err or flags & (_terminals.ClientTerminal.Flags.IGNORED | _terminals.ClientTerminal.Flags.DEAF |
+                           _terminals.ClientTerminal.Flags.BINDING_DESTROYED |
+                           _terminals.ClientTerminal.Flags.CONNECTION_LOST):
+            return _terminals.ClientTerminal.ControlFlow.STOP
+
+        rtt = None
+        try:
+            seq, sent_at = _struct.unpack(_PROBE_FORMAT, bytes(data))
+        except _struct.error:
+            return _terminals.ClientTerminal.ControlFlow.STOP
+
+        with self._lock:
+            timer = self._pending.pop(seq, None)
+            if timer is not None:
+                _tcp.cancelTimer(timer)
+                rtt = _time.perf_counter() - sent_at
+                self._received += 1
+                self._histogram.add(rtt)
+
+        if rtt is not None:
+            self._updateLevel(rtt)
+        return _terminals.ClientTerminal.ControlFlow.STOP
+
+    def _onProbeTimeout(self, seq):
+        with self._lock:
+            if self._pending.pop(seq, None) is None or not self._running:
+                return
+            self._lost += 1
+        self._updateLevel(self._timeout)
+
+    def _updateLevel(self, rtt):
+        with self._lock:
+            if self._smoothed is None:
+                self._smoothed = rtt
+            else:
+                self._smoothed += LATENCY_SMOOTHING * (rtt - self._smoothed)
+
+            level = self._level
+            while level < len(self._thresholds) and self._smoothed > self._thresholds[level]:
+                level += 1
+            while level > 0 and self._smoothed < self._thresholds[level - 1] * THRESHOLD_HYSTERESIS:
+                level -= 1
+
+            previous_level, self._level = self._level, level
+            smoothed = self._smoothed
+
+        if level != previous_level:
+            _logger.info('Latency on {} changed to level {} (smoothed RTT {:.3f} ms)'.format(
+                self._connection.description, level, smoothed * 1000.0))
+            if self._on_threshold_crossed:
+                self._on_threshold_crossed(self, previous_level, level, smoothed)
@@ -0,0 +1,333 @@
+import argparse as _argparse
+import collections as _collections
+import concurrent.futures as _futures
+import gzip as _gzip
+import json as _json
+import logging as _logging
+import lzma as _lzma
+import multiprocessing as _multiprocessing
+import os as _os
+import threading as _threading
+import time as _time
+from . import leaf as _leaf
+from . import scheduler as _scheduler
+from . import terminals as _terminals
+from . import tcp as _tcp
+from .proto import chirp_000009cd as _chirp_000009cd
+
+GLOBAL_LOG_TERMINAL_NAME     = '/Log'
+LINE_DATE_FORMAT             = '%d/%m/%Y %H:%M:%S'
+DEFAULT_QUEUE_SIZE           = 100000
+DEFAULT_BATCH_SIZE           = 512
+DEFAULT_BATCH_INTERVAL       = 0.05
+DEFAULT_MAX_FILE_SIZE        = 100 * 1024 * 1024
+DEFAULT_METRICS_INTERVAL     = 10.0
+COMPRESSION_EXTENSIONS       = {None: '', 'gzip': '.gz', 'lzma': '.xz'}
+
+_logger = _logging.getLogger('pychirp.log_collector')
+
+
+def _formatLogLine(timestamp, message, metadata):
+    seconds, ns = divmod(timestamp, 1000000000)
+    try:
+        info = _json.loads(metadata) if metadata else {}
+    except ValueError:
+        info = {}
+    return '{}.{:03d} {} {} [{}:{}] {}\n'.format(
+        _time.strftime(LINE_DATE_FORMAT, _time.localtime(seconds)), ns // 1000000, info.get('severity', '?'),
+        info.get('component', '?'), info.get('file', '?'), info.get('line', '?'), message)
+
+
+def _decodeLogBatch(payloads):
+    msg = _chirp_000009cd.PublishMessage()
+    lines = []
+    newest_timestamp = 0
+    errors = 0
+    for payload in payloads:
+        try:
+            msg.ParseFromString(payload)
+        except Exception:
+            errors += 1
+            continue
+        lines.append(_formatLogLine(msg.timestamp, msg.value.first, msg.value.second))
+        newest_timestamp = max(newest_timestamp, msg.timestamp)
+    return ''.join(lines), len(lines), errors, newest_timestamp
+
+
+class RotatingLogFile(object):
+    # max_size applies to the bytes on disk; for compressed files that is what the compressor has flushed so far
+    def __init__(self, directory, prefix='chirp', max_size=DEFAULT_MAX_FILE_SIZE, max_age=None, compression=None):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise Exception('Unsupported compression "{}"; use one of gzip or lzma'.format(compression))
+        self._directory = directory
+        self._prefix = prefix
+        self._max_size = max_size
+        self._max_age = max_age
+        self._compression = compression
+        self._file = None
+        self._raw_file = None
+        self._filename = None
+        self._size = 0
+        self._opened_at = 0
+        self._rotations = 0
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def rotations(self):
+        return self._rotations
+
+    def write(self, text):
+        if self._file is None or self._needsRotation():
+            self._rotate()
+        self._file.write(text.encode('utf-8'))
+        self._size = self._raw_file.tell()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            self._size = self._raw_file.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._raw_file.close()
+            self._file = None
+            self._raw_file = None
+
+    def _needsRotation(self):
+        if self._max_size is not None and self._size >= self._max_size:
+            return True
+        if self._max_age is not None and _time.time() - self._opened_at >= self._max_age:
+            return True
+        return False
+
+    def _rotate(self):
+        if self._file is not None:
+            self.close()
+            self._rotations += 1
+
+        self._opened_at = _time.time()
+        base = _os.path.join(self._directory, '{}-{}'.format(
+            self._prefix, _time.strftime('%Y%m%d-%H%M%S', _time.localtime(self._opened_at))))
+        extension = '.log' + COMPRESSION_EXTENSIONS[self._compression]
+        filename = base + extension
+        n = 1
+        while _os.path.exists(filename):
+            filename = '{}-{}{}'.format(base, n, extension)
+            n += 1
+
+        self._raw_file = open(filename, 'wb')
+        if self._compression == 'gzip':
+            self._file = _gzip.GzipFile(filename, 'wb', fileobj=self._raw_file)
+        elif self._compression == 'lzma':
+            self._file = _lzma.LZMAFile(self._raw_file, 'wb')
+        else:
+            self._file = self._raw_file
+        self._filename = filename
+        self._size = 0
+
+
+class LogCollector(object):
+    def __init__(self, leaf, log_file, terminal_name=GLOBAL_LOG_TERMINAL_NAME, workers=None, use_processes=False,
+                 queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE, batch_interval=DEFAULT_BATCH_INTERVAL):
+        self._log_file = log_file
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._batch_interval = batch_interval
+        self._queue = _collections.deque()
+        self._cv = _threading.Condition(_threading.Lock())
+        self._running = True
+
+        self._received = 0
+        self._dropped = 0
+        self._written = 0
+        self._decode_errors = 0
+        self._write_errors = 0
+        self._lag = 0.0
+        self._max_lag = 0.0
+
+        workers = workers or _os.cpu_count() or 1
+        if use_processes:
+            # Forking would copy the libchirp scheduler threads' locks in whatever state they are in
+            self._executor = _futures.ProcessPoolExecutor(workers, mp_context=_multiprocessing.get_context('spawn'))
+        else:
+            self._executor = _futures.ThreadPoolExecutor(workers)
+        self._pending_batches = _collections.deque()
+        self._max_pending_batches = workers * 2
+        self._batches_cv = _threading.Condition(_threading.Lock())
+
+        self._dispatch_thread = _threading.Thread(target=self._dispatchThreadFn, name='pychirp log dispatcher')
+        self._dispatch_thread.daemon = True
+        self._dispatch_thread.start()
+        self._write_thread = _threading.Thread(target=self._writeThreadFn, name='pychirp log writer')
+        self._write_thread.daemon = True
+        self._write_thread.start()
+
+        self._terminal = _terminals.ConsumerTerminal(leaf, terminal_name,
+                                                     _chirp_000009cd.PublishMessage.SIGNATURE)
+        self._terminal.on_message_received = self._onMessageReceived
+
+    @property
+    def terminal(self):
+        return self._terminal
+
+    @property
+    def metrics(self):
+        with self._cv:
+            queued = len(self._queue)
+        return {
+            'received'      : self._received,
+            'dropped'       : self._dropped,
+            'written'       : self._written,
+            'decode_errors' : self._decode_errors,
+            'write_errors'  : self._write_errors,
+            'queued'        : queued,
+            'lag'           : self._lag,
+            'max_lag'       : self._max_lag,
+            'rotations'     : self._log_file.rotations
+        }
+
+    def resetMaxLag(self):
+        self._max_lag = 0.0
+
+    def destroy(self, timeout=5.0):
+        self._terminal.tryDestroy()
+        with self._cv:
+            self._running = False
+            self._cv.notifyAll()
+        self._dispatch_thread.join(timeout)
+        with self._batches_cv:
+            self._pending_batches.append(None)
+            self._batches_cv.notifyAll()
+        self._write_thread.join(timeout)
+        self._executor.shutdown(wait=False)
+        self._log_file.close()
+
+    def _onMessageReceived(self, payload):
+        with self._cv:
+            self._received += 1
+            if len(self._queue) >= self._queue_size:
+                self._queue.popleft()
+                self._dropped += 1
+            self._queue.append(bytes(payload))
+            if len(self._queue) >= self._batch_size:
+                self._cv.notify()
+
+    def _dispatchThreadFn(self):
+        while True:
+            with self._cv:
+                if len(self._queue) < self._batch_size and self._running:
+                    self._cv.wait(self._batch_interval)
+                if not self._queue:
+                    if not self._running:
+                        return
+                    continue
+
+                batch = []
+                while self._queue and len(batch) < self._batch_size:
+                    batch.append(self._queue.popleft())
+
+            future = self._executor.submit(_decodeLogBatch, batch)
+            with self._batches_cv:
+                while len(self._pending_batches) >= self._max_pending_batches:
+                    self._batches_cv.wait()
+                self._pending_batches.append((future, len(batch)))
+                self._batches_cv.notifyAll()
+
+    def _writeThreadFn(self):
+        while True:
+            with self._batches_cv:
+                while not self._pending_batches:
+                    self._batches_cv.wait()
+                entry = self._pending_batches.popleft()
+                self._batches_cv.notifyAll()
+
+            if entry is None:
+                self._log_file.flush()
+                return
+
+            future, num_payloads = entry
+            try:
+                text, num_lines, errors, newest_timestamp = future.result()
+            except Exception as e:
+                _logger.error('Failed to decode a batch of {} log messages: {}'.format(num_payloads, e))
+                self._decode_errors += num_payloads
+                continue
+
+            self._decode_errors += errors
+            try:
+                self._log_file.write(text)
+                self._log_file.flush()
+                self._written += num_lines
+            except Exception as e:
+                _logger.error('Failed to write {} log lines: {}'.format(num_lines, e))
+                self._write_errors += num_lines
+
+            if newest_timestamp:
+                self._lag = max(0.0, _time.time() - newest_timestamp / 1e9)
+                self._max_lag = max(self._max_lag, self._lag)
+
+
+def _splitTarget(target):
+    host, port = target.rsplit(':', 1)
+    if host.startswith('[') and host.endswith(']'):
+        host = host[1:-1]
+    return host, int(port)
+
+
+def _makeArgumentParser():
+    parser = _argparse.ArgumentParser(description='Collect the CHIRP /Log terminal into rotating log files')
+    parser.add_argument('-c', '--connect', dest='connect', type=str, metavar='host:port', required=True,
+                        help='CHIRP server to connect to (e.g. "hostname:12000")')
+    parser.add_argument('-i', '--identification', dest='identification', type=str, metavar='string',
+                        help='Identification for CHIRP connections')
+    parser.add_argument('-d', '--directory', dest='directory', type=str, default='.',
+                        help='Directory to write the log files to')
+    parser.add_argument('--prefix', type=str, default='chirp', help='Prefix for the log file names')
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_FILE_SIZE, metavar='bytes',
+                        help='Rotate log files once they reach this size')
+    parser.add_argument('--max-age', type=float, metavar='seconds', help='Rotate log files after this time')
+    parser.add_argument('--compression', choices=['gzip', 'lzma'], help='Compress the log files')
+    parser.add_argument('--workers', type=int, help='Number of decoder threads (default: number of CPUs)')
+    parser.add_argument('--processes', action='store_true', help='Decode in processes instead of threads')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help='Maximum number of received but not yet decoded messages')
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_METRICS_INTERVAL, metavar='seconds',
+                        help='Interval for reporting drop and lag metrics')
+    return parser
+
+
+def main(argv=None):
+    args = _makeArgumentParser().parse_args(argv)
+
+    _logging.basicConfig(level=_logging.INFO, format='%(asctime)s %(levelname)s - %(message)s')
+
+    scheduler = _scheduler.Scheduler(num_threads=2)
+    leaf = _leaf.Leaf(scheduler)
+    log_file = RotatingLogFile(args.directory, args.prefix, args.max_size, args.max_age, args.compression)
+    collector = LogCollector(leaf, log_file, workers=args.workers, use_processes=args.processes,
+                             queue_size=args.queue_size)
+    host, port = _splitTarget(args.connect)
+    identification = bytearray(args.identification.encode()) if args.identification else None
+    client = _tcp.SimpleTcpClient(leaf, host, port, identification, log=_logger.info)
+
+    try:
+        while True:
+            _time.sleep(args.metrics_interval)
+            metrics = collector.metrics
+            _logger.info('Received {received}, written {written}, dropped {dropped}, decode errors {decode_errors}, '
+                         'queued {queued}, lag {lag:.3f}s (max {max_lag:.3f}s), rotations {rotations}'
+                         .format(**metrics))
+            collector.resetMaxLag()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.destroy()
+        collector.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,18 @@
 from __future__ import print_function
 import argparse as _argparse
+import collections as _collections
+import concurrent.futures as _futures
+import gc as _gc
 import glob as _glob
 import json as _json
 import logging as _logging
 import posixpath as _posixpath
 import sys as _sys
 import threading as _threading
+import time as _time
+from . import api as _api
+from . import connection as _connections
+from . import latency as _latency
 from . import leaf as _leaf
 from . import scheduler as _scheduler
 from . import terminals as _terminals
@@ -13,12 +20,24 @@ from . import tcp as _tcp
 from .proto import chirp_00000001 as _chirp_00000001
 from .proto import chirp_000009cd as _chirp_000009cd
 from .proto import chirp_0000040d as _chirp_0000040d
+from .proto import chirp_4c4f4742 as _chirp_4c4f4742
 
 DEFAULT_SCHEDULER_THREAD_POOL_SIZE = 2
 GLOBAL_LOG_TERMINAL_NAME           = '/Log'
 LOGGING_FORMAT                     = '%(asctime)s.%(msecs).03d %(levelname)s - %(message)s'
 LOGGING_DATE_FORMAT                = '%d/%m/%Y %H:%M:%S'
 LOGGER_NAME                        = 'pychirp'
+CHIRP_LOG_QUEUE_SIZE               = 10000
+JSON_SIGNATURE                     = 0x4a534f4e
+LOGGING_CONTROL_SIGNATURE          = JSON_SIGNATURE
+METRICS_SIGNATURE                  = JSON_SIGNATURE
+STATUS_COALESCING_WINDOW           = 0.05
+METRICS_INTERVAL                   = 5.0
+
+try:
+    import resource as _resource
+except ImportError:
+    _resource = None
 
 _logger = _logging.getLogger(LOGGER_NAME)
 
@@ -34,8 +53,12 @@ class ProcessInterface(object):
         self._setupLogging()
         self._operational = False
         self._operational_terminal.tryPublish(value=self._operational)
-        self._errors = set()
-        self._warnings = set()
+        window = self.getConfigurationValue('chirp.status_coalescing_window', STATUS_COALESCING_WINDOW)
+        self._errors = _StatusPublisher(self._errors_terminal, self._error_changes_terminal, window)
+        self._warnings = _StatusPublisher(self._warnings_terminal, self._warning_changes_terminal, window)
+        self._tcp_client = None
+        self._metrics_publisher = _MetricsPublisher(self, self._metrics_terminal,
+            self.getConfigurationValue('chirp.metrics_interval', METRICS_INTERVAL))
 
     @property
     def connect_target(self):
@@ -77,45 +100,79 @@ class ProcessInterface(object):
             _logger.info('ProcessInterface: Operational changed to {}'.format(boolean))
 
     def getConfigurationValue(self, location, default=None):
-        sections = location.split('.')
-        thing = self._configuration
-        while sections:
-            name = sections.pop(0)
-            if name in thing:
-                thing = thing[name]
-            else:
-                if default is None:
-                    raise Exception('Required configuration value "{}" not found in any configuration files'.format(
-                        location))
-                else:
-                    return default
-        return thing
+        try:
+            return self._flat_configuration[location]
+        except KeyError:
+            if default is None:
+                raise Exception('Required configuration value "{}" not found in any configuration files'.format(
+                    location))
+            return default
 
     def start(self):
         self._createTcpClient()
 
+    def getLoggingLevels(self):
+        manager = _logging.Logger.manager
+        return {
+            'stdout_level'  : _logging.getLevelName(self._stdout_log_handler.level),
+            'chirp_level'   : _logging.getLevelName(self._chirp_log_handler.level),
+            'logger_levels' : {name: _logging.getLevelName(logger.level)
+                               for name, logger in list(manager.loggerDict.items())
+                               if isinstance(logger, _logging.Logger) and logger.level != _logging.NOTSET}
+        }
+
+    def setLoggingLevels(self, stdout_level=None, chirp_level=None, logger_levels=None):
+        levels = {}
+        for key, level in [('stdout', stdout_level), ('chirp', chirp_level)] + list((logger_levels or {}).items()):
+            if level is not None:
+                levels[key] = _toLoggingLevel(level)
+
+        with self._logging_lock:
+            if stdout_level is not None:
+                self._stdout_log_handler.setLevel(levels['stdout'])
+            if chirp_level is not None:
+                self._chirp_log_handler.setLevel(levels['chirp'])
+            for logger_name in (logger_levels or {}):
+                _logging.getLogger(logger_name).setLevel(levels[logger_name])
+            self._root_logger.setLevel(min(self._stdout_log_handler.level, self._chirp_log_handler.level))
+            state = self.getLoggingLevels()
+            self._logging_terminal.tryPublishMessage(bytearray(_json.dumps(state).encode()))
+
+        _logger.info('ProcessInterface: Logging levels changed to {}'.format(state))
+        return state
+
+    def getMetrics(self):
+        return self._metrics_publisher.collect()
+
+    def stopPublishingMetrics(self):
+        self._metrics_publisher.stop()
+
     def createTerminal(self, cls, name, signature_or_proto_module):
         return cls(self._leaf, _posixpath.join(self._location, name), signature_or_proto_module)
 
+    @property
+    def errors(self):
+        return self._errors.descriptions
+
+    @property
+    def warnings(self):
+        return self._warnings.descriptions
+
     def setError(self, description):
-        if description not in self._errors:
-            self._errors.add(description)
-            self._errors_terminal.tryPublish(value=list(self._errors))
+        self._errors.add(description)
 
     def clearError(self, description):
-        if description in self._errors:
-            self._errors.remove(description)
-            self._errors_terminal.tryPublish(value=list(self._errors))
+        self._errors.remove(description)
 
     def setWarning(self, description):
-        if description not in self._warnings:
-            self._warnings.add(description)
-            self._warnings_terminal.tryPublish(value=list(self._warnings))
+        self._warnings.add(description)
 
     def clearWarning(self, description):
-        if description in self._warnings:
-            self._warnings.remove(description)
-            self._warnings_terminal.tryPublish(value=list(self._warnings))
+        self._warnings.remove(description)
+
+    def flushErrorsAndWarnings(self):
+        self._errors.flush()
+        self._warnings.flush()
 
     def _parseCommandLineAndConfiguration(self, description):
         parser = _argparse.ArgumentParser(description=description)
@@ -149,6 +206,8 @@ class ProcessInterface(object):
                 # print(' OK.')
         # print('done.')
 
+        self._flat_configuration = _flattenConfiguration(self._configuration)
+
         self._connect_target = None
         self._timeout = None
         self._location = None
@@ -181,12 +240,26 @@ class ProcessInterface(object):
             self._leaf, GLOBAL_LOG_TERMINAL_NAME, _chirp_000009cd)
         self._local_log_terminal = _terminals.ProducerProtoTerminal(
             self._leaf, _posixpath.join(self._location, 'Log'), _chirp_000009cd)
+        self._global_log_batch_terminal = _terminals.ProducerProtoTerminal(
+            self._leaf, GLOBAL_LOG_TERMINAL_NAME, _chirp_4c4f4742)
+        self._local_log_batch_terminal = _terminals.ProducerProtoTerminal(
+            self._leaf, _posixpath.join(self._location, 'Log'), _chirp_4c4f4742)
         self._errors_terminal = _terminals.CachedProducerProtoTerminal(
             self._leaf, _posixpath.join(self._location, 'Errors'), _chirp_0000040d)
         self._warnings_terminal = _terminals.CachedProducerProtoTerminal(
             self._leaf, _posixpath.join(self._location, 'Warnings'), _chirp_0000040d)
+        self._error_changes_terminal = _terminals.ProducerProtoTerminal(
+            self._leaf, _posixpath.join(self._location, 'ErrorChanges'), _chirp_0000040d)
+        self._warning_changes_terminal = _terminals.ProducerProtoTerminal(
+            self._leaf, _posixpath.join(self._location, 'WarningChanges'), _chirp_0000040d)
         self._operational_terminal = _terminals.CachedProducerProtoTerminal(
             self._leaf, _posixpath.join(self._location, 'Operational'), _chirp_00000001)
+        self._metrics_terminal = _terminals.CachedProducerTerminal(
+            self._leaf, _posixpath.join(self._location, 'Metrics'), METRICS_SIGNATURE)
+        self._logging_terminal = _terminals.CachedProducerTerminal(
+            self._leaf, _posixpath.join(self._location, 'Logging'), LOGGING_CONTROL_SIGNATURE)
+        self._logging_control_terminal = _terminals.ServiceTerminal(
+            self._leaf, _posixpath.join(self._location, 'LoggingControl'), LOGGING_CONTROL_SIGNATURE)
 
     def _createTcpClient(self):
         if self._connect_target:
@@ -199,75 +272,393 @@ class ProcessInterface(object):
         _logger.info('CHIRP ' + message)
 
     def _setupLogging(self):
+        self._logging_lock = _threading.Lock()
+        stdout_level = self.getConfigurationValue('logging.stdout_level', 'INFO')
+
         self._stdout_log_handler = _logging.StreamHandler(stream=_sys.stdout)
         self._stdout_log_handler.setFormatter(_logging.Formatter(LOGGING_FORMAT, LOGGING_DATE_FORMAT))
-        self._stdout_log_handler.setLevel(_logging.__dict__[
-            self.getConfigurationValue('logging.stdout_level', 'INFO').upper()])
 
-        self._chirp_log_handler = _ChirpLogHandler([self._global_log_terminal, self._local_log_terminal])
-        self._chirp_log_handler.setLevel(_logging.__dict__[
-            self.getConfigurationValue('logging.stdout_level', 'INFO').upper()])
+        self._chirp_log_handler = _ChirpLogHandler(
+            [self._global_log_batch_terminal, self._local_log_batch_terminal],
+            self.getConfigurationValue('logging.chirp_queue_size', CHIRP_LOG_QUEUE_SIZE),
+            [self._global_log_terminal, self._local_log_terminal])
 
         self._root_logger = _logging.getLogger()
         self._root_logger.handlers = [self._stdout_log_handler, self._chirp_log_handler]
-        self._root_logger.setLevel(_logging.DEBUG)
 
-        for logger_name, level in self.getConfigurationValue('logging.logger_specific_level', {}).items():
-            _logging.getLogger(logger_name).setLevel(_logging.__dict__[level.upper()])
+        self.setLoggingLevels(stdout_level, self.getConfigurationValue('logging.chirp_level', stdout_level),
+                              self.getConfigurationValue('logging.logger_specific_level', {}))
+        self._logging_control_terminal.request_handler = self._onLoggingControlRequest
+
+    def _onLoggingControlRequest(self, err, data):
+        if err:
+            return None
+
+        try:
+            request = _json.loads(bytes(data).decode()) if data else {}
+            state = self.setLoggingLevels(request.get('stdout_level'), request.get('chirp_level'),
+                                          request.get('logger_levels'))
+        except Exception as e:
+            _logger.warning('ProcessInterface: Invalid logging control request: {}'.format(e))
+            state = {'error': str(e)}
+
+        return bytearray(_json.dumps(state).encode())
+
+
+class _StatusPublisher(object):
+    def __init__(self, terminal, changes_terminal, window):
+        self._terminal = terminal
+        self._changes_terminal = changes_terminal
+        self._window = window
+        self._lock = _threading.Lock()
+        self._descriptions = set()
+        self._changes = _collections.OrderedDict()
+        self._timer = None
+        self._terminal.tryPublish(value=[])
+
+    @property
+    def descriptions(self):
+        with self._lock:
+            return sorted(self._descriptions)
+
+    def add(self, description):
+        with self._lock:
+            if description in self._descriptions:
+                return
+            self._descriptions.add(description)
+            self._recordChange(description, '+')
+        if self._window <= 0:
+            self.flush()
+
+    def remove(self, description):
+        with self._lock:
+            if description not in self._descriptions:
+                return
+            self._descriptions.remove(description)
+            self._recordChange(description, '-')
+        if self._window <= 0:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._changes:
+                return
+            snapshot = sorted(self._descriptions)
+            changes = [sign + description for description, sign in self._changes.items()]
+            self._changes.clear()
+
+            self._terminal.tryPublish(value=snapshot)
+            if self._changes_terminal.is_subscribed:
+                self._changes_terminal.tryPublish(value=changes)
+
+    def _recordChange(self, description, sign):
+        previous = self._changes.pop(description, None)
+        if previous is None or previous == sign:
+            self._changes[description] = sign
+
+        if self._window > 0 and self._timer is None:
+            self._timer = _threading.Timer(self._window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+class _MetricsPublisher(object):
+    def __init__(self, process_interface, terminal, interval):
+        self._process_interface = process_interface
+        self._terminal = terminal
+        self._interval = interval
+        self._previous_time = _time.time()
+        self._previous_terminal_counters = {}
+        self._previous_callback_statistics = _api.getCallbackStatistics()
+        self._lock = _threading.Lock()
+        self._stop_event = _threading.Event()
+        self._thread = None
+
+        if interval > 0:
+            self._thread = _threading.Thread(target=self._threadFn, name='pychirp metrics publisher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def collect(self):
+        with self._lock:
+            now = _time.time()
+            elapsed = max(now - self._previous_time, 1e-9)
+            self._previous_time = now
+
+            terminals = {}
+            counters = {}
+            for terminal in _terminals.getTerminals(self._process_interface.leaf):
+                metrics = terminal.metrics
+                current = (metrics.messages_received, metrics.bytes_received, metrics.messages_sent,
+                           metrics.bytes_sent)
+                previous = self._previous_terminal_counters.get(id(terminal), (0, 0, 0, 0))
+                counters[id(terminal)] = current
+                terminals[terminal.name] = {
+                    'messages_received'       : current[0],
+                    'bytes_received'          : current[1],
+                    'messages_sent'           : current[2],
+                    'bytes_sent'              : current[3],
+                    'message_receive_rate'    : (current[0] - previous[0]) / elapsed,
+                    'byte_receive_rate'       : (current[1] - previous[1]) / elapsed,
+                    'message_send_rate'       : (current[2] - previous[2]) / elapsed,
+                    'byte_send_rate'          : (current[3] - previous[3]) / elapsed,
+                    'handler_latency'         : metrics.getLatencyPercentiles()
+                }
+            self._previous_terminal_counters = counters
+
+            registered, invoked, busy_time = _api.getCallbackStatistics()
+            previous_invoked, previous_busy_time = self._previous_callback_statistics[1:]
+            self._previous_callback_statistics = (registered, invoked, busy_time)
+            threads = self._process_interface.scheduler.num_threads
+
+            return {
+                'timestamp'              : int(now * 1000000000),
+                'interval'               : elapsed,
+                'terminals'              : terminals,
+                'scheduler'              : {
+                    'threads'            : threads,
+                    'callback_rate'      : (invoked - previous_invoked) / elapsed,
+                    'utilisation'        : (busy_time - previous_busy_time) / (elapsed * threads)
+                },
+                'open_connections'       : len(_connections.getConnections(self._process_interface.leaf)),
+                'connection_reaper'      : _tcp.getConnectionReaperMetrics(),
+                'latency_probes'         : [probe.statistics for probe in _latency.getLatencyProbes()],
+                'callback_registry_size' : registered,
+                'process'                : _collectProcessStatistics()
+            }
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not _threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _threadFn(self):
+        while not self._stop_event.wait(self._interval):
+            try:
+                metrics = self.collect()
+                self._terminal.tryPublishMessage(bytearray(_json.dumps(metrics).encode()))
+            except Exception as e:
+                _logger.warning('ProcessInterface: Failed to collect metrics: {}'.format(e))
+
+
+def _collectProcessStatistics():
+    statistics = {
+        'threads'        : _threading.active_count(),
+        'gc_counts'      : list(_gc.get_count()),
+        'gc_collections' : [generation['collections'] for generation in _gc.get_stats()]
+    }
+
+    try:
+        with open('/proc/self/statm') as file:
+            statistics['rss_bytes'] = int(file.read().split()[1]) * _resource.getpagesize()
+    except Exception:
+        pass
+
+    if _resource is not None:
+        usage = _resource.getrusage(_resource.RUSAGE_SELF)
+        statistics['max_rss_bytes'] = usage.ru_maxrss * (1 if _sys.platform == 'darwin' else 1024)
+        statistics['cpu_time'] = usage.ru_utime + usage.ru_stime
+
+    return statistics
+
+
+def _flattenConfiguration(configuration, prefix='', table=None):
+    if table is None:
+        table = {}
+    for key, value in configuration.items():
+        path = prefix + str(key)
+        table[path] = value
+        if isinstance(value, dict):
+            _flattenConfiguration(value, path + '.', table)
+    return table
+
+
+def _toLoggingLevel(level):
+    if isinstance(level, int):
+        return level
+    value = _logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise Exception('Invalid logging level "{}"'.format(level))
+    return value
 
 
 class _ChirpLogHandler(_logging.Handler):
-    def __init__(self, terminals):
+    MAX_BATCH_SIZE           = 256
+    MAX_CACHED_METADATA      = 4096
+
+    # Each drained batch is packed into one chirp_4c4f4742 message and published once per terminal in terminals.
+    # The terminals in legacy_terminals get one chirp_000009cd message per record, but only while subscribed.
+    def __init__(self, terminals, queue_size=CHIRP_LOG_QUEUE_SIZE, legacy_terminals=()):
         super(_ChirpLogHandler, self).__init__()
         self._terminals = terminals
+        self._legacy_terminals = legacy_terminals
+        self._queue_size = queue_size
+        self._queue = _collections.deque()
+        self._cv = _threading.Condition(_threading.Lock())
+        self._pending = 0
+        self._dropped = 0
+        self._running = True
+        self._metadata_cache = {}
+        self._thread = _threading.Thread(target=self._publishThreadFn, name='pychirp log publisher')
+        self._thread.daemon = True
+        self._thread.start()
 
-    def emit(self, record):
-        msg = self._terminals[0].makeMessage()
-        msg.timestamp = int(record.created) * 1000000000 + int(record.msecs * 1000000)
-        msg.value.first = record.message if hasattr(record, 'message') else record.msg
-        msg.value.second = _json.dumps({
-            'severity'  : record.levelname,
-            'file'      : record.filename,
-            'line'      : record.lineno,
-            'component' : record.name,
-            'func'      : record.funcName
-        })
+    @property
+    def dropped_records(self):
+        return self._dropped
 
+    def emit(self, record):
+        try:
+            entry = (int(record.created) * 1000000000 + int(record.msecs * 1000000), record.getMessage(),
+                     record.levelname, record.pathname, record.filename, record.lineno, record.name, record.funcName)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._cv:
+            if not self._running:
+                return
+            if len(self._queue) >= self._queue_size:
+                self._queue.popleft()
+                self._pending -= 1
+                self._dropped += 1
+            self._queue.append(entry)
+            self._pending += 1
+            self._cv.notify()
+
+    def flush(self, timeout=5.0):
+        with self._cv:
+            self._cv.wait_for(lambda: self._pending == 0 or not self._thread.is_alive(), timeout)
+
+    def close(self):
+        self.flush()
+        with self._cv:
+            self._running = False
+            self._cv.notify_all()
+        if self._thread is not _threading.current_thread():
+            self._thread.join(5.0)
+        super(_ChirpLogHandler, self).close()
+
+    def _getMetadata(self, levelname, pathname, filename, lineno, name, func_name):
+        key = (levelname, pathname, lineno, name)
+        metadata = self._metadata_cache.get(key)
+        if metadata is None:
+            if len(self._metadata_cache) >= self.MAX_CACHED_METADATA:
+                self._metadata_cache.clear()
+            metadata = _json.dumps({
+                'severity'  : levelname,
+                'file'      : filename,
+                'line'      : lineno,
+                'component' : name,
+                'func'      : func_name
+            })
+            self._metadata_cache[key] = metadata
+        return metadata
+
+    def _publishBatch(self, batch):
+        msg = _chirp_4c4f4742.PublishMessage()
+        for timestamp, message, levelname, pathname, filename, lineno, name, func_name in batch:
+            entry = msg.entries.add()
+            try:
+                entry.timestamp = timestamp
+                entry.value.first = message
+                entry.value.second = self._getMetadata(levelname, pathname, filename, lineno, name, func_name)
+            except Exception:
+                del msg.entries[-1]
+
+        payload = bytearray(msg.SerializeToString())
         for terminal in self._terminals:
-            terminal.tryPublishMessage(msg)
+            terminal.tryPublishPayload(payload)
+
+        legacy_terminals = [terminal for terminal in self._legacy_terminals if terminal.is_subscribed]
+        if legacy_terminals:
+            # An entry has the same wire format as a chirp_000009cd.PublishMessage
+            for entry in msg.entries:
+                payload = bytearray(entry.SerializeToString())
+                for terminal in legacy_terminals:
+                    terminal.tryPublishPayload(payload)
+
+    def _publishThreadFn(self):
+        while True:
+            with self._cv:
+                while not self._queue and self._running:
+                    self._cv.wait()
+                if not self._queue:
+                    return
+
+                batch = []
+                while self._queue and len(batch) < self.MAX_BATCH_SIZE:
+                    batch.append(self._queue.popleft())
+
+            try:
+                self._publishBatch(batch)
+            except Exception:
+                pass
+
+            with self._cv:
+                self._pending -= len(batch)
+                self._cv.notify_all()
+
+
+class _Dependency(object):
+    __slots__ = ('terminal', 'is_operational_terminal', 'established', 'subscribed', 'operational', 'satisfied')
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.is_operational_terminal = False
+        self.established = True
+        self.subscribed = True
+        self.operational = True
+        self.satisfied = True
 
 
 class DependencyManager(object):
     def __init__(self, name, leaf, operational_terminal_names, terminals):
         self._lock = _threading.RLock()
+        self._ready_cv = _threading.Condition(self._lock)
         self._name = name
         self._terminals = terminals
         self._operational_terminals = []
         self._on_readiness_changed = None
         self._ready = False
+        self._ready_futures = []
+        self._notifications = _collections.deque()
+        self._notifying = False
+        self._dependencies = []
+        self._unsatisfied = 0
         self._log_prefix = 'DependencyManager "{}": '.format(name)
 
         with self._lock:
             for name in operational_terminal_names:
                 terminal = _terminals.CachedConsumerProtoTerminal(leaf, name, _chirp_00000001)
-
-                def fn(msg, cached):
-                    self._onOperationalMessageReceived(terminal, msg, cached)
-                terminal.on_message_received = fn
-
                 self._operational_terminals.append(terminal)
                 self._terminals.append(terminal)
 
+            operational_terminals = set(id(terminal) for terminal in self._operational_terminals)
             for i, terminal in enumerate(self._terminals):
-                self._monitorBindingAndSubscriptionStateChange(terminal)
+                dependency = _Dependency(terminal)
+                self._dependencies.append(dependency)
+                self._monitorStateChanges(dependency, id(terminal) in operational_terminals)
 
                 _logger.debug(self._log_prefix + 'Registered dependency {} of {} on {} "{}" with signature 0x{:x}' \
                     .format(i+1, len(self._terminals), type(terminal).__name__, terminal.name, terminal.signature))
 
+            self._unsatisfied = sum(1 for dependency in self._dependencies if not dependency.satisfied)
+            self._setReady(self._unsatisfied == 0)
+        self._notifyReadinessChanged()
+
     @property
     def ready(self):
         return self._ready
 
+    @property
+    def unsatisfied_dependencies(self):
+        return self._unsatisfied
+
     @property
     def on_readiness_changed(self):
         return self._on_readiness_changed
@@ -276,72 +667,119 @@ class DependencyManager(object):
     def on_readiness_changed(self, fn):
         self._on_readiness_changed = fn
 
-    def _monitorBindingAndSubscriptionStateChange(self, terminal):
+    def waitUntilReady(self, timeout=None):
+        with self._ready_cv:
+            return self._ready_cv.wait_for(lambda: self._ready, timeout)
+
+    def getReadyFuture(self):
+        future = _futures.Future()
+        with self._lock:
+            if self._ready:
+                future.set_result(True)
+            else:
+                self._ready_futures.append(future)
+        return future
+
+    def _monitorStateChanges(self, dependency, is_operational_terminal):
+        terminal = dependency.terminal
+
         try:
             _ = terminal.on_binding_state_changed
-            terminal.on_binding_state_changed = lambda state: self._onBindingStateChanged(terminal, state)
+            terminal.on_binding_state_changed = lambda state: self._onBindingStateChanged(dependency, state)
+            dependency.established = bool(terminal.is_established)
         except:
             pass
 
         try:
             _ = terminal.on_subscription_state_changed
-            terminal.on_subscription_state_changed = lambda state: self._onSubscriptionStateChanged(terminal, state)
+            terminal.on_subscription_state_changed = lambda state: self._onSubscriptionStateChanged(dependency, state)
+            dependency.subscribed = bool(terminal.is_subscribed)
         except:
             pass
 
-    def _collectReadinessInformation(self):
-        with self._lock:
-            established = []
-            for terminal in self._terminals:
-                binding_established = True
-                terminal_subscribed = True
-
-                try:
-                    binding_established = terminal.is_established
-                except:
-                    pass
-
-                try:
-                    terminal_subscribed = terminal.is_subscribed
-                except:
-                    pass
-
-                established.append(binding_established and terminal_subscribed)
-
-            operational = []
-            for terminal in self._operational_terminals:
-                operational.append(False)
-                try:
-                    if terminal.getCachedMessage().value:
-                        operational[-1] = True
-                except:
-                    pass
-            return (established, operational)
-
-    def _updateReadiness(self, *_):
+        if is_operational_terminal:
+            dependency.is_operational_terminal = True
+            terminal.on_message_received = lambda msg, cached: self._onOperationalMessageReceived(dependency, msg)
+            dependency.operational = False
+            try:
+                dependency.operational = bool(terminal.getCachedMessage().value)
+            except:
+                pass
+
+        dependency.satisfied = dependency.established and dependency.subscribed and dependency.operational
+
+    def _updateDependency(self, dependency):
+        satisfied = dependency.established and dependency.subscribed and dependency.operational
+        if satisfied != dependency.satisfied:
+            dependency.satisfied = satisfied
+            self._unsatisfied += -1 if satisfied else 1
+            self._setReady(self._unsatisfied == 0)
+
+    def _setReady(self, ready):
+        if self._ready == ready:
+            return
+
+        self._ready = ready
+        futures = []
+        if ready:
+            _logger.info(self._log_prefix + 'Dependencies satisfied => READY')
+            futures, self._ready_futures = self._ready_futures, []
+            self._ready_cv.notifyAll()
+        else:
+            _logger.warning(self._log_prefix + 'Dependencies not satisfied any more')
+
+        self._notifications.append((ready, futures))
+
+    def _notifyReadinessChanged(self):
+        # Called without holding self._lock so that callbacks may use the manager. Only one thread delivers
+        # notifications at a time, which keeps them in order without blocking the other threads.
         with self._lock:
-            established, operational = self._collectReadinessInformation()
-            ready = all(established) and all(operational)
-            if self._ready != ready:
-                self._ready = ready
-                if ready:
-                    _logger.info(self._log_prefix + 'Dependencies satisfied => READY')
-                else:
-                    _logger.warning(self._log_prefix + 'Dependencies not satisfied any more')
+            if self._notifying:
+                return
+            self._notifying = True
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._notifications:
+                        self._notifying = False
+                        return
+                    ready, futures = self._notifications.popleft()
+
+                for future in futures:
+                    if not future.done():
+                        future.set_result(True)
+
                 if self._on_readiness_changed:
                     self._on_readiness_changed(ready)
+        except:
+            with self._lock:
+                self._notifying = False
+            raise
 
-    def _onOperationalMessageReceived(self, terminal, msg, cached):
+    def _onOperationalMessageReceived(self, dependency, msg):
         _logger.debug(self._log_prefix + '{} changed operational state to {}'.format(
-            terminal.name, 'True' if msg.value else 'False'))
-        self._updateReadiness()
+            dependency.terminal.name, 'True' if msg.value else 'False'))
+        with self._lock:
+            dependency.operational = bool(msg.value)
+            self._updateDependency(dependency)
+        self._notifyReadinessChanged()
 
-    def _onBindingStateChanged(self, terminal, state):
+    def _onBindingStateChanged(self, dependency, state):
         _logger.debug(self._log_prefix + '{} changed binding state to {}'.format(
-            terminal.name, 'ESTABLISHED' if state else 'RELEASED'))
-        self._updateReadiness()
-
-    def _onSubscriptionStateChanged(self, terminal, state):
+            dependency.terminal.name, 'ESTABLISHED' if state else 'RELEASED'))
+        with self._lock:
+            dependency.established = bool(state)
+            if not state and dependency.is_operational_terminal:
+                # The producer's cached message will be delivered again once the binding is re-established
+                dependency.operational = False
+            self._updateDependency(dependency)
+        self._notifyReadinessChanged()
+
+    def _onSubscriptionStateChanged(self, dependency, state):
         _logger.debug(self._log_prefix + '{} changed subscription state to {}'.format(
-            terminal.name, 'SUBSCRIBED' if state else 'UNSUBSCRIBED'))
-        self._updateReadiness()
+            dependency.terminal.name, 'SUBSCRIBED' if state else 'UNSUBSCRIBED'))
+        with self._lock:
+            dependency.subscribed = bool(state)
+            self._updateDependency(dependency)
+        self._notifyReadinessChanged()
@@ -21,6 +21,12 @@ class Scheduler(_object.ChirpObject):
         except:
             _api.destroy(self.handle)
             raise
+        self._num_threads = num_threads
+
+    @property
+    def num_threads(self):
+        return self._num_threads
 
     def setThreadPoolSize(self, num_threads):
         _api.setSchedulerThreadPoolSize(self.handle, num_threads)
+        self._num_threads = num_threads
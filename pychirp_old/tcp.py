@@ -4,8 +4,20 @@ from . import leaf as _leaf
 from . import api as _api
 from . import object as _object
 from . import scheduler as _scheduler
+from . import terminals as _terminals
+import atexit as _atexit
+import collections as _collections
+import concurrent.futures as _futures
+import heapq as _heapq
+import random as _random
 import threading as _threading
 import time as _time
+import traceback as _traceback
+
+
+REAPER_DRAIN_TIMEOUT   = 5.0
+ACCEPT_WORKERS         = 4
+ACCEPT_METRICS_WINDOW  = 512
 
 
 def _print(msg):
@@ -16,6 +28,85 @@ def _dummy(*args):
     pass
 
 
+class _ConnectionReaper(object):
+    def __init__(self):
+        self._queue = _collections.deque()
+        self._cv = _threading.Condition(_threading.Lock())
+        self._thread = None
+        self._busy = False
+        self._queued = 0
+        self._max_backlog = 0
+        self._destroyed = 0
+        self._failed = 0
+
+    @property
+    def metrics(self):
+        with self._cv:
+            oldest = _time.monotonic() - self._queue[0][1] if self._queue else 0.0
+            return {
+                'backlog'        : len(self._queue) + self._busy,
+                'max_backlog'    : self._max_backlog,
+                'oldest_age'     : oldest,
+                'queued'         : self._queued,
+                'destroyed'      : self._destroyed,
+                'failed'         : self._failed
+            }
+
+    def destroyLater(self, connection):
+        with self._cv:
+            self._queue.append((connection, _time.monotonic()))
+            self._queued += 1
+            self._max_backlog = max(self._max_backlog, len(self._queue) + self._busy)
+            if self._thread is None:
+                self._thread = _threading.Thread(target=self._threadFn, name='pychirp connection reaper')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def drain(self, timeout=None):
+        with self._cv:
+            return self._cv.wait_for(lambda: self._thread is None, timeout)
+
+    def _threadFn(self):
+        # Exits once the queue is empty; destroyLater() starts a new thread when needed
+        while True:
+            with self._cv:
+                self._busy = False
+                if not self._queue:
+                    self._thread = None
+                    self._cv.notifyAll()
+                    return
+                connection = self._queue.popleft()[0]
+                self._busy = True
+
+            try:
+                ok = connection.tryDestroy()
+            except Exception:
+                ok = False
+
+            with self._cv:
+                if ok:
+                    self._destroyed += 1
+                else:
+                    self._failed += 1
+
+
+_connection_reaper = _ConnectionReaper()
+
+
+def _drainConnectionReaperAtExit():
+    # REAPER_DRAIN_TIMEOUT is read at exit so that applications can change it (None waits until done)
+    if not _connection_reaper.drain(REAPER_DRAIN_TIMEOUT):
+        _print('Gave up destroying {} connections at exit after {}s'.format(
+            _connection_reaper.metrics['backlog'], REAPER_DRAIN_TIMEOUT))
+
+
+_atexit.register(_drainConnectionReaperAtExit)
+
+
+def getConnectionReaperMetrics():
+    return _connection_reaper.metrics
+
+
 class TcpServer(_object.ChirpObject):
     def __init__(self, scheduler, address, port, identification=None):
         assert isinstance(scheduler, _scheduler.Scheduler)
@@ -159,18 +250,15 @@ class SimpleTcpServer(object):
             self._on_disconnected(err, connection)
 
         with self._cv:
-            self._active_connections.remove(connection)
-            self._cv.notifyAll()
+            if connection in self._active_connections:
+                self._active_connections.remove(connection)
+                self._cv.notifyAll()
 
         self._destroyConnectionLater(connection)
 
     @staticmethod
     def _destroyConnectionLater(connection):
-        def killer():
-            connection.tryDestroy()
-        thread = _threading.Thread(target=killer)
-        thread.setDaemon(True)
-        thread.start()
+        _connection_reaper.destroyLater(connection)
 
     @property
     def endpoint(self):
@@ -219,8 +307,264 @@ class SimpleTcpServer(object):
                 self._cv.wait()
 
 
+class ConcurrentTcpServer(SimpleTcpServer):
+    def __init__(self, endpoint, address='127.0.0.1', port=10000, identification=None, timeout=None, log=_print,
+                 workers=ACCEPT_WORKERS):
+        self._executor = _futures.ThreadPoolExecutor(workers)
+        self._takeover_lock = _threading.Lock()
+        self._metrics_lock = _threading.Lock()
+        self._accepting = True
+        self._worker_state = _threading.local()
+        self._accepted = 0
+        self._accept_errors = 0
+        self._assignment_errors = 0
+        self._pending_assignments = 0
+        self._max_pending_assignments = 0
+        self._accept_times = _collections.deque(maxlen=ACCEPT_METRICS_WINDOW)
+        self._assignment_latencies = _collections.deque(maxlen=ACCEPT_METRICS_WINDOW)
+        super(ConcurrentTcpServer, self).__init__(endpoint, address, port, identification, timeout, log)
+
+    @property
+    def metrics(self):
+        with self._metrics_lock:
+            accept_times = list(self._accept_times)
+            span = accept_times[-1] - accept_times[0] if len(accept_times) > 1 else 0.0
+            return {
+                'accepted'                : self._accepted,
+                'accept_errors'           : self._accept_errors,
+                'assignment_errors'       : self._assignment_errors,
+                'accept_rate'             : (len(accept_times) - 1) / span if span > 0 else 0.0,
+                'pending_assignments'     : self._pending_assignments,
+                'max_pending_assignments' : self._max_pending_assignments,
+                'assignment_latency'      : _terminals.getPercentiles(self._assignment_latencies)
+            }
+
+    def resetMaxPendingAssignments(self):
+        with self._metrics_lock:
+            self._max_pending_assignments = self._pending_assignments
+
+    def destroy(self, wait=True):
+        self._accepting = False
+        try:
+            self._server.cancelAccept()
+        except:
+            pass
+        # Joining the pool from one of its own workers (e.g. from on_connected) would never return
+        self._executor.shutdown(wait and not getattr(self._worker_state, 'active', False))
+
+        with self._cv:
+            connections, self._active_connections = self._active_connections, []
+            self._cv.notifyAll()
+        for connection in connections:
+            connection.tryDestroy()
+
+    def _startAccept(self):
+        try:
+            _api.asyncTcpAccept(self._server.handle, self.timeout, self._onRawAccepted)
+        except Exception as e:
+            self._log('Waiting for incoming connection failed: {}'.format(e))
+
+    def _onRawAccepted(self, err, connection_handle):
+        now = _time.perf_counter()
+        if err.error_code == _ErrorCodes.CANCELED:
+            return
+
+        if self._accepting:
+            self._startAccept()
+
+        with self._metrics_lock:
+            if err or connection_handle is None:
+                self._accept_errors += 1
+            else:
+                self._accepted += 1
+                self._accept_times.append(now)
+                self._pending_assignments += 1
+                self._max_pending_assignments = max(self._max_pending_assignments, self._pending_assignments)
+
+        if err or connection_handle is None:
+            self._log('Accepting connection failed: {}'.format(err))
+            return
+
+        try:
+            self._executor.submit(self._finishAccept, connection_handle, now)
+        except RuntimeError:
+            _api.destroy(connection_handle)
+            with self._metrics_lock:
+                self._pending_assignments -= 1
+
+    def _finishAccept(self, connection_handle, accepted_at):
+        self._worker_state.active = True
+        connection = None
+        try:
+            connection = _connections.Connection(connection_handle)
+            self._log('Connection {} accepted'.format(connection.description))
+
+            # A Leaf holds a single connection, so destroying the previous one and assigning the new one must not
+            # interleave with other workers
+            if isinstance(self.endpoint, _leaf.Leaf):
+                with self._takeover_lock:
+                    self._destroyPreviousConnection()
+                    self._assign(connection)
+            else:
+                self._assign(connection)
+
+        except Exception as e:
+            self._log('Failed to assign connection to the endpoint: {}'.format(e))
+            with self._metrics_lock:
+                self._assignment_errors += 1
+            if connection is not None:
+                connection.tryDestroy()
+
+        finally:
+            self._worker_state.active = False
+            with self._metrics_lock:
+                self._pending_assignments -= 1
+                self._assignment_latencies.append(_time.perf_counter() - accepted_at)
+
+    def _destroyPreviousConnection(self):
+        with self._cv:
+            connections, self._active_connections = self._active_connections, []
+        for connection in connections:
+            self._log('Destroying previous connection...')
+            connection.tryDestroy()
+
+    def _assign(self, connection):
+        connection.assign(self.endpoint, self.timeout)
+        connection.asyncAwaitDeath(lambda err: self._onConnectionDied(err, connection))
+
+        if self._on_connected:
+            self._on_connected(connection)
+
+        with self._cv:
+            if self._accepting:
+                self._active_connections.append(connection)
+                self._cv.notifyAll()
+                return
+
+        self._log('Destroying connection {} accepted during shutdown'.format(connection.description))
+        connection.tryDestroy()
+
+
+class ReconnectPolicy(object):
+    def __init__(self, initial_delay=1.0, multiplier=2.0, max_delay=30.0, jitter=True, reset_after=10.0):
+        self._initial_delay = initial_delay
+        self._multiplier = multiplier
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._reset_after = reset_after
+
+    @property
+    def initial_delay(self):
+        return self._initial_delay
+
+    @property
+    def multiplier(self):
+        return self._multiplier
+
+    @property
+    def max_delay(self):
+        return self._max_delay
+
+    @property
+    def jitter(self):
+        return self._jitter
+
+    @property
+    def reset_after(self):
+        return self._reset_after
+
+    def getDelay(self, attempt):
+        delay = min(self._max_delay, self._initial_delay * self._multiplier ** min(attempt, 64))
+        return _random.uniform(0, delay) if self._jitter else delay
+
+
+class _ReconnectTimer(object):
+    __slots__ = ('deadline', 'fn', 'cancelled')
+
+    def __init__(self, deadline, fn):
+        self.deadline = deadline
+        self.fn = fn
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return self.deadline < other.deadline
+
+
+class _ReconnectScheduler(object):
+    def __init__(self):
+        self._heap = []
+        self._cancelled = 0
+        self._cv = _threading.Condition(_threading.Lock())
+        self._thread = None
+
+    @property
+    def pending(self):
+        with self._cv:
+            return len(self._heap) - self._cancelled
+
+    def schedule(self, delay, fn):
+        timer = _ReconnectTimer(_time.monotonic() + delay, fn)
+        with self._cv:
+            _heapq.heappush(self._heap, timer)
+            if self._thread is None:
+                self._thread = _threading.Thread(target=self._threadFn, name='pychirp reconnect scheduler')
+                self._thread.daemon = True
+                self._thread.start()
+            elif self._heap[0] is timer:
+                self._cv.notify()
+        return timer
+
+    def cancel(self, timer):
+        with self._cv:
+            if timer.cancelled or timer.fn is None:
+                return
+            timer.cancelled = True
+            timer.fn = None
+            self._cancelled += 1
+            if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+                self._heap = [x for x in self._heap if not x.cancelled]
+                _heapq.heapify(self._heap)
+                self._cancelled = 0
+                self._cv.notify()
+
+    def _threadFn(self):
+        while True:
+            with self._cv:
+                while True:
+                    while self._heap and self._heap[0].cancelled:
+                        _heapq.heappop(self._heap)
+                        self._cancelled -= 1
+                    if not self._heap:
+                        self._thread = None
+                        return
+                    timeout = self._heap[0].deadline - _time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._cv.wait(timeout)
+
+                timer = _heapq.heappop(self._heap)
+                fn, timer.fn = timer.fn, None
+
+            try:
+                fn()
+            except Exception as e:
+                _print('Reconnect callback failed: {}\n{}'.format(e, _traceback.format_exc()))
+
+
+_reconnect_scheduler = _ReconnectScheduler()
+
+
+def scheduleTimer(delay, fn):
+    return _reconnect_scheduler.schedule(delay, fn)
+
+
+def cancelTimer(timer):
+    _reconnect_scheduler.cancel(timer)
+
+
 class SimpleTcpClient(object):
-    def __init__(self, endpoint, host='127.0.0.1', port=10000, identification=None, timeout=None, log=_print):
+    def __init__(self, endpoint, host='127.0.0.1', port=10000, identification=None, timeout=None, log=_print,
+                 reconnect_policy=None):
         self._endpoint = endpoint
         self._host = host
         self._port = port
@@ -230,6 +574,12 @@ class SimpleTcpClient(object):
         self._cv = _threading.Condition()
         self._on_connected = None
         self._on_disconnected = None
+        self._reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self._failed_attempts = 0
+        self._next_reconnect_delay = None
+        self._connected_since = None
+        self._reconnect_timer = None
+        self._destroyed = False
         self._client = TcpClient(endpoint.scheduler, identification)
         self._startConnect()
 
@@ -247,8 +597,14 @@ class SimpleTcpClient(object):
             self._log('Connecting to {}:{} failed: {}'.format(self.host, self.port, e))
 
     def _startConnectDelayed(self):
-        _time.sleep(1.0)
-        self._startConnect()
+        with self._cv:
+            if self._destroyed:
+                return
+            delay = self._reconnect_policy.getDelay(self._failed_attempts)
+            self._next_reconnect_delay = delay
+            self._log('Reconnecting to {}:{} in {:.2f}s (attempt {})'.format(
+                self.host, self.port, delay, self._failed_attempts + 1))
+            self._reconnect_timer = _reconnect_scheduler.schedule(delay, self._startConnect)
 
     def _onConnected(self, err, connection):
         if err.error_code == _ErrorCodes.CANCELED:
@@ -256,6 +612,8 @@ class SimpleTcpClient(object):
 
         if err:
             self._log('Failed to connect to {}:{}: {}'.format(self.host, self.port, err))
+            with self._cv:
+                self._failed_attempts += 1
             self._startConnectDelayed()
             return
 
@@ -269,11 +627,15 @@ class SimpleTcpClient(object):
 
             with self._cv:
                 self._active_connection = connection
+                self._connected_since = _time.time()
+                self._next_reconnect_delay = None
                 self._cv.notifyAll()
 
         except Exception as e:
             self._log('Failed to assign connection to the endpoint: {}'.format(e))
             connection.tryDestroy()
+            with self._cv:
+                self._failed_attempts += 1
             self._startConnectDelayed()
 
     def _onConnectionDied(self, err, connection):
@@ -284,6 +646,12 @@ class SimpleTcpClient(object):
 
         with self._cv:
             self._active_connection = None
+            connected_since, self._connected_since = self._connected_since, None
+            if connected_since is not None \
+                    and _time.time() - connected_since >= self._reconnect_policy.reset_after:
+                self._failed_attempts = 0
+            else:
+                self._failed_attempts += 1
             self._cv.notifyAll()
 
         self._destroyConnectionLater(connection)
@@ -293,11 +661,7 @@ class SimpleTcpClient(object):
 
     @staticmethod
     def _destroyConnectionLater(connection):
-        def killer():
-            connection.tryDestroy()
-        thread = _threading.Thread(target=killer)
-        thread.setDaemon(True)
-        thread.start()
+        _connection_reaper.destroyLater(connection)
 
     @property
     def endpoint(self):
@@ -335,6 +699,22 @@ class SimpleTcpClient(object):
     def on_disconnected(self, fn):
         self._on_disconnected = fn
 
+    @property
+    def reconnect_policy(self):
+        return self._reconnect_policy
+
+    @property
+    def failed_attempts(self):
+        return self._failed_attempts
+
+    @property
+    def next_reconnect_delay(self):
+        return self._next_reconnect_delay
+
+    @property
+    def is_connected(self):
+        return self._active_connection is not None
+
     def waitUntilConnected(self):
         with self._cv:
             while self._active_connection is None:
@@ -346,6 +726,11 @@ class SimpleTcpClient(object):
                 self._cv.wait()
 
     def destroy(self):
+        with self._cv:
+            self._destroyed = True
+            if self._reconnect_timer is not None:
+                _reconnect_scheduler.cancel(self._reconnect_timer)
+                self._reconnect_timer = None
         try:
             self._client.cancelConnect()
         except:
@@ -2,7 +2,21 @@ from . import api as _api
 from . import object as _object
 from . import leaf as _leaf
 from .binding import _BindingMixin
+import collections as _collections
 import threading as _threading
+import time as _time
+import weakref as _weakref
+
+_all_terminals = _weakref.WeakSet()
+
+
+def getPercentiles(samples, percentiles=(50, 90, 99)):
+    samples = sorted(samples)
+    if not samples:
+        return None
+    result = {'p{}'.format(p): samples[min(len(samples) - 1, len(samples) * p // 100)] for p in percentiles}
+    result['max'] = samples[-1]
+    return result
 
 
 class _ProtoMessageType:
@@ -11,6 +25,25 @@ class _ProtoMessageType:
     GATHER  = 2
 
 
+class TerminalMetrics(object):
+    MAX_LATENCY_SAMPLES = 512
+
+    def __init__(self):
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.handler_latencies = _collections.deque(maxlen=self.MAX_LATENCY_SAMPLES)
+
+    def getLatencyPercentiles(self, percentiles=(50, 90, 99)):
+        return getPercentiles(self.handler_latencies, percentiles)
+
+
+def getTerminals(leaf=None):
+    return [terminal for terminal in list(_all_terminals)
+            if terminal.is_alive and (leaf is None or terminal.leaf is leaf)]
+
+
 class _Terminal(_object.ChirpObject):
     def __init__(self, leaf, terminal_type, name, signature):
         assert isinstance(leaf, _leaf.Leaf)
@@ -19,7 +52,9 @@ class _Terminal(_object.ChirpObject):
         self._leaf = leaf
         self._name = name
         self._signature = signature
+        self._metrics = TerminalMetrics()
         super(_Terminal, self).__init__(_api.createTerminal(leaf.handle, terminal_type, name.encode(), signature))
+        _all_terminals.add(self)
 
     def _payloadToUserFacingDataType(self, payload, proto_msg_type, payload_complete):
         return payload
@@ -39,6 +74,10 @@ class _Terminal(_object.ChirpObject):
     def signature(self):
         return self._signature
 
+    @property
+    def metrics(self):
+        return self._metrics
+
 
 class _ManualBindTerminal(_Terminal):
     pass
@@ -63,7 +102,7 @@ class _PublishMessageMixin(object):
         self._publish_message_fn = publish_message_fn
 
     def publishMessage(self, data):
-        self._publish_message_fn(self.handle, self._userFacingDataTypeToPayload(data, _ProtoMessageType.PUBLISH))
+        self.publishPayload(self._userFacingDataTypeToPayload(data, _ProtoMessageType.PUBLISH))
 
     def tryPublishMessage(self, data):
         try:
@@ -72,6 +111,18 @@ class _PublishMessageMixin(object):
         except:
             return False
 
+    def publishPayload(self, payload):
+        self._publish_message_fn(self.handle, payload)
+        self._metrics.messages_sent += 1
+        self._metrics.bytes_sent += len(payload)
+
+    def tryPublishPayload(self, payload):
+        try:
+            self.publishPayload(payload)
+            return True
+        except:
+            return False
+
 
 class _SubscribeMixin(object):
     def __init__(self, async_receive_message_fn):
@@ -85,16 +136,20 @@ class _SubscribeMixin(object):
 
     def _messageReceivedCompletionHandler(self, err, payload, cached=None):
         if not err:
+            self._metrics.messages_received += 1
+            self._metrics.bytes_received += len(payload)
             data = self._payloadToUserFacingDataType(payload, _ProtoMessageType.PUBLISH, not err)
             with self._cv:
                 self._last_received_message = data if cached is None else (data, cached)
                 self._pending_message = self._last_received_message
 
                 if self._on_message_received:
+                    t = _time.perf_counter()
                     if cached is None:
                         self._on_message_received(data)
                     else:
                         self._on_message_received(data, cached)
+                    self._metrics.handler_latencies.append(_time.perf_counter() - t)
 
                 self._cv.notifyAll()
                 self._async_receive_message_fn(self.handle, self._messageReceivedCompletionHandler)
@@ -229,6 +284,9 @@ class _GatherOrServiceMixin(object):
 
     def _asyncReceiveScatteredMessage(self, completion_handler):
         def wrapper(err, operation_id, payload):
+            if not err:
+                self._metrics.messages_received += 1
+                self._metrics.bytes_received += len(payload)
             completion_handler(err, operation_id, self._payloadToUserFacingDataType(payload, _ProtoMessageType.SCATTER, not err))
         self._async_receive_scattered_message_fn(self.handle, wrapper)
 
@@ -236,13 +294,18 @@ class _GatherOrServiceMixin(object):
         self._cancel_receive_scattered_message_fn(self.handle)
 
     def _respondToScatteredMessage(self, operation_id, data):
-        self._respond_to_scattered_message_fn(self.handle, operation_id, self._userFacingDataTypeToPayload(data, _ProtoMessageType.GATHER))
+        payload = self._userFacingDataTypeToPayload(data, _ProtoMessageType.GATHER)
+        self._respond_to_scattered_message_fn(self.handle, operation_id, payload)
+        self._metrics.messages_sent += 1
+        self._metrics.bytes_sent += len(payload)
 
     def _ignoreScatteredMessage(self, operation_id):
         self._ignore_scattered_message_fn(self.handle, operation_id)
 
     def _on_scattered_message_received(self, err, operation_id, data):
+        t = _time.perf_counter()
         response = self._scattered_message_handler_fn(err, data)
+        self._metrics.handler_latencies.append(_time.perf_counter() - t)
 
         if not err:
             if response is None:
@@ -449,7 +512,11 @@ class _ProtoPublishMixin(object):
     def publish(self, **msg_fields):
         msg = self.makeMessage()
         for key, value in msg_fields.items():
-            setattr(msg, key, value)
+            if isinstance(value, (list, tuple)):
+                # protobuf does not allow assigning to repeated fields
+                getattr(msg, key).extend(value)
+            else:
+                setattr(msg, key, value)
         self.publishMessage(msg)
 
     def tryPublish(self, **msg_fields):
@@ -196,6 +196,8 @@ class ProcessTestFixture(object):
         process_terminals = [
             {'type': _terminals.ProducerTerminal,       'signature': 0x000009cd, 'name': '/Log'},
             {'type': _terminals.ProducerTerminal,       'signature': 0x000009cd, 'name': self._chirp_location + '/Log'},
+            {'type': _terminals.ProducerTerminal,       'signature': 0x4c4f4742, 'name': '/Log'},
+            {'type': _terminals.ProducerTerminal,       'signature': 0x4c4f4742, 'name': self._chirp_location + '/Log'},
             {'type': _terminals.CachedProducerTerminal, 'signature': 0x0000040d, 'name': self._chirp_location + '/Errors'},
             {'type': _terminals.CachedProducerTerminal, 'signature': 0x0000040d, 'name': self._chirp_location + '/Warnings'},
             {'type': _terminals.CachedProducerTerminal, 'signature': 0x00000001, 'name': self._chirp_location + '/Operational'}
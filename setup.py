@@ -11,7 +11,7 @@ config = {
     'author_email'    : 'mail@johannes-bergmann.de',
     'version'         : '0.0.1',
     'packages'        : ['pychirp'],
-    'scripts'         : [],
+    'scripts'         : ['scripts/pychirp-decode-log'],
     'name'            : 'pychirp'
 }
 
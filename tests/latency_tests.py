@@ -0,0 +1,88 @@
+import pychirp_old.latency
+import pychirp_old.leaf
+import pychirp_old.scheduler
+import pychirp_old.tcp
+import itertools
+import threading
+import time
+import unittest
+
+
+class TestLatencyProbe(unittest.TestCase):
+    PORTS = itertools.count(23170)
+
+    def setUp(self):
+        self.scheduler = pychirp_old.scheduler.Scheduler()
+        self.leaf_a = pychirp_old.leaf.Leaf(self.scheduler)
+        self.leaf_b = pychirp_old.leaf.Leaf(self.scheduler)
+        self.service = pychirp_old.latency.LatencyProbeService(self.leaf_a, 'server')
+        self.server_connections = []
+        self.client_connections = []
+        self.connected = threading.Semaphore(0)
+        self.server = None
+        self.client = None
+
+    def tearDown(self):
+        for probe in pychirp_old.latency.getLatencyProbes():
+            probe.destroy()
+        if self.client:
+            self.client.destroy()
+        self.service.destroy()
+
+    def connect(self, identification=bytearray(b'server')):
+        port = next(self.PORTS)
+        self.server = pychirp_old.tcp.SimpleTcpServer(self.leaf_a, port=port, identification=identification, log=None)
+        self.server.on_connected = self.server_connections.append
+        self.client = pychirp_old.tcp.SimpleTcpClient(self.leaf_b, port=port, log=None,
+                                                      reconnect_policy=pychirp_old.tcp.ReconnectPolicy(0.05))
+        self.client.on_connected = lambda connection: (self.client_connections.append(connection),
+                                                       self.connected.release())
+        self.assertTrue(self.connected.acquire(timeout=5.0))
+        return self.client_connections[-1]
+
+    @staticmethod
+    def waitFor(fn, timeout=5.0):
+        deadline = time.time() + timeout
+        while not fn() and time.time() < deadline:
+            time.sleep(0.01)
+        return fn()
+
+    def test_measure_rtt(self):
+        connection = self.connect()
+        probe = pychirp_old.latency.LatencyProbe(self.leaf_b, connection, interval=0.02)
+        self.assertIs(probe, pychirp_old.latency.getLatencyProbe(connection))
+        self.assertTrue(self.waitFor(lambda: probe.histogram.count >= 3))
+
+        statistics = probe.statistics
+        self.assertEqual(0, statistics['lost'])
+        self.assertGreater(statistics['smoothed_rtt'], 0.0)
+
+    def test_stop_on_connection_death(self):
+        connection = self.connect()
+        probe = pychirp_old.latency.LatencyProbe(self.leaf_b, connection, interval=0.02)
+        self.assertTrue(self.waitFor(lambda: probe.histogram.count >= 1))
+
+        self.server_connections[0].destroy()
+        self.assertTrue(self.waitFor(lambda: pychirp_old.latency.getLatencyProbe(connection) is None))
+        self.assertFalse(probe.is_running)
+        self.assertEqual([], pychirp_old.latency.getLatencyProbes())
+
+        self.assertTrue(self.connected.acquire(timeout=5.0))
+        sent = probe.statistics['sent']
+        time.sleep(0.1)
+        self.assertEqual(sent, probe.statistics['sent'])
+        self.assertIsNone(pychirp_old.latency.getLatencyProbe(self.client_connections[-1]))
+
+    def test_reject_ambiguous_probes(self):
+        connection = self.connect(identification=None)
+        self.assertRaises(ValueError, lambda: pychirp_old.latency.LatencyProbe(self.leaf_b, connection))
+
+        probe = pychirp_old.latency.LatencyProbe(self.leaf_b, connection, name='/.pychirp/LatencyProbe/server')
+        self.assertRaises(ValueError, lambda: pychirp_old.latency.LatencyProbe(
+            self.leaf_b, connection, name='/.pychirp/LatencyProbe/other'))
+        probe.destroy()
+        self.assertEqual([], pychirp_old.latency.getLatencyProbes())
+
+
+if __name__ == '__main__':
+    unittest.main()
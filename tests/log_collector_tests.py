@@ -0,0 +1,168 @@
+import pychirp_old.leaf
+import pychirp_old.log_collector
+import pychirp_old.scheduler
+from pychirp_old.proto import chirp_000009cd
+import gzip
+import lzma
+import os
+import tempfile
+import time
+import unittest
+
+
+def make_payload(i, timestamp=None):
+    msg = chirp_000009cd.PublishMessage()
+    msg.timestamp = timestamp if timestamp is not None else time.time_ns()
+    msg.value.first = 'Message {}'.format(i)
+    msg.value.second = '{"severity": "INFO", "component": "Test", "file": "test.py", "line": 1}'
+    return msg.SerializeToString()
+
+
+class TestRotatingLogFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_size_rotation(self):
+        log_file = pychirp_old.log_collector.RotatingLogFile(self.directory, max_size=100)
+        filenames = set()
+        for i in range(5):
+            log_file.write('x' * 59 + '\n')
+            filenames.add(log_file.filename)
+        log_file.close()
+
+        self.assertEqual(2, log_file.rotations)
+        self.assertEqual(3, len(filenames))
+        self.assertEqual(sorted(filenames), sorted(os.path.join(self.directory, f) for f in os.listdir(self.directory)))
+
+    def test_age_rotation(self):
+        log_file = pychirp_old.log_collector.RotatingLogFile(self.directory, max_size=None, max_age=0.05)
+        log_file.write('first\n')
+        log_file.write('second\n')
+        self.assertEqual(0, log_file.rotations)
+        time.sleep(0.1)
+        log_file.write('third\n')
+        log_file.close()
+        self.assertEqual(1, log_file.rotations)
+
+    def test_compression(self):
+        for compression, open_fn in [('gzip', gzip.open), ('lzma', lzma.open)]:
+            log_file = pychirp_old.log_collector.RotatingLogFile(self.directory, prefix=compression,
+                                                                 compression=compression)
+            log_file.write('Hello\n')
+            log_file.write('World\n')
+            log_file.close()
+            self.assertTrue(log_file.filename.endswith('.log' + pychirp_old.log_collector.COMPRESSION_EXTENSIONS[
+                compression]))
+            with open_fn(log_file.filename, 'rt') as file:
+                self.assertEqual('Hello\nWorld\n', file.read())
+
+        self.assertRaises(Exception, lambda: pychirp_old.log_collector.RotatingLogFile(self.directory,
+                                                                                       compression='zip'))
+
+    def test_compressed_size(self):
+        log_file = pychirp_old.log_collector.RotatingLogFile(self.directory, max_size=1000, compression='gzip')
+        for _ in range(20):
+            log_file.write('a' * 1000)
+            log_file.flush()
+        log_file.close()
+        self.assertEqual(0, log_file.rotations)
+        self.assertLess(os.path.getsize(log_file.filename), 1000)
+
+
+class TestLogCollector(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.scheduler = pychirp_old.scheduler.Scheduler()
+        self.leaf = pychirp_old.leaf.Leaf(self.scheduler)
+        self.log_file = pychirp_old.log_collector.RotatingLogFile(self.tmp.name)
+
+    def tearDown(self):
+        self.leaf.destroy()
+        self.scheduler.destroy()
+        self.tmp.cleanup()
+
+    def read_lines(self):
+        with open(self.log_file.filename) as file:
+            return file.read().splitlines()
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_batching(self):
+        collector = pychirp_old.log_collector.LogCollector(self.leaf, self.log_file, workers=2, batch_size=10)
+        for i in range(25):
+            collector._onMessageReceived(make_payload(i))
+        self.assertTrue(self.wait_for(lambda: collector.metrics['written'] == 25))
+        collector.destroy()
+
+        lines = self.read_lines()
+        self.assertEqual(25, len(lines))
+        self.assertRegex(lines[0], r'.* INFO Test \[test.py:1\] Message 0$')
+        self.assertRegex(lines[24], r'.* Message 24$')
+        metrics = collector.metrics
+        self.assertEqual(25, metrics['received'])
+        self.assertEqual(0, metrics['dropped'])
+        self.assertEqual(0, metrics['queued'])
+
+    def test_drop_oldest(self):
+        collector = pychirp_old.log_collector.LogCollector(self.leaf, self.log_file, queue_size=5, batch_size=1000,
+                                                           batch_interval=10.0)
+        for i in range(20):
+            collector._onMessageReceived(make_payload(i))
+        metrics = collector.metrics
+        self.assertEqual(20, metrics['received'])
+        self.assertEqual(15, metrics['dropped'])
+        self.assertEqual(5, metrics['queued'])
+        collector.destroy()
+
+        self.assertEqual(['Message {}'.format(i) for i in range(15, 20)],
+                         [line.rsplit('] ', 1)[1] for line in self.read_lines()])
+        self.assertEqual(5, collector.metrics['written'])
+
+    def test_decode_errors_and_lag(self):
+        collector = pychirp_old.log_collector.LogCollector(self.leaf, self.log_file, batch_size=2)
+        collector._onMessageReceived(b'\xff\xff\xff\xff')
+        collector._onMessageReceived(make_payload(0, timestamp=time.time_ns() - 10 * 1000000000))
+        self.assertTrue(self.wait_for(lambda: collector.metrics['written'] == 1))
+        metrics = collector.metrics
+        self.assertEqual(1, metrics['decode_errors'])
+        self.assertGreaterEqual(metrics['lag'], 9.0)
+        self.assertGreaterEqual(metrics['max_lag'], metrics['lag'])
+        collector.resetMaxLag()
+        self.assertEqual(0.0, collector.metrics['max_lag'])
+        collector.destroy()
+
+    def test_process_pool(self):
+        collector = pychirp_old.log_collector.LogCollector(self.leaf, self.log_file, workers=1, use_processes=True,
+                                                           batch_size=3)
+        for i in range(3):
+            collector._onMessageReceived(make_payload(i))
+        self.assertTrue(self.wait_for(lambda: collector.metrics['written'] == 3, timeout=30.0))
+        collector.destroy()
+        self.assertEqual(3, len(self.read_lines()))
+
+
+class TestCommandLine(unittest.TestCase):
+    def test_long_options(self):
+        args = pychirp_old.log_collector._makeArgumentParser().parse_args(
+            ['--connect', 'localhost:12000', '--identification', 'collector', '--directory', '/tmp'])
+        self.assertEqual(('localhost:12000', 'collector', '/tmp'), (args.connect, args.identification, args.directory))
+
+        args = pychirp_old.log_collector._makeArgumentParser().parse_args(['-c', 'localhost:12000', '-d', '/tmp'])
+        self.assertEqual(('localhost:12000', None, '/tmp'), (args.connect, args.identification, args.directory))
+
+    def test_split_target(self):
+        self.assertEqual(('localhost', 12000), pychirp_old.log_collector._splitTarget('localhost:12000'))
+        self.assertEqual(('::1', 12000), pychirp_old.log_collector._splitTarget('[::1]:12000'))
+        self.assertEqual(('fe80::1', 12000), pychirp_old.log_collector._splitTarget('fe80::1:12000'))
+
+
+if __name__ == '__main__':
+    unittest.main()
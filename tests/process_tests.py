@@ -0,0 +1,367 @@
+import pychirp_old.api
+import pychirp_old.connection
+import pychirp_old.latency
+import pychirp_old.leaf
+import pychirp_old.node
+import pychirp_old.process
+import pychirp_old.scheduler
+import pychirp_old.tcp
+import pychirp_old.terminals
+from pychirp_old.proto import chirp_00000001
+from pychirp_old.proto import chirp_0000040d
+from pychirp_old.proto import chirp_000009cd
+from pychirp_old.proto import chirp_4c4f4742
+import logging
+import threading
+import time
+import unittest
+
+
+class TestDependencyManager(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = pychirp_old.scheduler.Scheduler()
+        self.leaf_a = pychirp_old.leaf.Leaf(self.scheduler)
+        self.leaf_b = pychirp_old.leaf.Leaf(self.scheduler)
+        self.connection = pychirp_old.connection.LocalConnection(self.leaf_a, self.leaf_b)
+
+    def tearDown(self):
+        self.connection.destroy()
+        self.leaf_a.destroy()
+        self.leaf_b.destroy()
+        self.scheduler.destroy()
+
+    def test_operational_state_reset_on_release(self):
+        producer = pychirp_old.terminals.CachedProducerProtoTerminal(self.leaf_a, 'Operational', chirp_00000001)
+        producer.publish(value=True)
+        terminals = []
+        manager = pychirp_old.process.DependencyManager('Test', self.leaf_b, ['Operational'], terminals)
+        self.assertTrue(manager.waitUntilReady(5.0))
+
+        producer.destroy()
+        deadline = time.time() + 5.0
+        while manager.ready and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(manager.ready)
+
+        producer = pychirp_old.terminals.CachedProducerProtoTerminal(self.leaf_a, 'Operational', chirp_00000001)
+        terminals[0].waitUntilEstablished()
+        time.sleep(0.1)
+        self.assertFalse(manager.ready)
+
+        producer.publish(value=True)
+        self.assertTrue(manager.waitUntilReady(5.0))
+        producer.destroy()
+
+    def test_incremental_counting(self):
+        producers = [pychirp_old.terminals.CachedProducerProtoTerminal(self.leaf_a, name, chirp_00000001)
+                     for name in ('A', 'B')]
+        manager = pychirp_old.process.DependencyManager('Test', self.leaf_b, ['A', 'B'], [])
+        self.assertTrue(self.waitFor(lambda: manager.unsatisfied_dependencies == 2))
+
+        producers[0].publish(value=True)
+        self.assertTrue(self.waitFor(lambda: manager.unsatisfied_dependencies == 1))
+        self.assertFalse(manager.ready)
+
+        producers[1].publish(value=True)
+        self.assertTrue(manager.waitUntilReady(5.0))
+        self.assertEqual(0, manager.unsatisfied_dependencies)
+
+        producers[0].publish(value=False)
+        self.assertTrue(self.waitFor(lambda: manager.unsatisfied_dependencies == 1))
+        self.assertFalse(manager.ready)
+        for producer in producers:
+            producer.destroy()
+
+    def test_ready_future(self):
+        producer = pychirp_old.terminals.CachedProducerProtoTerminal(self.leaf_a, 'Operational', chirp_00000001)
+        manager = pychirp_old.process.DependencyManager('Test', self.leaf_b, ['Operational'], [])
+        future = manager.getReadyFuture()
+        self.assertFalse(future.done())
+
+        producer.publish(value=True)
+        self.assertTrue(future.result(5.0))
+        self.assertTrue(manager.getReadyFuture().done())
+        producer.destroy()
+
+    def test_callback_may_use_manager_from_other_threads(self):
+        producer = pychirp_old.terminals.CachedProducerProtoTerminal(self.leaf_a, 'Operational', chirp_00000001)
+        manager = pychirp_old.process.DependencyManager('Test', self.leaf_b, ['Operational'], [])
+        results = []
+
+        def onReadinessChanged(ready):
+            thread = threading.Thread(target=lambda: results.append(manager.getReadyFuture().done()))
+            thread.start()
+            thread.join(5.0)
+            results.append(thread.is_alive())
+
+        manager.on_readiness_changed = onReadinessChanged
+        producer.publish(value=True)
+        self.assertTrue(manager.waitUntilReady(5.0))
+        self.assertTrue(self.waitFor(lambda: len(results) == 2))
+        self.assertEqual([True, False], results)
+        producer.destroy()
+
+    @staticmethod
+    def waitFor(fn, timeout=5.0):
+        deadline = time.time() + timeout
+        while not fn() and time.time() < deadline:
+            time.sleep(0.01)
+        return fn()
+
+
+class TestStatusPublisher(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = pychirp_old.scheduler.Scheduler()
+        self.leaf_a = pychirp_old.leaf.Leaf(self.scheduler)
+        self.leaf_b = pychirp_old.leaf.Leaf(self.scheduler)
+        self.connection = pychirp_old.connection.LocalConnection(self.leaf_a, self.leaf_b)
+        self.terminal = pychirp_old.terminals.CachedProducerProtoTerminal(self.leaf_a, 'Errors', chirp_0000040d)
+        self.changes_terminal = pychirp_old.terminals.ProducerProtoTerminal(self.leaf_a, 'ErrorChanges',
+                                                                            chirp_0000040d)
+        self.snapshots = []
+        self.changes = []
+        self.consumer = pychirp_old.terminals.CachedConsumerProtoTerminal(self.leaf_b, 'Errors', chirp_0000040d)
+        self.consumer.on_message_received = lambda msg, cached: self.snapshots.append(list(msg.value))
+        self.changes_consumer = pychirp_old.terminals.ConsumerProtoTerminal(self.leaf_b, 'ErrorChanges',
+                                                                            chirp_0000040d)
+        self.changes_consumer.on_message_received = lambda msg: self.changes.append(list(msg.value))
+
+    def tearDown(self):
+        for obj in [self.consumer, self.changes_consumer, self.terminal, self.changes_terminal, self.connection,
+                    self.leaf_a, self.leaf_b, self.scheduler]:
+            obj.destroy()
+
+    def makePublisher(self, window):
+        publisher = pychirp_old.process._StatusPublisher(self.terminal, self.changes_terminal, window)
+        self.assertTrue(TestDependencyManager.waitFor(lambda: self.snapshots == [[]]
+                                                      and self.changes_terminal.is_subscribed))
+        return publisher
+
+    def test_burst_is_coalesced(self):
+        publisher = self.makePublisher(0.1)
+        publisher.add('disk full')
+        publisher.add('no network')
+        publisher.remove('disk full')
+        publisher.add('overheated')
+        publisher.add('overheated')
+        self.assertEqual([[]], self.snapshots)
+
+        self.assertTrue(TestDependencyManager.waitFor(lambda: len(self.changes) == 1))
+        time.sleep(0.2)
+        self.assertEqual([[], ['no network', 'overheated']], self.snapshots)
+        self.assertEqual([['+no network', '+overheated']], self.changes)
+        self.assertEqual(['no network', 'overheated'], publisher.descriptions)
+
+    def test_deltas(self):
+        publisher = self.makePublisher(0)
+        for i, fn in enumerate([lambda: publisher.add('disk full'), lambda: publisher.add('no network'),
+                                lambda: publisher.remove('disk full')]):
+            fn()
+            self.assertTrue(TestDependencyManager.waitFor(lambda: len(self.changes) == i + 1))
+        publisher.remove('disk full')
+        time.sleep(0.1)
+        self.assertEqual([['+disk full'], ['+no network'], ['-disk full']], self.changes)
+        self.assertEqual(['no network'], self.snapshots[-1])
+
+    def test_flush(self):
+        publisher = self.makePublisher(60.0)
+        publisher.add('disk full')
+        publisher.flush()
+        publisher.remove('disk full')
+        publisher.add('disk full')
+        publisher.flush()
+        self.assertTrue(TestDependencyManager.waitFor(lambda: len(self.changes) == 1))
+        time.sleep(0.1)
+        self.assertEqual([['+disk full']], self.changes)
+        self.assertEqual([[], ['disk full']], self.snapshots)
+
+
+class TestMetricsPublisher(unittest.TestCase):
+    class ProcessInterface(object):
+        def __init__(self, scheduler, leaf):
+            self.scheduler = scheduler
+            self.leaf = leaf
+
+    def setUp(self):
+        self.scheduler = pychirp_old.scheduler.Scheduler(num_threads=3)
+        self.leaf_a = pychirp_old.leaf.Leaf(self.scheduler)
+        self.leaf_b = pychirp_old.leaf.Leaf(self.scheduler)
+        self.terminal = pychirp_old.terminals.CachedProducerTerminal(self.leaf_a, 'Metrics',
+                                                                     pychirp_old.process.METRICS_SIGNATURE)
+        self.process_interface = self.ProcessInterface(self.scheduler, self.leaf_a)
+
+    def tearDown(self):
+        for obj in [self.terminal, self.leaf_a, self.leaf_b, self.scheduler]:
+            obj.destroy()
+
+    def test_collect(self):
+        publisher = pychirp_old.process._MetricsPublisher(self.process_interface, self.terminal, 0)
+        server = pychirp_old.tcp.SimpleTcpServer(self.leaf_a, port=23370, log=None)
+        server.endpoint_b = pychirp_old.node.Node(self.scheduler)
+        clients = [pychirp_old.tcp.SimpleTcpClient(endpoint, port=23370, log=None)
+                   for endpoint in (self.leaf_b, server.endpoint_b)]
+        for client in clients:
+            client.waitUntilConnected()
+        server.waitUntilAtLeastOneConnected()
+
+        metrics = publisher.collect()
+        self.assertEqual(3, metrics['scheduler']['threads'])
+        self.assertEqual(1, metrics['open_connections'])
+        self.assertNotIn('receive_queue_depth', metrics['terminals']['Metrics'])
+
+        self.scheduler.setThreadPoolSize(2)
+        self.assertEqual(2, publisher.collect()['scheduler']['threads'])
+        for client in clients:
+            client.destroy()
+        server.endpoint_b.destroy()
+
+    def test_stop(self):
+        publisher = pychirp_old.process._MetricsPublisher(self.process_interface, self.terminal, 0.01)
+        self.assertTrue(TestDependencyManager.waitFor(lambda: self.terminal.metrics.messages_sent >= 2))
+        publisher.stop()
+        self.assertIsNone(publisher._thread)
+        messages_sent = self.terminal.metrics.messages_sent
+        time.sleep(0.05)
+        self.assertEqual(messages_sent, self.terminal.metrics.messages_sent)
+
+    def test_callback_statistics(self):
+        registered, invoked, busy_time = pychirp_old.api.getCallbackStatistics()
+        callbacks = [pychirp_old.api._wrap_callback(lambda fn: fn, lambda: time.sleep(0.0001) or pychirp_old.api.ControlFlow.CONTINUE)
+                     for _ in range(8)]
+        threads = [threading.Thread(target=lambda fn=fn: [fn() for _ in range(200)]) for fn in callbacks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        statistics = pychirp_old.api.getCallbackStatistics()
+        self.assertGreaterEqual(statistics[1], invoked + 8 * 200)
+        self.assertGreater(statistics[2], busy_time + 8 * 200 * 0.0001 * 0.5)
+
+    def test_percentiles(self):
+        histogram = pychirp_old.latency.LatencyHistogram()
+        for rtt in range(1, 101):
+            histogram.add(rtt / 1000.0)
+        metrics = pychirp_old.terminals.TerminalMetrics()
+        metrics.handler_latencies.extend(rtt / 1000.0 for rtt in range(1, 101))
+        self.assertEqual(metrics.getLatencyPercentiles(), histogram.getPercentiles())
+        self.assertEqual({'p50': 0.051, 'p90': 0.091, 'p99': 0.1, 'max': 0.1}, histogram.getPercentiles())
+        self.assertIsNone(pychirp_old.terminals.getPercentiles([]))
+
+
+class TestChirpLogHandler(unittest.TestCase):
+    class RecordingTerminal(object):
+        def __init__(self, is_subscribed=True):
+            self.is_subscribed = is_subscribed
+            self.payloads = []
+            self.publishing = threading.Event()
+            self.release = threading.Event()
+            self.release.set()
+
+        def tryPublishPayload(self, payload):
+            self.publishing.set()
+            self.release.wait(5.0)
+            self.payloads.append(bytes(payload))
+            return True
+
+        def entries(self):
+            return [[entry.value.first for entry in chirp_4c4f4742.PublishMessage.FromString(payload).entries]
+                    for payload in self.payloads]
+
+    def setUp(self):
+        self.logger = logging.getLogger('pychirp.tests.chirp_log_handler')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.terminal = self.RecordingTerminal()
+        self.legacy_terminal = self.RecordingTerminal(is_subscribed=False)
+
+    def tearDown(self):
+        self.terminal.release.set()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+
+    def makeHandler(self, queue_size=100):
+        handler = pychirp_old.process._ChirpLogHandler([self.terminal], queue_size, [self.legacy_terminal])
+        self.logger.addHandler(handler)
+        return handler
+
+    def blockPublisher(self):
+        self.terminal.release.clear()
+        self.logger.info('first')
+        self.assertTrue(self.terminal.publishing.wait(5.0))
+
+    def test_batching(self):
+        handler = self.makeHandler()
+        self.blockPublisher()
+        for i in range(10):
+            self.logger.info('message %d', i)
+        self.terminal.release.set()
+        handler.flush()
+
+        self.assertEqual([['first'], ['message {}'.format(i) for i in range(10)]], self.terminal.entries())
+        self.assertEqual([], self.legacy_terminal.payloads)
+
+        entry = chirp_4c4f4742.PublishMessage.FromString(self.terminal.payloads[1]).entries[0]
+        metadata = pychirp_old.process._json.loads(entry.value.second)
+        self.assertEqual(('INFO', 'pychirp.tests.chirp_log_handler'), (metadata['severity'], metadata['component']))
+        self.assertGreater(entry.timestamp, 0)
+
+    def test_subscribed_legacy_terminals_get_one_message_per_record(self):
+        self.legacy_terminal.is_subscribed = True
+        handler = self.makeHandler()
+        self.blockPublisher()
+        self.logger.info('a')
+        self.logger.info('b')
+        self.terminal.release.set()
+        handler.flush()
+
+        self.assertEqual(2, len(self.terminal.payloads))
+        self.assertEqual(['first', 'a', 'b'], [chirp_000009cd.PublishMessage.FromString(payload).value.first
+                                               for payload in self.legacy_terminal.payloads])
+
+    def test_overflow_drops_oldest(self):
+        handler = self.makeHandler(queue_size=5)
+        self.blockPublisher()
+        for i in range(8):
+            self.logger.info('message %d', i)
+        self.assertEqual(3, handler.dropped_records)
+        self.terminal.release.set()
+        handler.flush()
+
+        self.assertEqual([['first'], ['message {}'.format(i) for i in range(3, 8)]], self.terminal.entries())
+
+    def test_flush(self):
+        handler = self.makeHandler()
+        self.blockPublisher()
+        self.logger.info('second')
+        handler.flush(timeout=0.05)
+        self.assertEqual([], self.terminal.payloads)
+
+        self.terminal.release.set()
+        handler.flush()
+        self.assertEqual([['first'], ['second']], self.terminal.entries())
+
+    def test_publish_to_consumer(self):
+        scheduler = pychirp_old.scheduler.Scheduler()
+        leaf_a = pychirp_old.leaf.Leaf(scheduler)
+        leaf_b = pychirp_old.leaf.Leaf(scheduler)
+        connection = pychirp_old.connection.LocalConnection(leaf_a, leaf_b)
+        producer = pychirp_old.terminals.ProducerProtoTerminal(leaf_a, '/Log', chirp_4c4f4742)
+        consumer = pychirp_old.terminals.ConsumerProtoTerminal(leaf_b, '/Log', chirp_4c4f4742)
+        received = []
+        consumer.on_message_received = lambda msg: received.append([entry.value.first for entry in msg.entries])
+        self.assertTrue(TestDependencyManager.waitFor(lambda: producer.is_subscribed))
+
+        handler = pychirp_old.process._ChirpLogHandler([producer])
+        self.logger.addHandler(handler)
+        self.logger.warning('disk %s', 'full')
+        handler.flush()
+        self.assertTrue(TestDependencyManager.waitFor(lambda: received == [['disk full']]))
+
+        for obj in [consumer, producer, connection, leaf_a, leaf_b, scheduler]:
+            obj.destroy()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import pychirp_old.leaf
+import pychirp_old.node
+import pychirp_old.scheduler
+import pychirp_old.tcp
+import itertools
+import threading
+import time
+import unittest
+
+
+class TestConcurrentTcpServer(unittest.TestCase):
+    PORTS = itertools.count(23270)
+
+    def setUp(self):
+        self.scheduler = pychirp_old.scheduler.Scheduler()
+        self.client_connections = []
+        self.deaths = []
+        self.cv = threading.Condition()
+        self.server = None
+
+    def tearDown(self):
+        if self.server:
+            self.server.destroy()
+        for connection in self.client_connections:
+            connection.tryDestroy()
+
+    def startServer(self, endpoint):
+        self.port = next(self.PORTS)
+        self.server = pychirp_old.tcp.ConcurrentTcpServer(endpoint, port=self.port, log=None)
+
+        # Slow assignments down so that concurrent accepts overlap
+        self.server.on_connected = lambda connection: time.sleep(0.05)
+
+    def connect(self, n):
+        def onConnected(err, connection):
+            with self.cv:
+                self.client_connections.append(connection)
+                self.cv.notifyAll()
+            if connection is not None:
+                connection.asyncAwaitDeath(lambda err: self.onDeath(connection))
+
+        for _ in range(n):
+            client = pychirp_old.tcp.TcpClient(self.scheduler)
+            client.asyncConnect('127.0.0.1', self.port, None, onConnected)
+            self.addCleanup(client.destroy)
+
+        with self.cv:
+            self.assertTrue(self.cv.wait_for(lambda: len(self.client_connections) == n, 5.0))
+        self.assertNotIn(None, self.client_connections)
+        self.assertTrue(self.waitFor(lambda: self.server.metrics['accepted'] == n
+                                     and self.server.metrics['pending_assignments'] == 0))
+
+    def onDeath(self, connection):
+        with self.cv:
+            self.deaths.append(connection)
+            self.cv.notifyAll()
+
+    @staticmethod
+    def waitFor(fn, timeout=5.0):
+        deadline = time.time() + timeout
+        while not fn() and time.time() < deadline:
+            time.sleep(0.01)
+        return fn()
+
+    def test_leaf_takeover(self):
+        self.startServer(pychirp_old.leaf.Leaf(self.scheduler))
+        self.connect(4)
+        self.assertEqual(1, len(self.server._active_connections))
+        with self.cv:
+            self.assertTrue(self.cv.wait_for(lambda: len(self.deaths) == 3, 5.0))
+        self.assertEqual(0, self.server.metrics['assignment_errors'])
+
+    def test_node_keeps_all_connections(self):
+        self.startServer(pychirp_old.node.Node(self.scheduler))
+        self.connect(4)
+        self.assertEqual(4, len(self.server._active_connections))
+
+    def test_destroy_tears_down_connections(self):
+        self.startServer(pychirp_old.node.Node(self.scheduler))
+        self.connect(2)
+
+        self.server.destroy()
+        self.assertEqual([], self.server._active_connections)
+        with self.cv:
+            self.assertTrue(self.cv.wait_for(lambda: len(self.deaths) == 2, 5.0))
+        self.server = None
+
+    def test_destroy_from_worker(self):
+        self.startServer(pychirp_old.node.Node(self.scheduler))
+        destroyed = threading.Event()
+
+        def onConnected(connection):
+            self.server.destroy()
+            destroyed.set()
+
+        self.server.on_connected = onConnected
+        thread = threading.Thread(target=self.connect, args=(1,))
+        thread.start()
+        self.assertTrue(destroyed.wait(5.0))
+        thread.join(5.0)
+        self.assertEqual([], self.server._active_connections)
+
+    def test_metrics(self):
+        self.startServer(pychirp_old.node.Node(self.scheduler))
+        self.connect(2)
+        metrics = self.server.metrics
+        self.assertEqual(2, metrics['accepted'])
+        self.assertNotIn('handshake_latency', metrics)
+        self.assertGreaterEqual(metrics['assignment_latency']['p50'], 0.05)
+
+
+class TestConnectionReaper(unittest.TestCase):
+    class SlowConnection(object):
+        def __init__(self, release, destroyed, fail=False):
+            self.release = release
+            self.destroyed = destroyed
+            self.fail = fail
+
+        def tryDestroy(self):
+            self.release.wait(5.0)
+            self.destroyed.append(threading.current_thread())
+            if self.fail:
+                raise RuntimeError('destroy failed')
+            return True
+
+    def test_destroy_later_and_drain(self):
+        reaper = pychirp_old.tcp._ConnectionReaper()
+        release = threading.Event()
+        destroyed = []
+
+        reaper.destroyLater(self.SlowConnection(release, destroyed, fail=True))
+        reaper.destroyLater(self.SlowConnection(release, destroyed))
+        self.assertFalse(reaper.drain(0.05))
+        self.assertEqual([], destroyed)
+        self.assertEqual(2, reaper.metrics['backlog'])
+
+        release.set()
+        self.assertTrue(reaper.drain(5.0))
+        self.assertEqual(2, len(destroyed))
+        self.assertNotIn(threading.current_thread(), destroyed)
+
+        metrics = reaper.metrics
+        self.assertEqual((0, 2, 1, 1), (metrics['backlog'], metrics['queued'], metrics['destroyed'],
+                                        metrics['failed']))
+
+    def test_thread_exits_when_idle(self):
+        reaper = pychirp_old.tcp._ConnectionReaper()
+        release = threading.Event()
+        release.set()
+        destroyed = []
+
+        for _ in range(2):
+            reaper.destroyLater(self.SlowConnection(release, destroyed))
+            self.assertTrue(reaper.drain(5.0))
+            self.assertIsNone(reaper._thread)
+        self.assertEqual(2, len(destroyed))
+        self.assertIsNot(destroyed[0], destroyed[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
 import pychirp
 import unittest
+import tempfile
+import os
+import json
+import time
 
 
 class TestConfiguration(unittest.TestCase):
@@ -15,6 +19,20 @@ class TestConfiguration(unittest.TestCase):
         cfg.update('{"chirp": {"location": "/Home"}}')
         self.assertEqual(pychirp.Path("/Home"), cfg.location)
         self.assertRaises(pychirp.BadConfiguration, lambda: cfg.update('{'))
+        self.assertRaises(pychirp.BadConfiguration, lambda: cfg.update('[1, 2]'))
+        self.assertEqual(pychirp.Path("/Home"), cfg.location)
+        cfg.reload()
+
+        num_sources = len(cfg._sources)
+        for i in range(100):
+            cfg.update('{{"counter": {}}}'.format(i))
+        self.assertEqual(99, cfg.get('counter'))
+        self.assertEqual(num_sources, len(cfg._sources))
+        cfg.update('{"chirp": {"location": "/Test"}}')
+        cfg.reload()
+        self.assertEqual(99, cfg.get('counter'))
+        self.assertEqual(pychirp.Path("/Test"), cfg.location)
+        self.assertEqual(cfg.config, json.loads(json.dumps(cfg.config)))
 
     def test_config_file(self):
         cfg = pychirp.Configuration(['test.py', 'config_a.json'])
@@ -36,6 +54,16 @@ class TestConfiguration(unittest.TestCase):
         self.assertAlmostEqual(0.555, cfg.connection_timeout)
         self.assertEqual('Dude', cfg.connection_identification)
 
+    def test_connection_targets(self):
+        cfg = pychirp.Configuration(['test.py', 'config_a.json'])
+        self.assertEqual([('localhost', 12345)], cfg.connection_targets)
+        cfg.update('{"chirp": {"connection": {"target": "host-a:1000, [::1]:2000"}}}')
+        self.assertEqual([('host-a', 1000), ('::1', 2000)], cfg.connection_targets)
+        cfg.update('{"chirp": {"connection": {"target": ["host-b:3000"]}}}')
+        self.assertEqual([('host-b', 3000)], cfg.connection_targets)
+        cfg.update('{"chirp": {"connection": {"target": "host-c"}}}')
+        self.assertRaises(pychirp.BadTcpTarget, lambda: cfg.connection_targets)
+
     def test_json_overrides(self):
         cfg = pychirp.Configuration(['test.py', 'config_a.json', '--json={"my-age": 42}', '-j', '{"my-id": 55}',
                                      '--json={"chirp": {"location": "/Somewhere"}}', '--location=/Home'])
@@ -49,6 +77,213 @@ class TestConfiguration(unittest.TestCase):
     def test_bad_command_line(self):
         self.assertRaises(pychirp.BadCommandLine, lambda: pychirp.Configuration(['test.py', '--hey-dude']))
 
+    def test_get(self):
+        cfg = pychirp.Configuration(['test.py', 'config_a.json'])
+        self.assertEqual('localhost:12345', cfg.get('chirp.connection.target'))
+        self.assertEqual((123, 456), cfg.get('array'))
+        self.assertEqual('/Test', cfg.get('chirp')['location'])
+        self.assertEqual(77, cfg.get('does.not.exist', 77))
+        self.assertRaises(pychirp.ConfigurationValueNotFound, lambda: cfg.get('does.not.exist'))
+
+    def test_snapshot(self):
+        cfg = pychirp.Configuration(['test.py', 'config_a.json'])
+        snapshot = cfg.snapshot
+        self.assertIs(snapshot, cfg.snapshot)
+        with self.assertRaises(TypeError):
+            snapshot['chirp.location'] = '/Home'
+        with self.assertRaises(TypeError):
+            snapshot['chirp']['connection']['target'] = 'my-host:1234'
+        with self.assertRaises(TypeError):
+            cfg.frozen_config['chirp']['location'] = '/Home'
+        cfg.config['chirp']['location'] = '/Home'
+        self.assertEqual('/Test', cfg.config['chirp']['location'])
+        self.assertEqual('localhost:12345', cfg.connection_target)
+
+        cfg.update('{"chirp": {"location": "/Test"}}')
+        self.assertIs(snapshot, cfg.snapshot)
+
+        cfg.update('{"chirp": {"location": "/Home"}}')
+        self.assertIsNot(snapshot, cfg.snapshot)
+        self.assertEqual('/Home', cfg.snapshot['chirp.location'])
+
+    def test_bind(self):
+        cfg = pychirp.Configuration(['test.py', 'config_a.json'])
+        timeout = cfg.bind('chirp.connection.timeout', float)
+        age = cfg.bind('my-age', int, default=None)
+        self.assertAlmostEqual(1.234, timeout.value)
+        self.assertIsNone(age())
+
+        cfg.update('{"chirp": {"connection": {"timeout": 5}}, "my-age": "42"}')
+        self.assertIsInstance(timeout.value, float)
+        self.assertAlmostEqual(5.0, timeout.value)
+        self.assertEqual(42, age.value)
+
+        cfg.update('{"my-age": "old"}')
+        self.assertRaises(pychirp.BadConfiguration, lambda: age.value)
+        self.assertRaises(pychirp.ConfigurationValueNotFound, lambda: cfg.bind('does.not.exist').value)
+
+    def write_config_file(self, filename, content):
+        with open(filename, 'w') as file:
+            json.dump(content, file)
+        stat = os.stat(filename)
+        os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def test_reload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'config.json')
+            self.write_config_file(filename, {'logging': {'level': 'INFO', 'depth': 10}})
+            cfg = pychirp.Configuration(['test.py', filename, '--location=/Home'])
+            level = cfg.bind('logging.level')
+
+            changes = []
+            cfg.add_change_listener(changes.append)
+            logging_changes = []
+            cfg.add_change_listener(logging_changes.append, prefix='logging.depth')
+
+            self.assertFalse(cfg.reload())
+            self.assertEqual([], changes)
+
+            self.write_config_file(filename, {'logging': {'level': 'DEBUG', 'depth': 10}, 'chirp': {'location': '/X'}})
+            self.assertTrue(cfg.reload())
+            self.assertEqual('DEBUG', level.value)
+            self.assertEqual(pychirp.Path('/Home'), cfg.location)
+            self.assertEqual([{'logging.level': ('INFO', 'DEBUG')}], changes)
+            self.assertEqual([], logging_changes)
+
+            cfg.update('{"logging": {"depth": 20}}')
+            self.assertEqual({'logging.depth': (10, 20)}, changes[-1])
+            self.assertEqual([{'logging.depth': (10, 20)}], logging_changes)
+
+            cfg.remove_change_listener(changes.append)
+            self.write_config_file(filename, {'logging': {'level': 'TRACE'}})
+            self.assertTrue(cfg.reload())
+            self.assertEqual('TRACE', level.value)
+            self.assertEqual(20, cfg.get('logging.depth'))
+            self.assertEqual(2, len(changes))
+
+    def test_reload_type_change(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'config.json')
+            self.write_config_file(filename, {'value': 1, 'values': [1]})
+            cfg = pychirp.Configuration(['test.py', filename])
+            changes = []
+            cfg.add_change_listener(changes.append)
+
+            self.write_config_file(filename, {'value': 1.0, 'values': [1]})
+            self.assertTrue(cfg.reload())
+            self.assertIsInstance(cfg.get('value'), float)
+            self.write_config_file(filename, {'value': True, 'values': [1]})
+            self.assertTrue(cfg.reload())
+            self.assertIs(True, cfg.get('value'))
+            self.write_config_file(filename, {'value': True, 'values': [1.0]})
+            self.assertTrue(cfg.reload())
+            self.assertIsInstance(cfg.get('values')[0], float)
+            self.assertEqual([{'value': (1, 1.0)}, {'value': (1.0, True)}, {'values': ((1,), (1.0,))}], changes)
+
+    def test_watch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'config.json')
+            self.write_config_file(filename, {'value': 1})
+            cfg = pychirp.Configuration(['test.py', os.path.join(directory, '*.json')])
+            cfg.watch(0.01)
+            self.assertTrue(cfg.is_watching)
+            self.assertRaises(Exception, lambda: cfg.watch())
+
+            self.write_config_file(os.path.join(directory, 'more.json'), {'more': 2})
+            self.write_config_file(filename, {'value': 3})
+            deadline = time.time() + 5.0
+            while (cfg.get('value') != 3 or cfg.get('more', None) != 2) and time.time() < deadline:
+                time.sleep(0.01)
+
+            cfg.unwatch()
+            self.assertFalse(cfg.is_watching)
+            self.assertEqual(3, cfg.get('value'))
+            self.assertEqual(2, cfg.get('more'))
+
+    def test_watch_survives_failing_listener(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'config.json')
+            self.write_config_file(filename, {'value': 1})
+            cfg = pychirp.Configuration(['test.py', filename])
+            changes = []
+
+            def listener(change):
+                changes.append(change)
+                raise RuntimeError('listener failed')
+
+            cfg.add_change_listener(listener, 'value')
+            cfg.watch(0.01)
+            for value in (2, 3):
+                self.write_config_file(filename, {'value': value, 'padding': 'x' * value})
+                deadline = time.time() + 5.0
+                while cfg.get('value') != value and time.time() < deadline:
+                    time.sleep(0.01)
+
+            self.assertTrue(cfg.is_watching)
+            cfg.unwatch()
+            self.assertEqual(3, cfg.get('value'))
+            self.assertEqual([{'value': (1, 2)}, {'value': (2, 3)}], changes)
+
+    def test_cache_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = os.path.join(directory, 'cache')
+            filenames = []
+            for i in range(10):
+                filenames.append(os.path.join(directory, 'config_{}.json'.format(i)))
+                self.write_config_file(filenames[-1], {'value': i, 'file-{}'.format(i): True})
+
+            cfg = pychirp.Configuration(['test.py'] + filenames, cache_directory=cache_directory)
+            self.assertEqual(cache_directory, cfg.cache_directory)
+            self.assertEqual(9, cfg.get('value'))
+            self.assertEqual(10, len(os.listdir(cache_directory)))
+
+            cfg = pychirp.Configuration(['test.py'] + filenames, cache_directory=cache_directory)
+            self.assertEqual(9, cfg.get('value'))
+            self.assertTrue(cfg.get('file-3'))
+
+            self.write_config_file(filenames[-1], {'value': 'changed'})
+            cfg = pychirp.Configuration(['test.py'] + filenames, cache_directory=cache_directory)
+            self.assertEqual('changed', cfg.get('value'))
+            self.assertIsNone(cfg.get('file-9', None))
+
+    def test_cache_directory_ignores_bad_cache_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = os.path.join(directory, 'cache')
+            filename = os.path.join(directory, 'config.json')
+            self.write_config_file(filename, {'value': 1})
+            cfg = pychirp.Configuration(['test.py', filename], cache_directory=cache_directory)
+            cache_filename = os.path.join(cache_directory, os.listdir(cache_directory)[0])
+
+            with open(cache_filename, 'rb') as file:
+                header = file.read(pychirp._CONFIG_CACHE_HEADER.size)
+            with open(cache_filename, 'wb') as file:
+                file.write(header + b'garbage')
+            cfg = pychirp.Configuration(['test.py', filename], cache_directory=cache_directory)
+            self.assertEqual(1, cfg.get('value'))
+
+            with open(cache_filename, 'wb') as file:
+                file.write(b'old')
+            cfg = pychirp.Configuration(['test.py', filename], cache_directory=cache_directory)
+            self.assertEqual(1, cfg.get('value'))
+            with open(cache_filename, 'rb') as file:
+                self.assertEqual(header, file.read(pychirp._CONFIG_CACHE_HEADER.size))
+
+    def test_load_many_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = []
+            for i in range(pychirp.Configuration.MAX_LOADER_THREADS * 3 + 1):
+                filenames.append(os.path.join(directory, 'config_{}.json'.format(i)))
+                self.write_config_file(filenames[-1], {'value': i, 'file-{}'.format(i): True})
+
+            cfg = pychirp.Configuration(['test.py'] + filenames)
+            self.assertEqual(len(filenames) - 1, cfg.get('value'))
+            for i in range(len(filenames)):
+                self.assertTrue(cfg.get('file-{}'.format(i)))
+
+            with open(filenames[5], 'w') as file:
+                file.write('{ invalid')
+            self.assertRaises(pychirp.BadConfiguration, lambda: pychirp.Configuration(['test.py'] + filenames))
+
     def test_str(self):
         cfg = pychirp.Configuration(['test.py', 'config_a.json'])
         self.assertRegex(str(cfg), r'.*localhost:12345.*')
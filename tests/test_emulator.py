@@ -0,0 +1,105 @@
+import pychirp_emulator
+import ctypes
+import threading
+import unittest
+
+RECEIVE_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_uint, ctypes.c_void_p)
+STATE_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_int, ctypes.c_void_p)
+GATHER_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint,
+                                   ctypes.c_void_p)
+
+
+class TestEmulator(unittest.TestCase):
+    def setUp(self):
+        self.chirp = pychirp_emulator.load()
+        self.scheduler = self.create(self.chirp.CHIRP_CreateScheduler)
+        self.leaf_a = self.create(self.chirp.CHIRP_CreateLeaf, self.scheduler)
+        self.leaf_b = self.create(self.chirp.CHIRP_CreateLeaf, self.scheduler)
+        self.connection = self.create(self.chirp.CHIRP_CreateLocalConnection, self.leaf_a, self.leaf_b)
+
+    def tearDown(self):
+        for handle in (self.connection, self.leaf_a, self.leaf_b, self.scheduler):
+            self.chirp.CHIRP_Destroy(handle)
+
+    def create(self, fn, *args):
+        handle = ctypes.c_void_p()
+        self.assertEqual(0, fn(ctypes.byref(handle), *args))
+        return handle
+
+    def test_errors(self):
+        self.assertEqual(b'Invalid object handle', self.chirp.CHIRP_GetErrorString(-2))
+        self.assertEqual(-2, self.chirp.CHIRP_Destroy(ctypes.c_void_p()))
+        self.assertEqual(-3, self.chirp.CHIRP_CreateLeaf(ctypes.byref(ctypes.c_void_p()), self.leaf_a))
+        self.assertEqual(-7, self.chirp.CHIRP_CreateLocalConnection(ctypes.byref(ctypes.c_void_p()), self.leaf_b,
+                                                                    self.leaf_a))
+
+    def test_restype(self):
+        fn = pychirp_emulator._Function('CHIRP_GetVersion', lambda *args: 5)
+        self.assertEqual(5, fn())
+        fn.restype = None
+        self.assertIsNone(fn())
+        fn.restype = lambda res: ('handled', res)
+        self.assertEqual(('handled', 5), fn())
+        fn.errcheck = lambda res, func, args: (res, func, args)
+        self.assertEqual((('handled', 5), fn, (1, 2)), fn(1, 2))
+
+    def test_publish_subscribe(self):
+        publisher = self.create(self.chirp.CHIRP_CreateTerminal, self.leaf_a, 1, b'Voltage', 123)
+        subscriber = self.create(self.chirp.CHIRP_CreateTerminal, self.leaf_b, 1, b'Multimeter', 123)
+        binding = self.create(self.chirp.CHIRP_CreateBinding, subscriber, b'Voltage')
+        state = ctypes.c_int()
+        self.assertEqual(0, self.chirp.CHIRP_GetBindingState(binding, ctypes.byref(state)))
+        self.assertEqual(1, state.value)
+
+        received = []
+        event = threading.Event()
+        def on_message(res, bytes_written, user_arg):
+            received.append((res, buffer.raw[:bytes_written]))
+            event.set()
+        buffer = ctypes.create_string_buffer(16)
+        callback = RECEIVE_CALLBACK(on_message)
+        self.assertEqual(0, self.chirp.CHIRP_PS_AsyncReceiveMessage(subscriber, buffer, 16, callback, None))
+        self.assertEqual(-13, self.chirp.CHIRP_PS_AsyncReceiveMessage(subscriber, buffer, 16, callback, None))
+        data = ctypes.create_string_buffer(b'\x01\x00\x03')
+        self.assertEqual(0, self.chirp.CHIRP_PS_Publish(publisher, data, 3))
+        self.assertTrue(event.wait(5.0))
+        self.assertEqual([(0, b'\x01\x00\x03')], received)
+
+    def test_state_change_between_get_and_await(self):
+        terminal = self.create(self.chirp.CHIRP_CreateTerminal, self.leaf_a, 5, b'Voltage', 123)
+        states = []
+        event = threading.Event()
+        def on_state(res, state, user_arg):
+            states.append((res, state))
+            event.set()
+        callback = STATE_CALLBACK(on_state)
+        self.assertEqual(0, self.chirp.CHIRP_AsyncGetBindingState(terminal, callback, None))
+        self.create(self.chirp.CHIRP_CreateTerminal, self.leaf_b, 4, b'Voltage', 123)
+        self.assertTrue(event.wait(5.0))
+        event.clear()
+        self.assertEqual(0, self.chirp.CHIRP_AsyncAwaitBindingStateChange(terminal, callback, None))
+        self.assertTrue(event.wait(5.0))
+        self.assertEqual([(0, 0), (0, 1)], states)
+
+    def test_scatter_gather_without_receivers(self):
+        scatterer = self.create(self.chirp.CHIRP_CreateTerminal, self.leaf_a, 2, b'Teacher', 123)
+        self.assertEqual(-15, self.chirp.CHIRP_SG_AsyncScatterGather(scatterer, None, 0, None, 0, None, None))
+
+        gatherer = self.create(self.chirp.CHIRP_CreateTerminal, self.leaf_b, 2, b'Student', 123)
+        self.create(self.chirp.CHIRP_CreateBinding, gatherer, b'Teacher')
+        gathered = []
+        event = threading.Event()
+        def on_gather(res, operation_id, flags, bytes_written, user_arg):
+            gathered.append((res, operation_id, flags))
+            event.set()
+            return 0
+        callback = GATHER_CALLBACK(on_gather)
+        operation_id = self.chirp.CHIRP_SG_AsyncScatterGather(scatterer, None, 0, ctypes.create_string_buffer(4), 4,
+                                                              callback, None)
+        self.assertGreater(operation_id, 0)
+        self.assertTrue(event.wait(5.0))
+        self.assertEqual([(0, operation_id, 1 | 4)], gathered)
+
+
+if __name__ == '__main__':
+    unittest.main()
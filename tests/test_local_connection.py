@@ -1,5 +1,6 @@
 import pychirp
 import unittest
+import unittest.mock
 
 
 class TestLocalConnection(unittest.TestCase):
@@ -21,6 +22,22 @@ class TestLocalConnection(unittest.TestCase):
     def test_remote_identification(self):
         self.assertIs(None, self.connection.remote_identification)
 
+    def test_info_is_cached(self):
+        info = self.connection.info
+        self.assertEqual(pychirp.ConnectionInfo(self.connection.description, pychirp.get_version(), None), info)
+
+        with unittest.mock.patch.object(pychirp._chirp, 'CHIRP_GetConnectionDescription',
+                                        side_effect=AssertionError('description fetched twice')):
+            self.assertEqual(info.description, self.connection.description)
+            self.assertIs(info, self.connection.info)
+
+    def test_snapshot(self):
+        other = pychirp.LocalConnection(self.endpointA, pychirp.Leaf(self.scheduler))
+        infos = pychirp.Connection.snapshot([self.connection, other])
+        self.assertEqual(2, len(infos))
+        self.assertIs(infos[0], self.connection.info)
+        self.assertIs(infos[1], other.info)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,12 @@
 import pychirp
 import unittest
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
 
 
 class TestLogging(unittest.TestCase):
@@ -49,6 +56,537 @@ class TestLogging(unittest.TestCase):
         pychirp.Logger().chirp_verbosity = pychirp.Verbosity.TRACE
         self.assertIs(pychirp.Verbosity.DEBUG, pychirp.Logger().max_effective_verbosity)
 
+    def test_LazyFormatting(self):
+        logger = pychirp.Logger('Lazy')
+        logger.stdout_verbosity = pychirp.Verbosity.INFO
+        logger.chirp_verbosity = pychirp.Verbosity.INFO
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return 'expensive'
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            logger.log_debug('Value: ', pychirp.LazyLogArgument(expensive))
+            logger.log(pychirp.Verbosity.TRACE, pychirp.LazyLogFormat('%s and %d', expensive, 42))
+            self.assertEqual([], calls)
+
+            logger.log_info('Value: ', pychirp.LazyLogArgument(expensive))
+            self.assertEqual([1], calls)
+            logger.log_info(pychirp.LazyLogFormat('%s and %05.1f', pychirp.LazyLogArgument(expensive), 4.25))
+            self.assertEqual([1, 1], calls)
+            logger.log_info('Handler: ', expensive)
+            self.assertEqual([1, 1], calls)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertRegex(lines[0], r'.*IFO Lazy: Value: expensive$')
+        self.assertRegex(lines[1], r'.*IFO Lazy: expensive and 004.2$')
+        self.assertRegex(lines[2], r'.*IFO Lazy: Handler: <function .*expensive at .*>$')
+
+    def test_MaxVerbosityInvalidatesCache(self):
+        logger = pychirp.Logger('Cached')
+        logger.stdout_verbosity = pychirp.Verbosity.TRACE
+        logger.chirp_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.WARNING
+        pychirp.Logger.max_chirp_verbosity = pychirp.Verbosity.ERROR
+        self.assertIs(pychirp.Verbosity.WARNING, logger.max_effective_verbosity)
+
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.max_chirp_verbosity = pychirp.Verbosity.TRACE
+        self.assertIs(pychirp.Verbosity.TRACE, logger.max_effective_verbosity)
+        self.assertIs(pychirp.Verbosity.TRACE, pychirp.Logger('Cached').effective_stdout_verbosity)
+
+    def capture_lines(self, logger, fn):
+        logger.stdout_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.TRACE
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            fn()
+        return [line.split(logger.component + ': ')[1] for line in stdout.getvalue().splitlines()]
+
+    def test_Deduplication(self):
+        logger = pychirp.Logger('Deduplicated')
+        logger.dedupe_window = 60.0
+
+        def fn():
+            for _ in range(5):
+                logger.log_warning('Connection lost')
+            logger.log_info('Connected')
+            logger.log_info('Connected')
+
+        lines = self.capture_lines(logger, fn)
+        self.assertEqual(['Connection lost', 'Last message repeated 4 times', 'Connected'], lines)
+        self.assertEqual(5, logger.deduplicated_records)
+        self.assertEqual(5, logger.suppressed_records)
+
+        logger.dedupe_window = None
+        self.assertEqual(['Connected'], self.capture_lines(logger, lambda: logger.log_info('Connected')))
+
+    def test_RateLimiting(self):
+        logger = pychirp.Logger('RateLimited')
+        logger.set_rate_limit(0.001, burst=3)
+
+        def fn():
+            for i in range(10):
+                logger.log_info('Message ', i)
+
+        self.assertEqual(['Message 0', 'Message 1', 'Message 2'], self.capture_lines(logger, fn))
+        self.assertEqual(7, logger.rate_limited_records)
+
+        logger.set_rate_limit(0.001, burst=2, per_call_site=True)
+
+        def fn():
+            for i in range(5):
+                logger.log_info('A', i)
+                logger.log_info('B', i)
+
+        self.assertEqual(['7 messages suppressed by rate limiting', 'A0', 'B0', 'A1', 'B1'],
+                         self.capture_lines(logger, fn))
+
+        logger.clear_rate_limit()
+        self.assertEqual(['6 messages suppressed by rate limiting', 'Message 0'],
+                         self.capture_lines(logger, lambda: logger.log_info('Message ', 0)))
+        self.assertEqual(['Message 1'], self.capture_lines(logger, lambda: logger.log_info('Message ', 1)))
+
+    def test_SummaryAfterStorm(self):
+        deduplicated = pychirp.Logger('StormDeduplicated')
+        deduplicated.dedupe_window = 0.05
+        rate_limited = pychirp.Logger('StormRateLimited')
+        rate_limited.set_rate_limit(20.0, burst=2)
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.TRACE
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            for i in range(5):
+                deduplicated.log_warning('Connection lost')
+                rate_limited.log_warning('Attempt ', i)
+            deadline = time.time() + 5.0
+            while stdout.getvalue().count('\n') < 5 and time.time() < deadline:
+                time.sleep(0.01)
+
+        lines = [line.split(': ', 1)[1] for line in stdout.getvalue().splitlines()]
+        self.assertEqual(['Connection lost', 'Attempt 0', 'Attempt 1'], lines[:3])
+        self.assertCountEqual(['Last message repeated 4 times', '3 messages suppressed by rate limiting'], lines[3:])
+        self.assertIn('WRN StormRateLimited: 3 messages suppressed', stdout.getvalue())
+
+    def test_ThrottleRunsBeforeFormatting(self):
+        logger = pychirp.Logger('CheapSuppression')
+        logger.set_rate_limit(0.001, burst=1)
+        formatted = []
+        lazy = pychirp.LazyLogArgument(lambda: formatted.append(None) or 'value')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(5):
+                logger.log_info('Lazy ', lazy)
+        self.assertEqual(1, len(formatted))
+        self.assertEqual(4, logger.rate_limited_records)
+
+        logger.clear_rate_limit()
+        logger.dedupe_window = 60.0
+        lines = self.capture_lines(logger, lambda: [logger.log_info('Count ', 1) for _ in range(3)])
+        self.assertEqual(['4 messages suppressed by rate limiting', 'Count 1'], lines)
+        self.assertEqual((False, None), logger._throttle.admit(pychirp.Verbosity.INFO, ('Count ', 1), None))
+        self.assertEqual((True, None), logger._throttle.admit(pychirp.Verbosity.INFO, ('Count ', 2), None))
+
+        # Mutable and lazy arguments are only deduplicated once formatted
+        items = ['a']
+        lines = self.capture_lines(logger, lambda: [logger.log_info(items) or items.append('b') for _ in range(2)])
+        self.assertEqual(["Last message repeated 3 times", "['a']", "['a', 'b']"], lines)
+        self.assertEqual(3, logger.deduplicated_records)
+
+    def test_SummariesShareOneTimerThread(self):
+        loggers = [pychirp.Logger('Storm{}'.format(i)) for i in range(10)]
+        pending = pychirp._log_throttle_scheduler.pending
+        with contextlib.redirect_stdout(io.StringIO()):
+            for logger in loggers:
+                logger.dedupe_window = 0.05
+                for _ in range(3):
+                    logger.log_warning('Connection lost')
+            self.assertEqual([], [thread for thread in threading.enumerate() if isinstance(thread, threading.Timer)])
+            self.assertEqual(pending + 10, pychirp._log_throttle_scheduler.pending)
+
+            deadline = time.time() + 5.0
+            while pychirp._log_throttle_scheduler.pending > pending and time.time() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(pending, pychirp._log_throttle_scheduler.pending)
+        self.assertEqual([0] * 10, [logger._throttle.repetitions for logger in loggers])
+
+    def test_RateLimitCallSites(self):
+        logger = pychirp.Logger('ManyCallSites')
+        logger.set_rate_limit(0.001, burst=1, per_call_site=True)
+        logger._throttle.MAX_CALL_SITES = 8
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(50):
+                exec(compile('\n' * i + 'logger.log_info("Call site ", i)', 'call_sites', 'exec'))
+        self.assertLessEqual(len(logger._throttle.buckets), 8)
+
+    def test_AsyncStdout(self):
+        pychirp.Logger.colourised_stdout = False
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.app_logger.stdout_verbosity = pychirp.Verbosity.TRACE
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            pychirp.Logger.enable_async_stdout(queue_size=10, overflow_policy=pychirp.LogOverflowPolicy.BLOCK)
+            self.assertTrue(pychirp.Logger.async_stdout)
+            self.assertRaises(Exception, lambda: pychirp.Logger.enable_async_stdout())
+
+            for i in range(100):
+                pychirp.log_info('Line ', i)
+            self.assertTrue(pychirp.Logger.flush(5.0))
+            self.assertEqual(0, pychirp.Logger.dropped_stdout_records)
+            pychirp.Logger.disable_async_stdout()
+
+        self.assertFalse(pychirp.Logger.async_stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(100, len(lines))
+        self.assertRegex(lines[42], r'.*app: Line 42$')
+
+    def test_AsyncStdoutOverflow(self):
+        pychirp.Logger.colourised_stdout = False
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.app_logger.stdout_verbosity = pychirp.Verbosity.TRACE
+
+        class BlockingStream(io.StringIO):
+            def __init__(self):
+                io.StringIO.__init__(self)
+                self.writing = threading.Event()
+                self.release = threading.Event()
+
+            def write(self, text):
+                self.writing.set()
+                self.release.wait(5.0)
+                return io.StringIO.write(self, text)
+
+        stdout = BlockingStream()
+        with contextlib.redirect_stdout(stdout):
+            pychirp.Logger.enable_async_stdout(queue_size=10, overflow_policy=pychirp.LogOverflowPolicy.DROP_NEWEST)
+            try:
+                pychirp.log_info('Line ', 0)
+                self.assertTrue(stdout.writing.wait(5.0))
+                for i in range(1, 31):
+                    pychirp.log_info('Line ', i)
+                self.assertEqual(20, pychirp.Logger.dropped_stdout_records)
+            finally:
+                stdout.release.set()
+                pychirp.Logger.disable_async_stdout(5.0)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(11, len(lines))
+        self.assertRegex(lines[-1], r'.*app: Line 10$')
+
+    def test_AsyncWriterAfterStop(self):
+        batches = []
+        writer = pychirp._AsyncLogWriter(batches.append, 10, pychirp.LogOverflowPolicy.BLOCK)
+        writer.put('first')
+        writer.stop(5.0)
+        writer.put('late')
+        self.assertEqual(['first', 'late'], [record for batch in batches for record in batch])
+
+    def test_ChirpLogPublisher(self):
+        batches = []
+        publisher_threads = set()
+
+        def publisher(records):
+            publisher_threads.add(threading.get_ident())
+            batches.append(records)
+
+        logger = pychirp.Logger('Shipped')
+        logger.stdout_verbosity = pychirp.Verbosity.FATAL
+        logger.chirp_verbosity = pychirp.Verbosity.DEBUG
+        pychirp.Logger.max_chirp_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.chirp_log_batch_interval = 0.05
+        pychirp.Logger.chirp_log_publisher = publisher
+        self.assertIs(publisher, pychirp.Logger.chirp_log_publisher)
+
+        for i in range(20):
+            logger.log_debug('Record ', i)
+        logger.log_trace('Not shipped')
+        self.assertTrue(pychirp.Logger.flush(5.0))
+        pychirp.Logger.chirp_log_publisher = None
+        pychirp.Logger.chirp_log_batch_interval = 0.005
+
+        records = [record for batch in batches for record in batch]
+        self.assertLess(len(batches), 20)
+        self.assertNotIn(threading.get_ident(), publisher_threads)
+        self.assertEqual(['Record {}'.format(i) for i in range(20)], [record.message for record in records])
+        self.assertIs(pychirp.Verbosity.DEBUG, records[0].severity)
+        self.assertEqual('Shipped', records[0].component)
+        self.assertEqual('DEBUG', json.loads(records[0].metadata)['severity'])
+        self.assertEqual('Record 3', json.loads(records[3].to_json())['message'])
+
+    def test_ChirpLogPublisherOverflow(self):
+        records = []
+        publishing = threading.Event()
+        release = threading.Event()
+
+        def publisher(batch):
+            publishing.set()
+            release.wait(5.0)
+            records.extend(batch)
+
+        logger = pychirp.Logger('Overflowing')
+        logger.stdout_verbosity = pychirp.Verbosity.FATAL
+        logger.chirp_verbosity = pychirp.Verbosity.DEBUG
+        pychirp.Logger.max_chirp_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.chirp_log_queue_size = 10
+        pychirp.Logger.chirp_log_publisher = publisher
+        try:
+            logger.log_debug('Record ', 0)
+            self.assertTrue(publishing.wait(5.0))
+            for i in range(1, 31):
+                logger.log_debug('Record ', i)
+            self.assertEqual(20, pychirp.Logger.dropped_chirp_records)
+        finally:
+            release.set()
+            pychirp.Logger.chirp_log_publisher = None
+            pychirp.Logger.chirp_log_queue_size = 10000
+
+        self.assertEqual(['Record {}'.format(i) for i in [0] + list(range(21, 31))],
+                         [record.message for record in records])
+
+    def test_ChirpLogTerminal(self):
+        scheduler = pychirp.Scheduler()
+        leaf_a = pychirp.Leaf(scheduler)
+        leaf_b = pychirp.Leaf(scheduler)
+        connection = pychirp.LocalConnection(leaf_a, leaf_b)
+        consumer = pychirp.ConsumerTerminal('/Log', pychirp.LOG_BATCH_SIGNATURE, leaf=leaf_b)
+        messages = []
+        cv = threading.Condition()
+
+        def on_message(res, data):
+            if not res:
+                return
+            with cv:
+                messages.append(data)
+                cv.notify_all()
+            consumer.async_receive_message(on_message)
+
+        consumer.async_receive_message(on_message)
+
+        logger = pychirp.Logger('Terminal')
+        logger.stdout_verbosity = pychirp.Verbosity.FATAL
+        logger.chirp_verbosity = pychirp.Verbosity.DEBUG
+        pychirp.Logger.max_chirp_verbosity = pychirp.Verbosity.TRACE
+        pychirp.Logger.chirp_log_batch_interval = 0.05
+        terminal = pychirp.Logger.enable_chirp_log_terminal(leaf_a)
+        try:
+            self.assertIs(terminal, pychirp.Logger.chirp_log_terminal)
+            self.assertEqual(('/Log', pychirp.LOG_BATCH_SIGNATURE), (terminal.name, terminal.signature))
+            self.assertRaises(Exception, lambda: pychirp.Logger.enable_chirp_log_terminal(leaf_a))
+
+            for i in range(20):
+                logger.log_debug('Record ', i)
+            self.assertTrue(pychirp.Logger.flush(5.0))
+            with cv:
+                self.assertTrue(cv.wait_for(lambda: sum(len(pychirp.decode_log_batch(message))
+                                                        for message in messages) == 20, 5.0))
+        finally:
+            pychirp.Logger.disable_chirp_log_terminal()
+            pychirp.Logger.chirp_log_batch_interval = 0.005
+
+        self.assertIsNone(pychirp.Logger.chirp_log_terminal)
+        self.assertIsNone(pychirp.Logger.chirp_log_publisher)
+        self.assertLess(len(messages), 20)
+        records = [record for message in messages for record in pychirp.decode_log_batch(message)]
+        self.assertEqual(['Record {}'.format(i) for i in range(20)], [record.message for record in records])
+        self.assertEqual((pychirp.Verbosity.DEBUG, 'Terminal', threading.get_ident()),
+                         (records[0].severity, records[0].component, records[0].thread_id))
+        self.assertGreater(records[0].timestamp, 0)
+        consumer.cancel_receive_message()
+
+    def test_LogBatchEncoding(self):
+        records = [pychirp.LogRecord(1234567890123456789, pychirp.Verbosity.WARNING, 'Comp', 42, 'Hällo'),
+                   pychirp.LogRecord(0, pychirp.Verbosity.TRACE, 'Other', 1, '')]
+        data = pychirp.encode_log_batch(records)
+        self.assertEqual(records, pychirp.decode_log_batch(data))
+
+        # Each entry is a length-delimited field 1 with the single-entry (timestamp, (message, metadata)) shape
+        self.assertEqual(0x0a, data[0])
+        self.assertRaises(ValueError, lambda: pychirp.decode_log_batch(data[:-3]))
+
+    def test_RingBuffer(self):
+        logger = pychirp.Logger('Ring')
+        logger.stdout_verbosity = pychirp.Verbosity.INFO
+        logger.chirp_verbosity = pychirp.Verbosity.INFO
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'log.ring')
+            ring_buffer = pychirp.Logger.enable_ring_buffer(filename, size=64 * 1024 + 64 + 16 * 128)
+            self.assertIs(ring_buffer, pychirp.Logger.ring_buffer)
+            self.assertEqual(16, ring_buffer.slot_count)
+            self.assertIs(pychirp.Verbosity.TRACE, logger.max_effective_verbosity)
+            self.assertRaises(Exception, lambda: pychirp.Logger.enable_ring_buffer())
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                for i in range(20):
+                    logger.log_trace('Iteration ', i, ' value ', i / 2, ' ', None, ' ', pychirp.LazyLogArgument(lambda: 'lazy'))
+                logger.log_debug('x' * 500)
+            self.assertEqual('', stdout.getvalue())
+
+            records = ring_buffer.records()
+            self.assertEqual(16, len(records))
+            self.assertEqual('Iteration 5 value 2.5 None lazy', records[0].message)
+            self.assertIs(pychirp.Verbosity.TRACE, records[0].severity)
+            self.assertEqual('Ring', records[0].component)
+            self.assertEqual(threading.get_ident(), records[0].thread_id)
+            self.assertTrue(records[-1].message.startswith('xxx'))
+            self.assertTrue(records[-1].message.endswith('...'))
+
+            pychirp.Logger.disable_ring_buffer()
+            self.assertIsNone(pychirp.Logger.ring_buffer)
+            self.assertIs(pychirp.Verbosity.INFO, logger.max_effective_verbosity)
+
+            offline = pychirp.decode_log_ring_buffer(filename)
+            self.assertEqual([record.message for record in records], [record.message for record in offline])
+            self.assertRegex(pychirp.format_log_record(offline[0]), r'.*TRC Ring: Iteration 5 value 2.5 None lazy$')
+
+    def test_RingBufferStringTable(self):
+        ring_buffer = pychirp.LogRingBuffer(size=64 + 1024 + 8 * 128, string_table_size=1024)
+        for i in range(1000):
+            ring_buffer.write(pychirp.Verbosity.TRACE, 'Warm', ['request {} done'.format(i)])
+            ring_buffer.write(pychirp.Verbosity.TRACE, 'Warm', ['request {} of '.format(i), 1000])
+        ring_buffer.write(pychirp.Verbosity.TRACE, 'A component created after warmup', ['hello'])
+
+        records = ring_buffer.records()
+        self.assertEqual('request 999 of 1000', records[-2].message)
+        self.assertEqual('A component created after warmup', records[-1].component)
+        self.assertEqual('hello', records[-1].message)
+
+    def test_RingBufferDisableWhileLogging(self):
+        logger = pychirp.Logger('RingRace')
+        logger.stdout_verbosity = pychirp.Verbosity.INFO
+        logger.chirp_verbosity = pychirp.Verbosity.INFO
+        errors = []
+        running = True
+
+        def log():
+            try:
+                while running:
+                    logger.log_trace('Value ', 42)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=log) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(50):
+                ring_buffer = pychirp.Logger.enable_ring_buffer(size=64 * 1024 + 64 + 16 * 128)
+                time.sleep(0.001)
+                pychirp.Logger.disable_ring_buffer()
+        finally:
+            running = False
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual('Value 42', ring_buffer.records()[-1].message)
+        ring_buffer.close()
+        logger.log_trace('Value ', 43)
+        ring_buffer.write(pychirp.Verbosity.TRACE, 'RingRace', ['After close'])
+
+    def test_RingBufferFatalDump(self):
+        logger = pychirp.Logger('Ring')
+        logger.stdout_verbosity = pychirp.Verbosity.INFO
+
+        with tempfile.TemporaryDirectory() as directory:
+            dump_file = os.path.join(directory, 'fatal.log')
+            pychirp.Logger.enable_ring_buffer(fatal_dump_file=dump_file)
+            with contextlib.redirect_stdout(io.StringIO()):
+                logger.log_debug('Before the crash')
+                logger.log_fatal('Crash')
+            pychirp.Logger.disable_ring_buffer()
+
+            with open(dump_file) as file:
+                lines = file.read().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertRegex(lines[0], r'.*DBG Ring: Before the crash$')
+        self.assertRegex(lines[1], r'.*FAT Ring: Crash$')
+
+    def test_VerbosityControl(self):
+        states = []
+        pychirp.Logger.add_verbosity_observer(states.append)
+        try:
+            logger = pychirp.Logger('Controlled')
+            logger.stdout_verbosity = pychirp.Verbosity.WARNING
+            self.assertEqual('WARNING', states[-1]['components']['Controlled']['stdout_verbosity'])
+
+            response = json.loads(pychirp.Logger.handle_verbosity_request(json.dumps({
+                'max_chirp_verbosity': 'debug',
+                'components': {'Controlled': {'stdout_verbosity': 'TRACE', 'chirp_verbosity': 'INFO'}}
+            })))
+            self.assertEqual(response, states[-1])
+            self.assertEqual('DEBUG', response['max_chirp_verbosity'])
+            self.assertEqual('INFO', response['components']['Controlled']['effective_chirp_verbosity'])
+            self.assertIs(pychirp.Verbosity.TRACE, logger.stdout_verbosity)
+            self.assertIs(pychirp.Verbosity.INFO, logger.effective_chirp_verbosity)
+
+            num_states = len(states)
+            response = json.loads(pychirp.Logger.handle_verbosity_request('{"max_stdout_verbosity": "LOUD"}'))
+            self.assertIn('LOUD', response['error'])
+            self.assertEqual(num_states, len(states))
+            self.assertIn('error', json.loads(pychirp.Logger.handle_verbosity_request('not json')))
+
+            state = json.loads(pychirp.Logger.handle_verbosity_request(''))
+            self.assertEqual(pychirp.Logger.get_verbosity_state(), state)
+        finally:
+            pychirp.Logger.remove_verbosity_observer(states.append)
+            pychirp.Logger.max_chirp_verbosity = pychirp.Verbosity.TRACE
+
+        num_states = len(states)
+        pychirp.Logger.max_stdout_verbosity = pychirp.Verbosity.TRACE
+        self.assertEqual(num_states, len(states))
+
+    def test_VerbosityService(self):
+        scheduler = pychirp.Scheduler()
+        leaf_a = pychirp.Leaf(scheduler)
+        leaf_b = pychirp.Leaf(scheduler)
+        connection = pychirp.LocalConnection(leaf_a, leaf_b)
+        client = pychirp.ClientTerminal('/LoggingControl', pychirp.VERBOSITY_SERVICE_SIGNATURE, leaf=leaf_b)
+        service = pychirp.Logger.enable_verbosity_service(leaf_a)
+
+        def request(settings):
+            responses = []
+            done = threading.Event()
+
+            def on_response(res, operation_id, flags, data):
+                responses.append((res, flags, data))
+                done.set()
+
+            client.async_request(json.dumps(settings).encode() if settings is not None else b'', on_response)
+            self.assertTrue(done.wait(5.0))
+            self.assertEqual(1, len(responses))
+            res, flags, data = responses[0]
+            self.assertTrue(res)
+            self.assertTrue(flags & pychirp.GatherFlags.FINISHED.value)
+            self.assertFalse(flags & pychirp.GatherFlags.DEAF.value)
+            return json.loads(data.decode())
+
+        logger = pychirp.Logger('Remote')
+        logger.stdout_verbosity = pychirp.Verbosity.FATAL
+        logger.chirp_verbosity = pychirp.Verbosity.INFO
+        try:
+            self.assertIs(service, pychirp.Logger.verbosity_service)
+            self.assertRaises(Exception, lambda: pychirp.Logger.enable_verbosity_service(leaf_a))
+
+            self.assertEqual(pychirp.Logger.get_verbosity_state(), request(None))
+
+            state = request({'components': {'Remote': {'stdout_verbosity': 'debug'}}})
+            self.assertEqual('DEBUG', state['components']['Remote']['effective_stdout_verbosity'])
+            self.assertIs(pychirp.Verbosity.DEBUG, logger.effective_stdout_verbosity)
+
+            self.assertIn('LOUD', request({'max_chirp_verbosity': 'LOUD'})['error'])
+            self.assertIs(pychirp.Verbosity.INFO, logger.effective_chirp_verbosity)
+        finally:
+            pychirp.Logger.disable_verbosity_service()
+            logger.stdout_verbosity = pychirp.Verbosity.FATAL
+
+        self.assertIsNone(pychirp.Logger.verbosity_service)
+        self.assertRaises(pychirp.Failure, lambda: client.async_request(b'', lambda *args: None))
+
     def test_ProcessInterface(self):
         print('TestLogging.test_ProcessInterface TODO') # TODO
 
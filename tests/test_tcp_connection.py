@@ -1,5 +1,9 @@
 import pychirp
+import socket
+import threading
+import time
 import unittest
+import unittest.mock
 
 
 class TestTcpConnection(unittest.TestCase):
@@ -147,6 +151,181 @@ class TestTcpConnection(unittest.TestCase):
         self.assertNotEquals(pychirp.Success(), self.death_handler_res)
 
 
+class TestReconnectPolicy(unittest.TestCase):
+    def test_backoff_without_jitter(self):
+        policy = pychirp.ReconnectPolicy(initial_delay=0.5, multiplier=2.0, max_delay=3.0, jitter=False)
+        self.assertEqual([0.5, 1.0, 2.0, 3.0, 3.0], [policy.get_delay(i) for i in range(5)])
+        self.assertEqual(3.0, policy.get_delay(10000))
+
+    def test_full_jitter(self):
+        policy = pychirp.ReconnectPolicy(initial_delay=1.0, multiplier=2.0, max_delay=4.0)
+        delays = [policy.get_delay(5) for _ in range(1000)]
+        self.assertTrue(all(0 <= delay <= 4.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 900)
+
+
+class TestTcpTarget(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(('localhost', 12000), pychirp.TcpTarget.parse('localhost:12000'))
+        self.assertEqual(('::1', 12000), pychirp.TcpTarget.parse(' [::1]:12000 '))
+        self.assertEqual('[::1]:12000', str(pychirp.TcpTarget('::1', 12000)))
+        self.assertEqual('localhost:12000', str(pychirp.TcpTarget('localhost', 12000)))
+        for target in ['localhost', ':12000', 'localhost:0', 'localhost:70000', 'localhost:http']:
+            self.assertRaises(pychirp.BadTcpTarget, lambda: pychirp.TcpTarget.parse(target))
+
+
+class TestResolverCache(unittest.TestCase):
+    def setUp(self):
+        self.lookups = []
+        patcher = unittest.mock.patch('socket.getaddrinfo', side_effect=self.getaddrinfo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.resolver = pychirp.ResolverCache(ttl=0.2, negative_ttl=0.1)
+
+    def getaddrinfo(self, host, *args):
+        self.lookups.append(host)
+        if host == 'bad.example':
+            raise socket.gaierror('Name or service not known')
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.0.0.{}'.format(len(self.lookups)), 0))]
+
+    def resolve(self, host):
+        results = []
+        event = threading.Event()
+        self.resolver.async_resolve(host, lambda res, address: (results.append((bool(res), address)), event.set()))
+        self.assertTrue(event.wait(5.0))
+        return results[0]
+
+    def test_literal_addresses(self):
+        self.assertEqual((True, '127.0.0.1'), self.resolve('127.0.0.1'))
+        self.assertEqual((True, '::1'), self.resolve('::1'))
+        self.assertEqual([], self.lookups)
+
+    def test_caching(self):
+        self.assertEqual((True, '10.0.0.1'), self.resolve('db.example'))
+        self.assertEqual((True, '10.0.0.1'), self.resolve('db.example'))
+        self.assertEqual((False, None), self.resolve('bad.example'))
+        self.assertEqual((False, None), self.resolve('bad.example'))
+        self.assertEqual(['db.example', 'bad.example'], self.lookups)
+
+        stats = self.resolver.stats
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['negative_hits'])
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(1, stats['lookup_failures'])
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        self.resolver.prefetch(['db.example'])
+        while self.resolver.get_cached_address('db.example') is None:
+            time.sleep(0.001)
+        time.sleep(0.25)
+
+        self.assertEqual((True, '10.0.0.1'), self.resolve('db.example'))
+        while self.resolver.get_cached_address('db.example') == '10.0.0.1':
+            time.sleep(0.001)
+        self.assertEqual(1, self.resolver.stats['stale_hits'])
+        self.assertEqual(2, self.resolver.stats['lookups'])
+
+
+class TestTcpClientResolver(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        patcher = unittest.mock.patch('socket.getaddrinfo', side_effect=self.getaddrinfo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.release.set)
+        self.scheduler = pychirp.Scheduler()
+        self.client = pychirp.TcpClient(self.scheduler, resolver=pychirp.ResolverCache())
+        self.addCleanup(self.client.destroy)
+
+    def getaddrinfo(self, host, *args):
+        self.release.wait(5.0)
+        raise socket.gaierror('Name or service not known')
+
+    def test_cancel_while_resolving(self):
+        results = []
+        event = threading.Event()
+
+        def connect_handler(res, connection):
+            results.append((res, connection, threading.current_thread()))
+            event.set()
+
+        self.client.async_connect('db.example', 12345, 5.0, connect_handler)
+        self.assertRaises(pychirp.AsyncOperationRunning,
+                          lambda: self.client.async_connect('db.example', 12345, 5.0, connect_handler))
+
+        self.client.cancel_connect()
+        self.assertTrue(event.wait(5.0))
+        self.release.set()
+        deadline = time.time() + 5.0
+        while self.client.resolver.stats['lookup_failures'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual([(pychirp.Canceled(), None)], [result[:2] for result in results])
+        self.assertIsNot(threading.current_thread(), results[0][2])
+
+
+class TestTimerScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = pychirp._TimerScheduler('test scheduler')
+        self.fired = []
+        self.event = threading.Event()
+
+    def test_order_and_cancel(self):
+        self.scheduler.schedule(0.06, lambda: self.fired.append(3))
+        self.scheduler.schedule(0.02, lambda: self.fired.append(1))
+        timer = self.scheduler.schedule(0.04, lambda: self.fired.append(2))
+        self.scheduler.schedule(0.08, self.event.set)
+        self.assertEqual(4, self.scheduler.pending)
+        self.scheduler.cancel(timer)
+        self.scheduler.cancel(timer)
+        self.assertEqual(3, self.scheduler.pending)
+
+        self.assertTrue(self.event.wait(5.0))
+        self.assertEqual([1, 3], self.fired)
+        self.assertEqual(0, self.scheduler.pending)
+
+    def test_single_thread(self):
+        threads = set()
+        timers = [self.scheduler.schedule(60.0, lambda: self.fired.append(None)) for _ in range(500)]
+        for i in range(500):
+            self.scheduler.schedule(0.001 * (i % 10), lambda: threads.add(threading.current_thread()))
+        self.scheduler.schedule(0.05, self.event.set)
+
+        self.assertTrue(self.event.wait(5.0))
+        self.assertEqual(1, len(threads))
+        for timer in timers:
+            self.scheduler.cancel(timer)
+        self.assertEqual(0, self.scheduler.pending)
+        self.assertEqual([], self.fired)
+
+
+class TestConnectionReaper(unittest.TestCase):
+    def test_destroy_later(self):
+        reaper = pychirp._ConnectionReaper()
+        release = threading.Event()
+        destroyed = []
+
+        class SlowConnection:
+            def __init__(self, fail=False):
+                self.fail = fail
+
+            def destroy(self):
+                release.wait(5.0)
+                destroyed.append(threading.current_thread())
+                if self.fail:
+                    raise pychirp.Failure(-1)
+
+        reaper.destroy_later(SlowConnection(fail=True))
+        reaper.destroy_later(SlowConnection())
+        self.assertFalse(reaper.drain(0.05))
+        self.assertEqual([], destroyed)
+
+        release.set()
+        self.assertTrue(reaper.drain(5.0))
+        self.assertEqual(2, len(destroyed))
+        self.assertNotIn(threading.current_thread(), destroyed)
+
+
 class TestAutoConnectingTcpClient(unittest.TestCase):
     ADDRESS = TestTcpConnection.ADDRESS
     PORT = TestTcpConnection.PORT
@@ -230,6 +409,151 @@ class TestAutoConnectingTcpClient(unittest.TestCase):
 
         self.assertFalse(self.disconnect_handler_res)
 
+    def test_reconnect_attempts(self):
+        self.client.destroy()
+        policy = pychirp.ReconnectPolicy(initial_delay=0.01, multiplier=2.0, max_delay=0.04, jitter=False)
+        self.client = pychirp.AutoConnectingTcpClient(self.endpointA, self.ADDRESS, self.PORT, self.timeout,
+                                                      reconnect_policy=policy)
+        self.assertIs(policy, self.client.reconnect_policy)
+
+        attempts = []
+        results = []
+        event = threading.Event()
+
+        def connFn(res, connection, attempt):
+            self.assertFalse(res)
+            attempts.append(attempt)
+            if len(attempts) == 4:
+                event.set()
+
+        self.client.connect_attempt_observer = connFn
+        self.client.connect_observer = lambda *args: results.append(len(args))
+        self.client.start()
+        self.assertTrue(event.wait(5.0))
+
+        self.assertEqual({2}, set(results))
+        self.assertEqual([1, 2, 3, 4], [attempt.attempt for attempt in attempts[:4]])
+        self.assertEqual([0.02, 0.04, 0.04, 0.04], [attempt.delay for attempt in attempts[:4]])
+
+
+class TestMultiTargetTcpClient(unittest.TestCase):
+    ADDRESS = TestTcpConnection.ADDRESS
+    PORT = TestTcpConnection.PORT
+
+    def setUp(self):
+        self.scheduler = pychirp.Scheduler()
+        self.endpointA = pychirp.Leaf(self.scheduler)
+        self.endpointB = pychirp.Leaf(self.scheduler)
+        self.timeout = 5.0
+        self.targets = ['{}:{}'.format(self.ADDRESS, self.PORT + 1), (self.ADDRESS, self.PORT)]
+        self.client = pychirp.MultiTargetTcpClient(self.endpointA, self.targets, self.timeout, attempt_delay=0.05)
+        self.server = pychirp.TcpServer(self.scheduler, self.ADDRESS, self.PORT)
+        self.server_connection = None
+
+        def accept_handler(res, connection):
+            if res:
+                self.server_connection = connection
+                connection.assign(self.endpointB, self.timeout)
+
+        self.server.async_accept(self.timeout, accept_handler)
+
+    def tearDown(self):
+        for obj in [self.server_connection, self.server]:
+            try:
+                if obj:
+                    obj.destroy()
+            except pychirp.Failure:
+                pass
+
+        self.client.destroy()
+
+    def test_properties(self):
+        self.assertEqual([(self.ADDRESS, self.PORT + 1), (self.ADDRESS, self.PORT)], self.client.targets)
+        self.assertEqual(0.05, self.client.attempt_delay)
+        self.assertIsNone(self.client.connected_target)
+        self.assertRaises(pychirp.BadTcpTarget, lambda: pychirp.MultiTargetTcpClient(self.endpointA, []))
+
+    def test_connects_to_reachable_target(self):
+        event = threading.Event()
+        results = []
+
+        def connFn(res, connection):
+            results.append(res)
+            if res:
+                event.set()
+
+        self.client.connect_observer = connFn
+        self.client.start()
+        self.assertTrue(event.wait(5.0))
+
+        target = pychirp.TcpTarget(self.ADDRESS, self.PORT)
+        self.assertEqual(target, self.client.connected_target)
+        self.assertIsNotNone(self.client.target_latencies[target])
+        self.assertEqual(target, self.client.preferred_targets[0])
+
+    def test_race_waits_for_canceled_attempts(self):
+        results = []
+        connected = threading.Event()
+
+        def connFn(res, connection):
+            results.append(res)
+            if res:
+                connected.set()
+
+        self.client.connect_observer = connFn
+        with self.client._lock:
+            self.client._running = True
+            self.client._connecting = [True, True]
+            self.client._start_connect()
+            stale_race = self.client._race - 1
+        self.assertEqual([], results)
+
+        self.client._on_attempt_completed(stale_race, 1, pychirp.Canceled(), None)
+        self.assertTrue(connected.wait(5.0))
+        self.assertEqual([pychirp.Success()], results)
+        self.assertEqual(0, self.client.failed_attempts)
+
+    def test_warm_standby(self):
+        self.client.destroy()
+        self.client = pychirp.MultiTargetTcpClient(self.endpointA, [(self.ADDRESS, self.PORT), ('localhost', self.PORT)],
+                                                   self.timeout, standby=True)
+        self.assertTrue(self.client.standby)
+
+        server_connections = []
+
+        def accept_handler(res, connection):
+            if res:
+                server_connections.append(connection)
+                connection.assign(self.endpointB, self.timeout)
+                self.server.async_accept(self.timeout, accept_handler)
+
+        self.server.cancel_accept()
+        self.server.async_accept(self.timeout, accept_handler)
+
+        connected = threading.Event()
+        self.client.connect_observer = lambda res, connection: connected.set() if res else None
+        self.client.start()
+        self.assertTrue(connected.wait(5.0))
+        deadline = time.time() + 5.0
+        while self.client.standby_target is None and time.time() < deadline:
+            time.sleep(0.01)
+        standby_target = self.client.standby_target
+        self.assertIsNotNone(standby_target)
+        self.assertNotEqual(self.client.connected_target, standby_target)
+
+        connected.clear()
+        server_connections[0].destroy()
+        self.assertTrue(connected.wait(5.0))
+        self.assertEqual(standby_target, self.client.connected_target)
+
+        metrics = self.client.failover_metrics
+        self.assertEqual(1, metrics['warm_failovers'])
+        self.assertEqual(0, metrics['cold_failovers'])
+        self.assertLess(metrics['last_gap'], 1.0)
+
+        for connection in server_connections[1:]:
+            connection.destroy()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+import pychirp
+import threading
+import unittest
+
+
+class TestProducerConsumerTerminal(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = pychirp.Scheduler()
+        self.leafA = pychirp.Leaf(self.scheduler)
+        self.leafB = pychirp.Leaf(self.scheduler)
+        self.connection = pychirp.LocalConnection(self.leafA, self.leafB)
+        self.producer = pychirp.ProducerTerminal('/Data', 0x1234, leaf=self.leafA)
+        self.consumer = pychirp.ConsumerTerminal('/Data', 0x1234, leaf=self.leafB)
+
+    def test_init(self):
+        self.assertEqual('/Data', self.producer.name)
+        self.assertEqual(0x1234, self.consumer.signature)
+        self.assertIs(self.leafA, self.producer.leaf)
+
+    def test_publish(self):
+        received = []
+        done = threading.Event()
+
+        def on_message(res, data):
+            received.append((res, data))
+            done.set()
+
+        self.consumer.async_receive_message(on_message)
+        self.producer.publish(b'Hello\x00World')
+        self.assertTrue(done.wait(5.0))
+        self.assertEqual(1, len(received))
+        self.assertTrue(received[0][0])
+        self.assertEqual(b'Hello\x00World', received[0][1])
+
+    def test_cancel_receive_message(self):
+        received = []
+        done = threading.Event()
+
+        def on_message(res, data):
+            received.append(res)
+            done.set()
+
+        self.consumer.async_receive_message(on_message)
+        self.consumer.cancel_receive_message()
+        self.assertTrue(done.wait(5.0))
+        self.assertEqual([pychirp.Canceled()], received)
+
+    def test_try_publish(self):
+        self.assertTrue(self.producer.try_publish(b'x'))
+        self.producer.destroy()
+        self.assertFalse(self.producer.try_publish(b'x'))
+
+
+
+class TestServiceClientTerminal(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = pychirp.Scheduler()
+        self.leafA = pychirp.Leaf(self.scheduler)
+        self.leafB = pychirp.Leaf(self.scheduler)
+        self.connection = pychirp.LocalConnection(self.leafA, self.leafB)
+        self.service = pychirp.ServiceTerminal('/Service', 0x1234, leaf=self.leafA)
+        self.client = pychirp.ClientTerminal('/Service', 0x1234, leaf=self.leafB)
+        self.responses = []
+        self.done = threading.Event()
+
+    def on_response(self, res, operation_id, flags, data):
+        self.responses.append((res, operation_id, flags, data))
+        self.done.set()
+
+    def test_request(self):
+        def on_request(res, operation_id, data):
+            self.service.respond_to_request(operation_id, data.upper())
+
+        self.service.async_receive_request(on_request)
+        operation_id = self.client.async_request(b'hello', self.on_response)
+        self.assertTrue(self.done.wait(5.0))
+        res, response_id, flags, data = self.responses[0]
+        self.assertTrue(res)
+        self.assertEqual((operation_id, pychirp.GatherFlags.FINISHED.value, b'HELLO'), (response_id, flags, data))
+
+    def test_ignore_request(self):
+        self.service.async_receive_request(lambda res, operation_id, data: self.service.ignore_request(operation_id))
+        self.client.async_request(b'hello', self.on_response)
+        self.assertTrue(self.done.wait(5.0))
+        self.assertTrue(self.responses[0][2] & pychirp.GatherFlags.IGNORED.value)
+
+    def test_deaf_service(self):
+        self.client.async_request(b'hello', self.on_response)
+        self.assertTrue(self.done.wait(5.0))
+        self.assertTrue(self.responses[0][2] & pychirp.GatherFlags.DEAF.value)
+
+    def test_cancel_request(self):
+        received = threading.Event()
+        self.service.async_receive_request(lambda res, operation_id, data: received.set())
+        operation_id = self.client.async_request(b'hello', self.on_response)
+        self.assertTrue(received.wait(5.0))
+        self.client.cancel_request(operation_id)
+        self.assertTrue(self.done.wait(5.0))
+        self.assertEqual(pychirp.Canceled(), self.responses[0][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import pychirp
+import unittest
+import time
+
+
+class TestTimestamp(unittest.TestCase):
+    def test_now(self):
+        before = time.time_ns()
+        ts = pychirp.Timestamp()
+        after = time.time_ns()
+        self.assertLessEqual(before, ts.ns_since_epoch)
+        self.assertGreaterEqual(after, ts.ns_since_epoch)
+
+    def test_components(self):
+        ts = pychirp.Timestamp(1500000000123456789)
+        self.assertEqual(1500000000123456789, ts.ns_since_epoch)
+        self.assertEqual(123, ts.milliseconds)
+        self.assertEqual(456, ts.microseconds)
+        self.assertEqual(789, ts.nanoseconds)
+
+    def test_to_string(self):
+        ns = 1500000000123456789
+        seconds = time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(ns // 1000000000))
+        ts = pychirp.Timestamp(ns)
+        self.assertEqual(seconds, ts.to_string(pychirp.Timestamp.Precision.SECONDS))
+        self.assertEqual(seconds + '.123', ts.to_string(pychirp.Timestamp.Precision.MILLISECONDS))
+        self.assertEqual(seconds + '.123.456', ts.to_string(pychirp.Timestamp.Precision.MICROSECONDS))
+        self.assertEqual(seconds + '.123.456.789', ts.to_string(pychirp.Timestamp.Precision.NANOSECONDS))
+        self.assertEqual(seconds + '.123', str(ts))
+
+    def test_cached_seconds(self):
+        a = pychirp.Timestamp(1500000000000000001)
+        b = pychirp.Timestamp(1500000001999000000)
+        self.assertNotEqual(a.to_string(), b.to_string())
+        self.assertTrue(a.to_string().endswith('.000'))
+        self.assertTrue(b.to_string().endswith('.999'))
+        self.assertEqual(a.to_string(pychirp.Timestamp.Precision.SECONDS),
+                         pychirp.Timestamp(1500000000999999999).to_string(pychirp.Timestamp.Precision.SECONDS))
+
+
+if __name__ == '__main__':
+    unittest.main()